@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for the Stop and Notification hooks.
+
+Runs each hook as Claude Code does, in a fresh process fed a recorded stdin
+payload from benchmarks/payloads, with:
+
+- a stub terminal-notifier first on PATH
+- a local HTTP stand-in for the Slack app that is healthy, slow or refusing
+- synthetic transcripts from benchmarks/transcript_corpus.py, 1 KB up to 500 MB
+
+Every run gets an empty HOME, so the transcript index, outbox and circuit
+breaker start cold and each sample is the worst case. Reports p50/p95/p99 wall
+time and peak RSS per scenario. With --baseline the run fails (exit 1) when a
+scenario's p95 or peak RSS regresses past the tolerance, so it can gate CI. A
+hook that exits with a nonzero status stops the run (see bench_process).
+
+Timings only compare on the same machine, so a baseline should come from the
+same host and session: --hooks-dir benchmarks another checkout's hooks (e.g. the
+base branch) with this script, payloads and Slack stand-in.
+
+Usage:
+    python benchmarks/bench_hook_latency.py [--runs N] [--sizes 1KB,1MB,50MB,500MB]
+    python benchmarks/bench_hook_latency.py --hooks-dir ../main/hooks --write-baseline base.json
+    python benchmarks/bench_hook_latency.py --baseline base.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HOOKS_DIR = ROOT / "hooks"
+PAYLOADS_DIR = Path(__file__).parent / "payloads"
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HOOKS_DIR))
+import bench_process  # noqa: E402
+import transcript_corpus  # noqa: E402
+from hook_metrics import percentile  # noqa: E402
+from tests.slack_stub import SlackStub  # noqa: E402
+
+SIZES = {"1KB": 1 << 10, "1MB": 1 << 20, "50MB": 50 << 20, "500MB": 500 << 20}
+DEFAULT_SIZES = "1KB,1MB,50MB"
+
+# (scenario prefix, hook script, recorded payload)
+HOOKS = [
+    ("stop", "notifications_dispatch.py", "stop.json"),
+    ("notification", "notifications_dispatch.py", "notification_permission_prompt.json"),
+]
+SKIPPED_HOOK = ("notification-skip", "notifications_dispatch.py", "notification_auth_success.json")
+
+STUB_NOTIFIER = "#!/bin/sh\nexit 0\n"
+
+
+@contextmanager
+def slack_endpoint(mode, slow_delay):
+    """Yield the Slack URL for a healthy, slow or refusing stand-in."""
+    if mode == "refusing":
+        # Bind and close a socket to get a port nothing is listening on
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        yield f"http://127.0.0.1:{port}/claude/hook"
+        return
+    with SlackStub(delay=slow_delay if mode == "slow" else 0.0) as stub:
+        yield stub.url
+
+
+def run_hook(script, stdin, env):
+    """Run one hook script process; return (wall seconds, peak RSS in MB)."""
+    elapsed, rss, _ = bench_process.run_measured([sys.executable, str(script)], stdin=stdin, env=env)
+    return elapsed, rss
+
+
+def scenarios(sizes):
+    """Yield (name, script, payload file, slack mode, size label) for the matrix."""
+    smallest = sizes[0]
+    for prefix, script, payload in HOOKS:
+        for mode in ("healthy", "slow", "refusing"):
+            yield f"{prefix}/{mode}/{smallest}", script, payload, mode, smallest
+        for size in sizes[1:]:
+            yield f"{prefix}/healthy/{size}", script, payload, "healthy", size
+    prefix, script, payload = SKIPPED_HOOK
+    yield f"{prefix}/healthy/{smallest}", script, payload, "healthy", smallest
+
+
+def run_benchmark(args, workdir):
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    notifier = bin_dir / "terminal-notifier"
+    notifier.write_text(STUB_NOTIFIER)
+    notifier.chmod(0o755)
+
+    transcripts = {}
+    for size in args.sizes:
+        transcripts[size] = workdir / f"transcript-{size}.jsonl"
+        transcript_corpus.generate(transcripts[size], SIZES[size], ending="text")
+
+    results = {}
+    for name, script, payload_file, mode, size in scenarios(args.sizes):
+        if args.only and not any(part in name for part in args.only):
+            continue
+        if not (args.hooks_dir / script).exists():
+            print(f"{name:<34} skipped, {args.hooks_dir / script} does not exist", flush=True)
+            continue
+        payload = json.loads((PAYLOADS_DIR / payload_file).read_text())
+        payload["transcript_path"] = str(transcripts[size])
+        stdin = json.dumps(payload).encode()
+        walls, rss = [], []
+        with slack_endpoint(mode, args.slow_delay) as url:
+            # One discarded warm-up run so page-cache misses don't land in the samples
+            for i in range(args.runs + 1):
+                home = tempfile.mkdtemp(prefix="home-", dir=workdir)
+                env = {
+                    **os.environ,
+                    "HOME": home,
+                    "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                    "CLAUDE_NOTIFICATIONS_SLACK_URL": url,
+                    "CLAUDE_NOTIFICATIONS_USE_DAEMON": "false",
+                    "CLAUDE_NOTIFICATIONS_DELIVERY_MODE": "inline",
+                }
+                wall, peak = run_hook(args.hooks_dir / script, stdin, env)
+                if i == 0:
+                    continue
+                walls.append(wall * 1000)
+                rss.append(peak)
+        walls.sort()
+        results[name] = {
+            "p50_ms": round(percentile(walls, 50), 1),
+            "p95_ms": round(percentile(walls, 95), 1),
+            "p99_ms": round(percentile(walls, 99), 1),
+            "peak_rss_mb": round(max(rss), 1),
+        }
+        r = results[name]
+        print(f"{name:<34} p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  "
+              f"p99 {r['p99_ms']:8.1f} ms  rss {r['peak_rss_mb']:6.1f} MB", flush=True)
+    return results
+
+
+def find_regressions(results, baseline, tolerance, slack_ms):
+    """Compare against a baseline; a scenario regresses past tolerance x baseline (+ slack_ms for time)."""
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        limit = base["p95_ms"] * tolerance + slack_ms
+        if current["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms > {limit:.1f} ms")
+        limit = base["peak_rss_mb"] * tolerance
+        if current["peak_rss_mb"] > limit:
+            regressions.append(f"{name}: peak RSS {current['peak_rss_mb']} MB > {limit:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated transcript sizes from {', '.join(SIZES)}")
+    parser.add_argument("--only", action="append", help="run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="seconds the slow Slack stand-in waits")
+    parser.add_argument("--hooks-dir", type=Path, default=HOOKS_DIR,
+                        help="hooks directory to benchmark, e.g. a checkout of the base branch")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="fail when results regress against this file")
+    parser.add_argument("--write-baseline", help="write results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed ratio over the baseline")
+    parser.add_argument("--slack-ms", type=float, default=50.0, help="absolute p95 headroom for timer noise")
+    args = parser.parse_args()
+    args.sizes = [s.strip() for s in args.sizes.split(",")]
+    unknown = [s for s in args.sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="hook-bench-") as tmp:
+        results = run_benchmark(args, Path(tmp))
+
+    for path in (args.json, args.write_baseline):
+        if path:
+            Path(path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = find_regressions(results, baseline, args.tolerance, args.slack_ms)
+        if regressions:
+            print("\nRegressions against", args.baseline)
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
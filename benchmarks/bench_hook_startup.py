@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark hook process startup: interpreter launch plus imports.
+
+Times whole hook invocations with a non-actionable Notification payload (the
+hook reads stdin and exits without delivering), so the numbers are dominated
+by process start and module imports. Compares:
+
+- python3:  the command hooks.json runs
+- uv run:   the previous launcher, when uv is installed
+
+and reports the import cost of requests against the stdlib http.client the
+Slack channel now uses.
+
+Usage:
+    python benchmarks/bench_hook_startup.py [--runs N]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+PAYLOAD = json.dumps({"session_id": "bench", "hook_event_name": "Notification",
+                      "notification_type": "auth_success", "message": "Authentication succeeded"})
+
+
+def time_command(cmd, runs, stdin="", env=None):
+    """Median and p95 wall time in milliseconds over `runs` invocations."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, input=stdin, text=True, capture_output=True, env=env, check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = {**os.environ, "HOME": home, "CLAUDE_NOTIFICATIONS_USE_DAEMON": "false"}
+        hook = str(HOOKS_DIR / "notifications_dispatch.py")
+        launchers = [("python3", [sys.executable, hook])]
+        if shutil.which("uv"):
+            launchers.append(("uv run", ["uv", "run", hook]))
+        for name, cmd in launchers:
+            p50, p95 = time_command(cmd, args.runs, PAYLOAD, env)
+            print(f"{name:>12}: p50 {p50:7.1f} ms  p95 {p95:7.1f} ms")
+
+        bare, _ = time_command([sys.executable, "-c", "pass"], args.runs)
+        for module in ("http.client", "requests"):
+            p50, _ = time_command([sys.executable, "-c", f"import {module}"], args.runs)
+            print(f"{'import ' + module:>24}: {p50 - bare:7.1f} ms over bare interpreter")
+
+
+if __name__ == "__main__":
+    main()
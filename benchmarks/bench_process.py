@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Measured child processes for the benchmarks.
+
+run_measured() starts one process and reaps it with os.wait4, so the reported
+peak RSS belongs to that child alone. A child that exits with a nonzero status
+raises instead of reporting timings, so a crashing hook or worker can never
+pass a benchmark or its regression gate.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+
+def run_measured(cmd, stdin=None, env=None, capture=False, stderr=subprocess.DEVNULL):
+    """
+    Run cmd to completion and measure it.
+
+    Args:
+        cmd (list): Command line, e.g. [sys.executable, "hook.py"]
+        stdin (bytes): Written to the child's stdin, which is then closed;
+                       None leaves stdin attached to this process
+        env (dict): The child's environment
+        capture (bool): Return the child's stdout instead of discarding it
+        stderr: Where the child's stderr goes, as for subprocess.Popen
+
+    Returns:
+        tuple: (wall seconds, peak RSS in MB, stdout bytes or None)
+
+    Raises:
+        RuntimeError: If the child exits with a nonzero status
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if stdin is not None else None,
+                            stdout=subprocess.PIPE if capture else subprocess.DEVNULL, stderr=stderr, env=env)
+    if stdin is not None:
+        proc.stdin.write(stdin)
+        proc.stdin.close()
+    out = proc.stdout.read() if capture else None
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if capture:
+        proc.stdout.close()
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(str(part) for part in cmd)} exited with status {proc.returncode}")
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    return elapsed, rss, out
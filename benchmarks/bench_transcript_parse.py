@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Transcript parser throughput and peak memory on a synthetic corpus.
+
+Generates transcripts with benchmarks/transcript_corpus.py (deterministic for a
+seed, with malformed lines and multi-MB entries) and times each scanning
+strategy in a fresh process, so peak RSS belongs to that strategy alone:
+
+- has_ask_user_question:   the hook entry point, cold transcript index
+- extract_latest_message:  the hook entry point, cold transcript index
+- extract_warm_index:      extract_latest_message with the index already written
+- reverse_unbounded:       the reverse reader without streaming oversized lines
+- forward_prefilter:       forward read of every line with the raw-byte prefilter
+- forward_json:            the original loop, json.loads on every line
+
+MB/s is transcript size over wall time, so strategies that stop early report
+effective throughput rather than bytes actually read. Each result is checked
+against what the generator says the last assistant entry holds.
+
+Usage:
+    python benchmarks/bench_transcript_parse.py [--sizes 1MB,50MB,500MB] [--seed 0]
+        [--huge-every 16MB --huge-size 8MB] [--strategies forward_json,...] [--corpus-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import bench_process
+import transcript_corpus
+
+ROOT = Path(__file__).parent.parent
+HOOKS_DIR = ROOT / "hooks"
+
+DEFAULT_SIZES = "1MB,50MB,500MB"
+
+
+def _load_hooks():
+    sys.path.insert(0, str(HOOKS_DIR))
+    import macos_notification
+    return macos_notification
+
+
+def forward_json(mod, path):
+    """The original loop: decode every non-empty line, keep the last assistant entry."""
+    latest = None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("message"), dict) \
+                    and entry["message"].get("role") == "assistant":
+                latest = entry
+    return mod._analyze_entry(latest, 0) if latest else mod.EMPTY_ANALYSIS
+
+
+def forward_prefilter(mod, path):
+    """Forward read with the raw-byte role check, decoding only candidate lines."""
+    latest = None
+    with open(path, "rb") as f:
+        for line in f:
+            if not mod._ASSISTANT_ROLE_MARKER.search(line):
+                continue
+            try:
+                entry = mod._json_loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("message"), dict) \
+                    and entry["message"].get("role") == "assistant":
+                latest = entry
+    return mod._analyze_entry(latest, 0) if latest else mod.EMPTY_ANALYSIS
+
+
+def reverse_unbounded(mod, path):
+    """The reverse reader without streaming oversized lines."""
+    with open(path, "rb") as f:
+        for offset, line in mod._iter_lines_reverse(f):
+            if not mod._ASSISTANT_ROLE_MARKER.search(line):
+                continue
+            try:
+                entry = mod._json_loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("message"), dict) \
+                    and entry["message"].get("role") == "assistant":
+                return mod._analyze_entry(entry, offset)
+    return mod.EMPTY_ANALYSIS
+
+
+# Strategy -> (prepare, run); prepare runs untimed before run, both get (module, path)
+STRATEGIES = {
+    "has_ask_user_question": (None, lambda mod, path: mod.has_ask_user_question(path)),
+    "extract_latest_message": (None, lambda mod, path: mod.extract_latest_message(path)),
+    "extract_warm_index": (lambda mod, path: mod.analyze_transcript(path),
+                           lambda mod, path: mod.extract_latest_message(path)),
+    "reverse_unbounded": (None, reverse_unbounded),
+    "forward_prefilter": (None, forward_prefilter),
+    "forward_json": (None, forward_json),
+}
+
+
+def _expected_message(message):
+    """The notification message the hooks keep for a full message text."""
+    if message is None:
+        return None
+    return message[:_load_hooks().MESSAGE_PREFIX_CHARS].rstrip()
+
+
+def _result_matches(strategy, result, expected):
+    """Compare a strategy's result with the generator's ground truth."""
+    prefix = _expected_message(expected.message)
+    if strategy == "has_ask_user_question":
+        return result == expected.asks_user_question
+    if strategy in ("extract_latest_message", "extract_warm_index"):
+        return result == prefix
+    return (result.message, result.asks_user_question) == (prefix, expected.asks_user_question)
+
+
+def worker(strategy, path):
+    """Run one strategy once in this process and print its timing as JSON."""
+    mod = _load_hooks()
+    prepare, run = STRATEGIES[strategy]
+    if prepare:
+        prepare(mod, path)
+    start = time.perf_counter()
+    result = run(mod, path)
+    elapsed = time.perf_counter() - start
+    if hasattr(result, "_asdict"):
+        result = result._asdict()
+    print(json.dumps({"seconds": elapsed, "result": result}))
+
+
+def run_strategy(strategy, path, home):
+    """Run a strategy in a fresh process; return (seconds, result, peak RSS in MB)."""
+    env = {**os.environ, "HOME": str(home), "CLAUDE_NOTIFICATIONS_LOG_LEVEL": "OFF"}
+    _, rss, out = bench_process.run_measured([sys.executable, __file__, "--worker", strategy, str(path)],
+                                             env=env, capture=True, stderr=None)
+    report = json.loads(out)
+    return report["seconds"], report["result"], rss
+
+
+def corpus(args, label, directory):
+    """
+    Generate (or reuse) the corpus file for a size label; return (path, expected).
+
+    The generator runs in its own process and only a prefix of the expected
+    message is read back: a child's ru_maxrss starts from this process's peak,
+    so holding multi-MB entries here would inflate every worker's peak RSS.
+    """
+    path = Path(directory) / f"transcript-{label}-seed{args.seed}-{args.ending}.jsonl"
+    meta = path.with_suffix(".expected.json")
+    if not (path.exists() and meta.exists()):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(Path(__file__).parent / "transcript_corpus.py"), str(path),
+                        "--size", label, "--seed", str(args.seed), "--mix", args.mix, "--huge-every", args.huge_every,
+                        "--huge-size", args.huge_size, "--ending", args.ending, "--expected", str(meta)],
+                       stdout=subprocess.DEVNULL, check=True)
+        print(f"generated {path.name} in {time.perf_counter() - start:.1f}s")
+    expected = json.loads(meta.read_text())
+    return path, transcript_corpus.Expected(expected["message"], expected["asks_user_question"],
+                                            tuple(expected["tool_names"]))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated sizes, e.g. 1MB,50MB,2GB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", default="", help="entry weights passed to the generator")
+    parser.add_argument("--huge-every", default="16MB", help="insert a huge entry every N bytes (0 for none)")
+    parser.add_argument("--huge-size", default="8MB")
+    parser.add_argument("--ending", choices=transcript_corpus.ENDINGS, default="ask")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="comma-separated strategies")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per strategy; the fastest is reported")
+    parser.add_argument("--corpus-dir", help="keep generated transcripts here and reuse them")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    strategies = [s.strip() for s in args.strategies.split(",")]
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="parse-bench-") as tmp:
+        directory = args.corpus_dir or tmp
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        print(f"{'size':>8} {'strategy':<24}{'MB/s':>12}{'seconds':>10}{'peak MB':>10}  ok")
+        for label in (s.strip() for s in args.sizes.split(",")):
+            path, expected = corpus(args, label, directory)
+            size_mb = path.stat().st_size / 1e6
+            for strategy in strategies:
+                best = None
+                for run in range(args.repeat):
+                    home = Path(tmp) / f"home-{label}-{strategy}-{run}"
+                    home.mkdir()
+                    seconds, result, rss = run_strategy(strategy, path, home)
+                    if best is None or seconds < best[0]:
+                        best = (seconds, result, rss)
+                seconds, result, rss = best
+                if isinstance(result, dict):
+                    result = transcript_corpus.Expected(result["message"], result["asks_user_question"],
+                                                        tuple(result["tool_names"]))
+                ok = _result_matches(strategy, result, expected)
+                results[f"{label}/{strategy}"] = {"mb_per_s": round(size_mb / seconds, 1), "seconds": round(seconds, 4),
+                                                 "peak_rss_mb": round(rss, 1), "ok": ok}
+                print(f"{label:>8} {strategy:<24}{size_mb / seconds:>12,.1f}{seconds:>10.3f}{rss:>10.1f}  "
+                      f"{'yes' if ok else 'MISMATCH'}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    if not all(r["ok"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the raw-byte assistant prefilter against decoding every transcript line.
+
+Generates a large synthetic transcript with benchmarks/transcript_corpus.py,
+dominated by user prompts and big tool_result entries, then compares lines/sec
+for the forward scans from bench_transcript_parse:
+
+- baseline:  the original loop (text mode, strip, json.loads on every line)
+- prefilter: raw-byte role check, decoding only candidate lines
+
+Both loops run over the whole file so the numbers measure per-line cost, not
+the early exit of the reverse reader.
+
+Usage:
+    python benchmarks/bench_transcript_prefilter.py [--size 200MB] [--seed 0]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+import macos_notification  # noqa: E402
+import transcript_corpus  # noqa: E402
+from bench_transcript_parse import forward_json, forward_prefilter  # noqa: E402
+
+# Mostly user prompts and tool output, as in a long agentic session
+MIX = "user=3,text=1,tool_use=1,tool_result=4,ask=0,system=0.3,malformed=0.1"
+
+
+def timed(fn, path, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(macos_notification, path)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="200MB", help="transcript size, e.g. 50MB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transcript.jsonl")
+        transcript_corpus.generate(path, transcript_corpus.parse_size(args.size), seed=args.seed,
+                                   mix=transcript_corpus.parse_mix(MIX))
+        with open(path, "rb") as f:
+            lines = sum(1 for _ in f)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"transcript: {lines} lines, {size_mb:.1f} MB, "
+              f"decoder: {macos_notification._json_loads.__module__}")
+
+        base_time, base_result = timed(forward_json, path, args.repeat)
+        fast_time, fast_result = timed(forward_prefilter, path, args.repeat)
+        assert base_result == fast_result, (base_result, fast_result)
+
+        for name, elapsed in (("baseline", base_time), ("prefilter", fast_time)):
+            print(f"{name:>10}: {lines / elapsed:>12,.0f} lines/s  "
+                  f"{size_mb / elapsed:>8.1f} MB/s  ({elapsed:.3f}s)")
+        print(f"   speedup: {base_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
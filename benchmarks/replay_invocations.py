@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Replay recorded hook invocations against stubbed channels as a load test.
+
+Reads recordings written by hooks/hook_recorder.py (setting record_invocations)
+and runs each one through the dispatcher as a fresh process, as Claude Code
+would, with:
+
+- a stub terminal-notifier first on PATH (desktop_backend forced to macos)
+- a local HTTP stand-in for the Slack app
+- an empty HOME, so caches and shared state start cold
+
+Invocations start at their recorded spacing divided by --speed (1 for real
+time, 10 for ten times faster, or "max" to start them as fast as
+--concurrency allows). Each transcript is cut back to the size recorded for the
+invocation, so the hook sees what it saw live; recordings whose transcript is
+gone get a small synthetic one from transcript_corpus.py.
+
+Reports throughput, the spread between scheduled and actual start (lag), and
+latency percentiles overall and per event, plus what reached each channel.
+
+Usage:
+    python benchmarks/replay_invocations.py [RECORDINGS] [--speed 1|N|max] [--concurrency 32]
+        [--limit N] [--env KEY=VALUE] [--slack-delay 0] [--json results.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HOOKS_DIR = ROOT / "hooks"
+DISPATCH = HOOKS_DIR / "notifications_dispatch.py"
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HOOKS_DIR))
+import hook_recorder  # noqa: E402
+from hook_metrics import percentile  # noqa: E402
+from tests.slack_stub import SlackStub  # noqa: E402
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+transcript_corpus = _load("transcript_corpus", Path(__file__).parent / "transcript_corpus.py")
+
+# Appends one line per notification, so desktop deliveries can be counted
+STUB_NOTIFIER = "#!/bin/sh\necho \"$@\" >> \"$(dirname \"$0\")/notifications.log\"\nexit 0\n"
+
+
+def distribution(samples):
+    """Summary of a list of seconds, in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {"count": len(samples), **{f"p{q}": round(percentile(ordered, q) * 1000, 1) for q in (50, 90, 95, 99)},
+            "max": round(max(samples) * 1000, 1)}
+
+
+class Snapshots:
+    """Transcripts cut back to recorded offsets, created once per (path, offset)."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.created = {}
+        self.fallback = None
+
+    def get(self, path, offset):
+        key = (path, offset)
+        if key not in self.created:
+            self.created[key] = self._snapshot(path, offset)
+        return self.created[key]
+
+    def _snapshot(self, path, offset):
+        try:
+            size = os.stat(path).st_size
+        except (OSError, TypeError):
+            return self._fallback()
+        if offset is None or offset >= size:
+            return path
+        snapshot = self.directory / f"transcript-{len(self.created)}.jsonl"
+        with open(path, "rb") as src, open(snapshot, "wb") as dst:
+            remaining = offset
+            while remaining:
+                chunk = src.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+        return str(snapshot)
+
+    def _fallback(self):
+        if self.fallback is None:
+            self.fallback = str(self.directory / "synthetic.jsonl")
+            transcript_corpus.generate(self.fallback, 64 << 10, seed=0, ending="text")
+        return self.fallback
+
+
+def replay(recordings, args, workdir):
+    """Run every recording through the dispatcher; return the report dict."""
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    notifier = bin_dir / "terminal-notifier"
+    notifier.write_text(STUB_NOTIFIER)
+    notifier.chmod(0o755)
+    home = workdir / "home"
+    home.mkdir()
+    snapshots = Snapshots(workdir)
+
+    jobs = []
+    for entry in recordings:
+        payload = dict(entry["payload"])
+        if payload.get("transcript_path") or entry.get("offset") is not None:
+            payload["transcript_path"] = snapshots.get(payload.get("transcript_path"), entry.get("offset"))
+        jobs.append((entry.get("ts", 0), entry.get("event", ""), json.dumps(payload).encode()))
+    if not jobs:
+        return None
+
+    results = []
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(args.concurrency)
+    first_ts = jobs[0][0]
+
+    with SlackStub(delay=args.slack_delay) as slack:
+        env = {**os.environ, "HOME": str(home), "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+               "CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url, "CLAUDE_NOTIFICATIONS_DESKTOP_BACKEND": "macos",
+               "CLAUDE_NOTIFICATIONS_USE_DAEMON": "false", "CLAUDE_NOTIFICATIONS_RECORD_INVOCATIONS": "false"}
+        env.update(item.split("=", 1) for item in args.env)
+
+        def run_one(event, stdin, scheduled):
+            try:
+                start = time.monotonic()
+                proc = subprocess.Popen([sys.executable, str(DISPATCH)], stdin=subprocess.PIPE,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+                proc.communicate(stdin)
+                end = time.monotonic()
+                with lock:
+                    results.append((event, start - scheduled, end - start, proc.returncode))
+            finally:
+                slots.release()
+
+        threads = []
+        replay_start = time.monotonic()
+        for ts, event, stdin in jobs:
+            scheduled = replay_start + (0 if args.speed is None else max(0.0, ts - first_ts) / args.speed)
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            thread = threading.Thread(target=run_one, args=(event, stdin, scheduled))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - replay_start
+        # Detached or coalesced deliveries may still be arriving
+        time.sleep(args.settle)
+        slack_posts = len(slack.posts)
+
+    notifications_log = bin_dir / "notifications.log"
+    desktop = len(notifications_log.read_text().splitlines()) if notifications_log.exists() else 0
+    events = sorted({event for event, *_ in results})
+    return {
+        "invocations": len(results),
+        "failed": sum(1 for *_, code in results if code != 0),
+        "seconds": round(elapsed, 3),
+        "throughput_per_s": round(len(results) / elapsed, 1) if elapsed else None,
+        "latency_ms": distribution([latency for _, _, latency, _ in results]),
+        "lag_ms": distribution([lag for _, lag, _, _ in results]),
+        "per_event_latency_ms": {event: distribution([lat for e, _, lat, _ in results if e == event])
+                                 for event in events},
+        "delivered": {"slack": slack_posts, "desktop": desktop},
+    }
+
+
+def print_report(report, speed):
+    print(f"replayed {report['invocations']} invocations at {'max' if speed is None else f'{speed:g}x'} speed "
+          f"in {report['seconds']:.2f}s ({report['throughput_per_s']}/s), {report['failed']} failed")
+    print(f"delivered: {report['delivered']['slack']} to Slack, {report['delivered']['desktop']} to the desktop")
+    print(f"{'':<24}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = [("latency", report["latency_ms"]), ("start lag", report["lag_ms"])]
+    rows += [(f"  {event or '(none)'}", dist) for event, dist in report["per_event_latency_ms"].items()]
+    for name, dist in rows:
+        if dist["count"]:
+            print(f"{name:<24}{dist['count']:>7}{dist['p50']:>10.1f}{dist['p90']:>10.1f}{dist['p95']:>10.1f}"
+                  f"{dist['p99']:>10.1f}{dist['max']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recordings", nargs="?", help="recordings file (default ~/.claude/logs/invocations.jsonl "
+                                                      "and its rotated segments)")
+    parser.add_argument("--speed", default="1", help='replay speed multiplier, or "max"')
+    parser.add_argument("--concurrency", type=int, default=32, help="most hook processes running at once")
+    parser.add_argument("--limit", type=int, help="replay only the first N recordings")
+    parser.add_argument("--env", action="append", default=[], help="extra KEY=VALUE for the hooks (repeatable)")
+    parser.add_argument("--slack-delay", type=float, default=0.0, help="seconds the Slack stand-in takes per post")
+    parser.add_argument("--settle", type=float, default=0.5, help="seconds to wait for late deliveries")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+    if args.speed == "max":
+        args.speed = None
+    else:
+        args.speed = float(args.speed)
+        if args.speed <= 0:
+            parser.error("--speed must be positive or max")
+
+    recordings = sorted(hook_recorder.read_recordings(args.recordings), key=lambda entry: entry.get("ts", 0))
+    if args.limit:
+        recordings = recordings[:args.limit]
+
+    with tempfile.TemporaryDirectory(prefix="hook-replay-") as tmp:
+        report = replay(recordings, args, Path(tmp))
+    if report is None:
+        print("no recordings to replay")
+        sys.exit(1)
+
+    print_report(report, args.speed)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Deterministic generator for realistic synthetic Claude transcripts.
+
+Writes a JSONL transcript of a requested size from a seed: the same seed, size
+and options always produce the same bytes. Entries are drawn from a weighted
+mix of:
+
+- user:         plain user prompts
+- text:         assistant replies with only a text block
+- tool_use:     assistant replies with text and one or more tool_use blocks
+- tool_result:  user entries carrying tool output, sized log-normally around a few KB
+- ask:          assistant replies calling AskUserQuestion
+- system:       non-message entries (summaries, system notices)
+- malformed:    truncated JSON, stray bytes and blank lines
+
+Optionally a multi-MB entry (a huge tool_result or a huge assistant reply,
+alternately) is inserted every --huge-every bytes. Output is written in 1 MiB
+chunks, so GB-sized transcripts need no more memory than the largest entry.
+
+generate() returns what the hooks should find in the written transcript: the
+message and tool names of its last well-formed assistant entry.
+
+Usage:
+    python benchmarks/transcript_corpus.py out.jsonl --size 1GB [--seed 0]
+        [--mix user=3,text=2,tool_use=4,tool_result=4,ask=0.2,system=0.3,malformed=0.1]
+        [--huge-every 64MB --huge-size 8MB] [--ending ask] [--expected expected.json]
+"""
+
+import argparse
+import json
+import math
+import random
+from collections import namedtuple
+
+DEFAULT_MIX = {"user": 3, "text": 2, "tool_use": 4, "tool_result": 4, "ask": 0.2, "system": 0.3, "malformed": 0.1}
+
+ENDINGS = ("text", "tool_use", "ask", "tool_result", "huge")
+
+TOOLS = ("Bash", "Read", "Edit", "Grep", "Glob", "Write", "WebFetch", "TodoWrite")
+
+WORDS = (
+    "the test suite passes after updating the parser and fixing an off by one error in the "
+    "reverse reader so large transcripts no longer need a full scan we should also check the "
+    "config loader handles missing files and the Slack app returns quickly when it is down "
+    "here is the function you requested it reads the file in blocks from the end and stops "
+    "at the first assistant entry which keeps hook latency flat as the session grows"
+).split()
+
+# Units accepted by parse_size()
+UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+CHUNK_BYTES = 1 << 20
+
+# Characters of the expected message written by --expected; more than any
+# notification keeps, and small enough that reading it back stays cheap
+EXPECTED_MESSAGE_CHARS = 16384
+
+Expected = namedtuple("Expected", ["message", "asks_user_question", "tool_names"])
+
+
+def parse_size(text):
+    """Parse a size such as "512KB", "50MB" or "2GB" into bytes."""
+    text = text.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * UNITS[unit])
+    return int(text)
+
+
+def parse_mix(text):
+    """Parse "user=3,text=2,..." into a weights dict, starting from DEFAULT_MIX."""
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"unknown entry kind {name!r}; expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight)
+    return mix
+
+
+class _Generator:
+    """Builds transcript entries from one seeded random stream."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        # A pool of prose that text is sliced from, far cheaper than drawing every word
+        self.pool = " ".join(self.rng.choice(WORDS) for _ in range(200_000))
+        self.counter = 0
+
+    def text(self, length):
+        """Deterministic prose of exactly length characters, never starting with a space."""
+        chunks = []
+        while length > 0:
+            start = self.rng.randrange(len(self.pool) - 1024)
+            while self.pool[start] == " ":
+                start += 1
+            piece = self.pool[start:start + min(length, len(self.pool) - start)]
+            chunks.append(piece)
+            length -= len(piece)
+        return "".join(chunks)
+
+    def sentence(self):
+        return self.text(self.rng.randint(20, 300)).rstrip() + "."
+
+    def envelope(self, kind, message):
+        self.counter += 1
+        return {"type": kind, "uuid": f"{self.counter:012x}", "sessionId": "synthetic",
+                "timestamp": f"2025-01-01T00:00:{self.counter % 60:02d}.000Z", "message": message}
+
+    def tool_use(self, name=None):
+        name = name or self.rng.choice(TOOLS)
+        return {"type": "tool_use", "id": f"toolu_{self.rng.getrandbits(48):012x}", "name": name,
+                "input": {"command": self.sentence()} if name != "AskUserQuestion" else
+                {"questions": [{"question": "Which approach should I take?",
+                                "options": [{"label": "A"}, {"label": "B"}]}]}}
+
+    def entry(self, kind):
+        """Return (entry or raw line, content blocks if the entry is an assistant reply)."""
+        rng = self.rng
+        if kind == "user":
+            return self.envelope("user", {"role": "user", "content": self.sentence()}), None
+        if kind == "text":
+            text = " ".join(self.sentence() for _ in range(rng.randint(1, 6)))
+            return self.assistant([{"type": "text", "text": text}])
+        if kind == "tool_use":
+            blocks = [{"type": "text", "text": self.sentence()}]
+            blocks += [self.tool_use() for _ in range(rng.randint(1, 3))]
+            return self.assistant(blocks)
+        if kind == "ask":
+            return self.assistant([{"type": "text", "text": self.sentence()}, self.tool_use("AskUserQuestion")])
+        if kind == "tool_result":
+            size = min(2 << 20, int(math.exp(rng.gauss(8, 1.2))))
+            return self.tool_result(size), None
+        if kind == "system":
+            return {"type": rng.choice(["summary", "system"]), "summary": self.sentence(),
+                    "leafUuid": f"{self.counter:012x}"}, None
+        if kind == "malformed":
+            line = json.dumps(self.envelope("assistant", {"role": "assistant", "content": [
+                {"type": "text", "text": self.sentence()}]}))
+            return rng.choice([line[:rng.randrange(1, len(line))], "\x00\udcff garbage", ""]), None
+        raise ValueError(f"unknown entry kind {kind!r}")
+
+    def assistant(self, content):
+        entry = self.envelope("assistant", {"role": "assistant", "model": "synthetic", "content": content})
+        return entry, content
+
+    def tool_result(self, size):
+        tool_use_id = f"toolu_{self.rng.getrandbits(48):012x}"
+        return self.envelope("user", {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": tool_use_id, "content": self.text(size)}]})
+
+    def huge(self, size, assistant):
+        """A single entry of about size bytes: a long assistant reply or a big tool_result."""
+        if assistant:
+            return self.assistant([{"type": "text", "text": self.text(size)},
+                                   self.tool_use("Write")])
+        return self.tool_result(size), None
+
+
+def _expected(content):
+    message = None
+    tools = []
+    for block in content:
+        if block["type"] == "text" and message is None and block["text"].strip():
+            message = block["text"].strip()
+        elif block["type"] == "tool_use":
+            tools.append(block["name"])
+    return Expected(message, "AskUserQuestion" in tools, tuple(tools))
+
+
+def generate(path, size, seed=0, mix=None, huge_every=0, huge_size=8 << 20, ending="text"):
+    """
+    Write a synthetic transcript of about size bytes.
+
+    Args:
+        path: Output file path
+        size (int): Target size in bytes; the result overshoots by at most one entry
+        seed (int): Random seed; equal arguments give byte-identical output
+        mix (dict): Entry kind -> relative weight, defaults to DEFAULT_MIX
+        huge_every (int): Insert a huge entry every this many bytes (0 for none)
+        huge_size (int): Bytes per huge entry
+        ending (str): Kind of the final entry, one of ENDINGS; "tool_result"
+                      leaves a user entry after the last assistant reply, "huge"
+                      ends with a huge_size assistant reply
+
+    Returns:
+        Expected: The message, AskUserQuestion flag and tool names of the last
+        well-formed assistant entry, or Expected(None, False, ()) if there is none
+    """
+    gen = _Generator(seed)
+    weights = mix or DEFAULT_MIX
+    kinds = [k for k in weights if weights[k] > 0]
+    kind_weights = [weights[k] for k in kinds]
+    expected = Expected(None, False, ())
+    written = 0
+    next_huge = huge_every
+    huge_assistant = False
+    buffer = []
+    buffered = 0
+
+    with open(path, "wb") as f:
+        def emit(entry, content):
+            nonlocal written, buffered, expected
+            line = (entry if isinstance(entry, str) else json.dumps(entry, ensure_ascii=False)) + "\n"
+            data = line.encode("utf-8", "surrogateescape")
+            buffer.append(data)
+            buffered += len(data)
+            written += len(data)
+            if content is not None:
+                expected = _expected(content)
+            if buffered >= CHUNK_BYTES:
+                f.write(b"".join(buffer))
+                buffer.clear()
+                buffered = 0
+
+        while written < size:
+            if huge_every and written >= next_huge:
+                emit(*gen.huge(huge_size, huge_assistant))
+                huge_assistant = not huge_assistant
+                next_huge += huge_every
+                continue
+            emit(*gen.entry(gen.rng.choices(kinds, kind_weights)[0]))
+
+        if ending == "tool_result":
+            emit(*gen.entry("tool_use"))
+            emit(gen.tool_result(256), None)
+        elif ending == "huge":
+            emit(*gen.huge(huge_size, True))
+        else:
+            emit(*gen.entry(ending))
+        f.write(b"".join(buffer))
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="transcript file to write")
+    parser.add_argument("--size", default="10MB", help="target size, e.g. 500KB, 50MB, 2GB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", default="", help="entry weights, e.g. tool_result=8,malformed=1")
+    parser.add_argument("--huge-every", default="0", help="insert a huge entry every N bytes, e.g. 64MB")
+    parser.add_argument("--huge-size", default="8MB", help="size of each huge entry")
+    parser.add_argument("--ending", choices=ENDINGS, default="text", help="kind of the final entry")
+    parser.add_argument("--expected", help="write the expected result as JSON to this file, "
+                                           f"message cut to {EXPECTED_MESSAGE_CHARS} characters")
+    args = parser.parse_args()
+
+    expected = generate(args.path, parse_size(args.size), args.seed, parse_mix(args.mix),
+                        parse_size(args.huge_every), parse_size(args.huge_size), args.ending)
+    if args.expected:
+        with open(args.expected, "w", encoding="utf-8") as f:
+            json.dump(expected._replace(message=expected.message and expected.message[:EXPECTED_MESSAGE_CHARS])
+                      ._asdict(), f)
+    print(json.dumps({"message": (expected.message or "")[:80], "asks_user_question": expected.asks_user_question,
+                      "tool_names": list(expected.tool_names)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker whose state is shared by all hook processes.
+
+After circuit_failure_threshold consecutive failures the circuit opens and
+callers skip the endpoint for circuit_cooldown_seconds. Once the cooldown ends,
+exactly one caller is let through as a half-open probe: its success closes the
+circuit, its failure opens it for another cooldown. The failure count and
+timestamps live in a shared_state file, so the breaker works across the
+short-lived hook processes.
+"""
+
+import time
+
+import hook_config
+import shared_state
+
+
+class CircuitBreaker:
+    """Shared circuit breaker for one endpoint, stored as ~/.claude/cache/circuit_{name}.json."""
+
+    def __init__(self, name):
+        self.state_name = f"circuit_{name}"
+
+    def allow(self, probe_timeout=10):
+        """
+        Decide whether a call may go ahead.
+
+        Args:
+            probe_timeout (float): Seconds a half-open probe may take before
+                                   another caller is allowed to probe instead
+
+        Returns:
+            bool: False while the circuit is open or another caller is probing
+        """
+        now = time.time()
+        with shared_state.locked_state(self.state_name) as state:
+            if state.get("open_until", 0) == 0:
+                return True
+            if now < state["open_until"] or now < state.get("probe_until", 0):
+                return False
+            state["probe_until"] = now + probe_timeout
+            return True
+
+    def record_success(self):
+        """Close the circuit and reset the failure count."""
+        with shared_state.locked_state(self.state_name) as state:
+            state.clear()
+
+    def record_failure(self):
+        """
+        Count a failure, opening the circuit once the threshold is reached.
+
+        Returns:
+            bool: True if the circuit is now open
+        """
+        now = time.time()
+        with shared_state.locked_state(self.state_name) as state:
+            state["failures"] = state.get("failures", 0) + 1
+            state.pop("probe_until", None)
+            if state["failures"] >= hook_config.get("circuit_failure_threshold", 3):
+                state["open_until"] = now + hook_config.get("circuit_cooldown_seconds", 60)
+                return True
+            return False
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Per-project coalescing of notification bursts.
+
+Deliveries are keyed by project group (see project_identity; it is also the
+desktop notification group) and session. The first event for a key is
+delivered right away and opens a window of coalesce_window_seconds. Events that
+arrive while the window is open are not delivered; they are merged into one
+pending job that keeps the latest message and counts the events. The first
+merged event schedules a flush for the end of the window, which delivers the
+pending job and opens a new window.
+
+Windows and pending jobs live in the shared_state file "coalesce", so hook
+processes started independently coalesce with each other.
+"""
+
+import time
+
+import hook_config
+import project_identity
+import shared_state
+
+STATE_NAME = "coalesce"
+
+# admit() outcomes
+DELIVER = "deliver"      # deliver the returned job now
+SCHEDULE = "schedule"    # merged; the caller must start a flush for the key
+MERGED = "merged"        # merged into a pending job whose flush is already scheduled
+
+
+def window_seconds():
+    return hook_config.get("coalesce_window_seconds", 3.0)
+
+
+def coalesce_key(session_id, cwd=None):
+    """Key for a session and the project group of cwd (default: the working directory)."""
+    return f"{project_identity.resolve(cwd).group}:{session_id}"
+
+
+def _merge(pending, job):
+    """Fold job into a pending job: the latest fields win and the count grows."""
+    count = pending.get("count", 1) if pending else 0
+    return {**job, "count": count + job.get("count", 1)}
+
+
+def admit(key, job, now=None):
+    """
+    Decide whether job is delivered now or merged into its key's window.
+
+    A pending job whose flush is overdue by a whole window is assumed orphaned
+    (its flush worker died) and is delivered together with job.
+
+    Args:
+        key (str): Coalescing key, normally from coalesce_key()
+        job (dict): Notification job
+        now (float): Current time.time(), for tests
+
+    Returns:
+        tuple: (outcome, job) where outcome is DELIVER, SCHEDULE or MERGED and
+               job is what to deliver for DELIVER (it may carry a "count")
+    """
+    window = window_seconds()
+    if window <= 0:
+        return DELIVER, job
+    now = time.time() if now is None else now
+    with shared_state.locked_state(STATE_NAME) as state:
+        for stale in [k for k, e in state.items() if now >= e["until"] and "pending" not in e]:
+            del state[stale]
+
+        entry = state.get(key)
+        if entry is None:
+            state[key] = {"until": now + window}
+            return DELIVER, job
+        if "pending" in entry and now >= entry["until"] + window:
+            merged = _merge(entry["pending"], job)
+            state[key] = {"until": now + window}
+            return DELIVER, merged
+
+        scheduled = "pending" in entry
+        entry["pending"] = _merge(entry.get("pending"), job)
+        return (MERGED if scheduled else SCHEDULE), entry["pending"]
+
+
+def collect(key):
+    """
+    Wait for key's window to close, then take its pending job.
+
+    Taking the job opens a new window, since the caller is about to deliver it.
+
+    Returns:
+        dict: The merged job, or None if nothing is pending
+    """
+    with shared_state.locked_state(STATE_NAME) as state:
+        entry = state.get(key)
+        if not entry or "pending" not in entry:
+            return None
+        until = entry["until"]
+    time.sleep(max(0.0, until - time.time()))
+    with shared_state.locked_state(STATE_NAME) as state:
+        entry = state.get(key)
+        if not entry or "pending" not in entry:
+            return None
+        state[key] = {"until": time.time() + window_seconds()}
+        return entry["pending"]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Client side of the optional notification daemon.
+
+Hooks call forward() before handling an event themselves: if a daemon accepts
+the payload they exit immediately. This module only needs socket and json, so
+hooks never import the server (socketserver, argparse, signal) to forward.
+
+Wire format: the client sends one JSON line
+{"hook": <event>, "payload": <raw stdin>, "cwd": <client working directory>}
+and the daemon answers "ok" once the payload is parsed, before delivering it.
+The daemon's own working directory says nothing about the project, so a payload
+without a cwd is delivered for the client's.
+"""
+
+import json
+import os
+import socket
+from pathlib import Path
+
+import hook_config
+
+# Seconds a hook waits for the daemon to accept a payload before falling back
+CLIENT_TIMEOUT = 1.0
+
+
+def default_socket_path():
+    return Path(hook_config.get("daemon_socket", str(Path.home() / ".claude" / "run" / "notifications.sock")))
+
+
+def forward(hook_event, raw_payload, socket_path=None, timeout=CLIENT_TIMEOUT):
+    """
+    Hand a hook's stdin payload to a running daemon.
+
+    Args:
+        hook_event (str): Hook event name, e.g. "Stop"
+        raw_payload (str): The hook's stdin, unparsed
+        socket_path (Path): Daemon socket; defaults to default_socket_path()
+        timeout (float): Seconds to wait for the daemon to accept
+
+    Returns:
+        bool: True if the daemon accepted the payload. False if no daemon is
+        running (or it did not answer), in which case the caller handles the
+        event itself.
+    """
+    if not hook_config.get("use_daemon", True):
+        return False
+    try:
+        cwd = os.getcwd()
+    except OSError:
+        cwd = None
+    request = json.dumps({"hook": hook_event, "payload": raw_payload, "cwd": cwd}).encode("utf-8") + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path or default_socket_path()))
+            sock.sendall(request)
+            sock.shutdown(socket.SHUT_WR)
+            return sock.recv(16).startswith(b"ok")
+    except OSError:
+        return False
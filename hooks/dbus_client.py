@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Minimal D-Bus client over a Unix socket, using only the standard library.
+
+Implements just what the Linux notification backend needs: SASL EXTERNAL
+authentication, the Hello handshake, method calls with replies, and enough of
+the wire format (marshalling of basic types, strings, arrays, structs, dict
+entries and variants) to send org.freedesktop.Notifications.Notify. It can also
+receive calls and send replies, so tests can run a stand-in notification
+service on a private bus.
+
+Variants are written from (signature, value) pairs and read back as bare values.
+"""
+
+import os
+import socket
+import struct
+from collections import namedtuple
+
+BUS_NAME = "org.freedesktop.DBus"
+BUS_PATH = "/org/freedesktop/DBus"
+
+METHOD_CALL, METHOD_RETURN, ERROR, SIGNAL = 1, 2, 3, 4
+NO_REPLY_EXPECTED = 0x1
+
+# Header field codes and the type of each field's value
+_FIELDS = {
+    1: ("path", "o"),
+    2: ("interface", "s"),
+    3: ("member", "s"),
+    4: ("error_name", "s"),
+    5: ("reply_serial", "u"),
+    6: ("destination", "s"),
+    7: ("sender", "s"),
+    8: ("signature", "g"),
+}
+_FIELD_CODES = {name: (code, sig) for code, (name, sig) in _FIELDS.items()}
+
+_FIXED = {"y": "B", "n": "h", "q": "H", "i": "i", "u": "I", "x": "q", "t": "Q", "d": "d", "h": "I"}
+_ALIGN = {"y": 1, "g": 1, "v": 1, "n": 2, "q": 2, "b": 4, "i": 4, "u": 4, "h": 4, "s": 4, "o": 4,
+          "a": 4, "x": 8, "t": 8, "d": 8, "(": 8, "{": 8}
+
+# One received message; fields maps header field names (e.g. "member") to values
+Message = namedtuple("Message", ["type", "flags", "serial", "fields", "body"])
+
+
+class DBusError(Exception):
+    """An error reply from the bus or the called service."""
+
+    def __init__(self, name, message=""):
+        super().__init__(f"{name}: {message}" if message else name)
+        self.name = name
+
+
+def _type_end(sig, i):
+    """Index just past the single complete type starting at sig[i]."""
+    c = sig[i]
+    if c == "a":
+        return _type_end(sig, i + 1)
+    if c in "({":
+        close = ")" if c == "(" else "}"
+        i += 1
+        while sig[i] != close:
+            i = _type_end(sig, i)
+        return i + 1
+    return i + 1
+
+
+def split_signature(sig):
+    """Split a signature into its complete types, e.g. "sa{sv}i" -> ["s", "a{sv}", "i"]."""
+    types, i = [], 0
+    while i < len(sig):
+        end = _type_end(sig, i)
+        types.append(sig[i:end])
+        i = end
+    return types
+
+
+class _Writer:
+    def __init__(self, endian="<"):
+        self.endian = endian
+        self.buf = bytearray()
+
+    def align(self, n):
+        self.buf.extend(b"\0" * (-len(self.buf) % n))
+
+    def write(self, sig, value):
+        c = sig[0]
+        self.align(_ALIGN[c])
+        if c in _FIXED:
+            self.buf.extend(struct.pack(self.endian + _FIXED[c], value))
+        elif c == "b":
+            self.buf.extend(struct.pack(self.endian + "I", 1 if value else 0))
+        elif c in "so":
+            data = value.encode("utf-8")
+            self.buf.extend(struct.pack(self.endian + "I", len(data)) + data + b"\0")
+        elif c == "g":
+            data = value.encode("ascii")
+            self.buf.extend(struct.pack("B", len(data)) + data + b"\0")
+        elif c == "v":
+            inner_sig, inner = value
+            self.write("g", inner_sig)
+            self.write(inner_sig, inner)
+        elif c == "a":
+            element = sig[1:]
+            length_at = len(self.buf)
+            self.buf.extend(b"\0\0\0\0")
+            self.align(_ALIGN[element[0]])
+            start = len(self.buf)
+            items = value.items() if element[0] == "{" else value
+            for item in items:
+                self.write(element, item)
+            struct.pack_into(self.endian + "I", self.buf, length_at, len(self.buf) - start)
+        elif c in "({":
+            for inner_sig, inner in zip(split_signature(sig[1:-1]), value):
+                self.write(inner_sig, inner)
+        else:
+            raise ValueError(f"unsupported D-Bus type {c!r}")
+
+
+class _Reader:
+    def __init__(self, data, endian="<", offset=0):
+        self.data = data
+        self.endian = endian
+        self.pos = offset
+
+    def align(self, n):
+        self.pos += -self.pos % n
+
+    def unpack(self, fmt, size):
+        value = struct.unpack_from(self.endian + fmt, self.data, self.pos)[0]
+        self.pos += size
+        return value
+
+    def read(self, sig):
+        c = sig[0]
+        self.align(_ALIGN[c])
+        if c in _FIXED:
+            return self.unpack(_FIXED[c], struct.calcsize(_FIXED[c]))
+        if c == "b":
+            return bool(self.unpack("I", 4))
+        if c in "so":
+            length = self.unpack("I", 4)
+            value = self.data[self.pos:self.pos + length].decode("utf-8")
+            self.pos += length + 1
+            return value
+        if c == "g":
+            length = self.data[self.pos]
+            value = self.data[self.pos + 1:self.pos + 1 + length].decode("ascii")
+            self.pos += length + 2
+            return value
+        if c == "v":
+            return self.read(self.read("g"))
+        if c == "a":
+            element = sig[1:]
+            length = self.unpack("I", 4)
+            self.align(_ALIGN[element[0]])
+            end = self.pos + length
+            items = []
+            while self.pos < end:
+                items.append(self.read(element))
+            return dict(items) if element[0] == "{" else items
+        if c in "({":
+            return tuple(self.read(inner) for inner in split_signature(sig[1:-1]))
+        raise ValueError(f"unsupported D-Bus type {c!r}")
+
+
+def session_bus_address():
+    """Return $DBUS_SESSION_BUS_ADDRESS, or None when no session bus is advertised."""
+    return os.environ.get("DBUS_SESSION_BUS_ADDRESS") or None
+
+
+def _connect_socket(address, timeout):
+    """Open the first reachable unix: transport in a D-Bus address string."""
+    error = None
+    for transport in address.split(";"):
+        kind, _, params = transport.partition(":")
+        if kind != "unix":
+            continue
+        options = dict(p.split("=", 1) for p in params.split(",") if "=" in p)
+        if "path" in options:
+            target = options["path"]
+        elif "abstract" in options:
+            target = "\0" + options["abstract"]
+        else:
+            continue
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(target)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error or OSError(f"no usable unix transport in D-Bus address {address!r}")
+
+
+class Connection:
+    """
+    An authenticated connection to a message bus.
+
+    Args:
+        address (str): D-Bus address; defaults to the session bus
+        timeout (float): Socket timeout in seconds for every read and write
+
+    Raises:
+        OSError: If the bus cannot be reached or authentication fails
+    """
+
+    def __init__(self, address=None, timeout=5.0):
+        address = address or session_bus_address()
+        if not address:
+            raise OSError("DBUS_SESSION_BUS_ADDRESS is not set")
+        self.address = address
+        self._sock = _connect_socket(address, timeout)
+        self._buf = bytearray()
+        self._serial = 0
+        try:
+            self._authenticate()
+            self.unique_name = self.call(BUS_NAME, BUS_PATH, BUS_NAME, "Hello")[0]
+        except BaseException:
+            self.close()
+            raise
+
+    def _authenticate(self):
+        uid = str(os.getuid()).encode().hex().encode()
+        self._sock.sendall(b"\0AUTH EXTERNAL " + uid + b"\r\n")
+        while b"\r\n" not in self._buf:
+            self._fill()
+        line, _, rest = bytes(self._buf).partition(b"\r\n")
+        if not line.startswith(b"OK "):
+            raise OSError(f"D-Bus authentication rejected: {line.decode(errors='replace')}")
+        self._buf = bytearray(rest)
+        self._sock.sendall(b"BEGIN\r\n")
+
+    def _fill(self):
+        chunk = self._sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("D-Bus connection closed")
+        self._buf.extend(chunk)
+
+    def _take(self, n):
+        while len(self._buf) < n:
+            self._fill()
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        return data
+
+    def send(self, msg_type, fields, signature="", args=(), flags=0):
+        """
+        Send one message.
+
+        Args:
+            msg_type (int): METHOD_CALL, METHOD_RETURN, ERROR or SIGNAL
+            fields (dict): Header fields by name, e.g. {"member": "Notify"}
+            signature (str): Body signature
+            args (sequence): Body values, one per complete type in signature
+            flags (int): Header flags such as NO_REPLY_EXPECTED
+
+        Returns:
+            int: The message serial
+        """
+        body = _Writer()
+        for sig, value in zip(split_signature(signature), args):
+            body.write(sig, value)
+        if signature:
+            fields = {**fields, "signature": signature}
+
+        self._serial += 1
+        header = _Writer()
+        header.buf.extend(struct.pack("<cBBBII", b"l", msg_type, flags, 1, len(body.buf), self._serial))
+        header.write("a(yv)", [(_FIELD_CODES[name][0], (_FIELD_CODES[name][1], value))
+                               for name, value in fields.items()])
+        header.align(8)
+        self._sock.sendall(bytes(header.buf) + bytes(body.buf))
+        return self._serial
+
+    def receive(self):
+        """Block until the next message arrives and return it as a Message."""
+        fixed = self._take(16)
+        endian = "<" if fixed[0:1] == b"l" else ">"
+        msg_type, flags, _, body_length, serial, fields_length = struct.unpack(endian + "xBBBIII", fixed)
+        header_length = 16 + fields_length
+        rest = self._take(header_length + (-header_length % 8) - 16 + body_length)
+        data = fixed + rest
+
+        reader = _Reader(data, endian, 12)
+        fields = {}
+        for code, value in reader.read("a(yv)"):
+            if code in _FIELDS:
+                fields[_FIELDS[code][0]] = value
+
+        body_reader = _Reader(data[len(data) - body_length:], endian)
+        body = [body_reader.read(sig) for sig in split_signature(fields.get("signature", ""))]
+        return Message(msg_type, flags, serial, fields, body)
+
+    def call(self, destination, path, interface, member, signature="", args=()):
+        """
+        Call a method and wait for its reply, skipping unrelated messages.
+
+        Returns:
+            list: The reply body values
+
+        Raises:
+            DBusError: If the service replies with an error
+        """
+        serial = self.send(METHOD_CALL, {"path": path, "interface": interface, "member": member,
+                                         "destination": destination}, signature, args)
+        while True:
+            message = self.receive()
+            if message.fields.get("reply_serial") != serial:
+                continue
+            if message.type == ERROR:
+                raise DBusError(message.fields.get("error_name", "org.freedesktop.DBus.Error.Failed"),
+                                message.body[0] if message.body else "")
+            return message.body
+
+    def reply(self, call, signature="", args=()):
+        """Send a method return for a received METHOD_CALL message."""
+        return self.send(METHOD_RETURN, {"reply_serial": call.serial, "destination": call.fields["sender"]},
+                         signature, args)
+
+    def settimeout(self, timeout):
+        self._sock.settimeout(timeout)
+
+    def close(self):
+        self._sock.close()
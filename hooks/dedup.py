@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Drop end-of-turn notifications whose message was already delivered.
+
+An idle_prompt Notification usually repeats the assistant message the Stop hook
+just delivered. Both are checked under the kind TURN_END, keyed by session,
+the assistant entry's byte offset in the transcript and the message, so they
+collide only when they report the same entry; a later entry with the same text
+("Done.") is new. Permission prompts and other events that block the agent are
+never deduplicated.
+
+A key is recorded with record() once a delivery succeeds, not when it is
+checked, so a notification that failed or was dropped on the way is not
+suppressed. Delivered keys are remembered in the shared_state file "dedup" as
+a short hash and their delivery time; a repeat within dedup_ttl_seconds is
+dropped. The file keeps at most dedup_max_entries hashes, evicting the least
+recently seen first.
+"""
+
+import hashlib
+import time
+
+import hook_config
+import shared_state
+
+STATE_NAME = "dedup"
+
+# Kind shared by Stop events and idle_prompt Notifications: both report the end of a turn
+TURN_END = "turn_end"
+
+
+def message_key(session_id, kind, message, entry_offset=None):
+    """
+    Compact hash of one (session, kind, assistant entry, message) tuple.
+
+    Args:
+        session_id (str): Claude session the message belongs to
+        kind (str): Event kind; the same message under another kind is not a repeat
+        message (str): The notification message
+        entry_offset (int): Byte offset of the assistant entry the message came
+                            from (TranscriptAnalysis.offset), or None
+    """
+    data = "\0".join((session_id, kind, str(entry_offset), message)).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _expire(state, now, ttl):
+    for expired in [k for k, delivered_at in state.items() if now - delivered_at >= ttl]:
+        del state[expired]
+
+
+def is_duplicate(key, now=None):
+    """
+    Check a message key against recent deliveries without recording it.
+
+    Args:
+        key (str): From message_key()
+        now (float): Current time.time(), for tests
+
+    Returns:
+        bool: True if the key was delivered within the TTL and should be dropped
+    """
+    ttl = hook_config.get("dedup_ttl_seconds", 600)
+    if ttl <= 0:
+        return False
+    now = time.time() if now is None else now
+    with shared_state.locked_state(STATE_NAME) as state:
+        _expire(state, now, ttl)
+        delivered_at = state.pop(key, None)
+        if delivered_at is None:
+            return False
+        # Re-insert to mark it most recently seen, keeping the original delivery time
+        state[key] = delivered_at
+        return True
+
+
+def record(key, now=None):
+    """
+    Remember that the message with key was delivered.
+
+    Args:
+        key (str): From message_key()
+        now (float): Current time.time(), for tests
+    """
+    ttl = hook_config.get("dedup_ttl_seconds", 600)
+    if ttl <= 0:
+        return
+    now = time.time() if now is None else now
+    with shared_state.locked_state(STATE_NAME) as state:
+        _expire(state, now, ttl)
+        state.pop(key, None)
+        state[key] = now
+        max_entries = hook_config.get("dedup_max_entries", 256)
+        for evicted in list(state)[:max(0, len(state) - max_entries)]:
+            del state[evicted]
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Notification delivery shared by the Stop and Notification hooks.
+
+A hook builds a notification job (a JSON-serializable dict) and passes it to
+submit(), which coalesces it with a burst in progress (see coalesce), hands it
+to a background worker, or delivers it right away with deliver().
+
+With the setting delivery_mode = "detached", a hook validates its input, writes
+the notification job to a spool file under ~/.claude/cache/jobs and hands it to
+a background copy of itself started in a new session, then exits right away.
+The background process does the slow Slack POST and terminal-notifier call and
+logs the results to the hook's usual log file.
+
+Whichever process delivers, dispatch() sends to all channels at once on worker
+threads under one shared deadline (setting delivery_deadline, in seconds,
+default 2), so channel latencies overlap instead of adding up and a hung
+channel holds the hook for at most the deadline. The Slack channel spends
+whatever is left of the deadline after its own post draining the outbox.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from collections import namedtuple
+
+import hook_config
+
+# Command-line flag that turns a hook script into a background delivery worker
+DELIVER_FLAG = "--deliver"
+
+# Outcome of one channel send:
+#   channel: channel name, e.g. "Slack"
+#   status:  "ok", "failed" (sender returned False), "error" (sender raised)
+#            or "timeout" (still running when the deadline passed)
+#   latency: seconds from dispatch start until the sender returned or the deadline
+ChannelResult = namedtuple("ChannelResult", ["channel", "status", "latency"])
+
+
+def is_detached():
+    """Return True if hooks should hand notifications to a background worker."""
+    return hook_config.get("delivery_mode", "inline") == "detached"
+
+
+def _spool_dir():
+    return Path.home() / ".claude" / "cache" / "jobs"
+
+
+def spawn_detached(script_path, job):
+    """
+    Start a detached worker that delivers job, without waiting for it.
+
+    The job is passed through a spool file rather than a pipe, so a large message
+    never blocks the hook on the worker's startup. The worker runs in its own
+    session with stdio on /dev/null, so it does not hold the hook's pipes open.
+
+    Args:
+        script_path (str): Hook script to re-run with DELIVER_FLAG
+        job (dict): JSON-serializable notification job
+
+    Raises:
+        OSError: If the spool file or the worker process could not be created
+    """
+    spool_dir = _spool_dir()
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    fd, job_path = tempfile.mkstemp(dir=spool_dir, prefix="job-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        subprocess.Popen(
+            [sys.executable, str(script_path), DELIVER_FLAG, job_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except BaseException:
+        os.unlink(job_path)
+        raise
+
+
+def load_job(argv):
+    """
+    Return the job a detached worker was started with, consuming its spool file.
+
+    Args:
+        argv (list): The process arguments, normally sys.argv
+
+    Returns:
+        dict: The job, or None if this is a regular hook invocation
+    """
+    if len(argv) < 3 or argv[1] != DELIVER_FLAG:
+        return None
+    try:
+        with open(argv[2], "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        try:
+            os.unlink(argv[2])
+        except FileNotFoundError:
+            pass
+
+
+def dispatch(channels, deadline=None):
+    """
+    Send one notification to every channel concurrently under a shared deadline.
+
+    Each sender runs on its own daemon thread and is called with the whole
+    deadline as its timeout. Senders still running when the deadline passes are
+    reported as timed out and abandoned, so they cannot keep the hook alive.
+
+    Args:
+        channels (dict): Channel name -> callable(timeout) returning True on success
+        deadline (float): Overall budget in seconds; defaults to the
+                          delivery_deadline setting (2 seconds)
+
+    Returns:
+        list: A ChannelResult per channel, in the order given
+    """
+    if deadline is None:
+        deadline = hook_config.get("delivery_deadline", 2.0)
+    start = time.monotonic()
+    outcomes = {}
+
+    def run(name, send):
+        try:
+            status = "ok" if send(deadline) else "failed"
+        except Exception:
+            status = "error"
+        outcomes[name] = (status, time.monotonic() - start)
+
+    threads = []
+    for name, send in channels.items():
+        thread = threading.Thread(target=run, args=(name, send), name=f"dispatch-{name}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join(max(0.0, start + deadline - time.monotonic()))
+
+    return [
+        ChannelResult(name, *outcomes.get(name, ("timeout", time.monotonic() - start)))
+        for name in channels
+    ]
+
+
+def log_results(log, results):
+    """Log one line per channel outcome, with latency as a structured field."""
+    for result in results:
+        latency_ms = round(result.latency * 1000)
+        log.log(
+            "INFO" if result.status == "ok" else "WARNING",
+            f"{'✅' if result.status == 'ok' else '❌'} {result.channel} ({result.status}, {latency_ms} ms)",
+            channel=result.channel,
+            status=result.status,
+            latency_ms=latency_ms,
+        )
+
+
+def deliver(job, log, metrics):
+    """
+    Send a prepared notification job to Slack and the desktop concurrently.
+
+    Each outcome is logged and timed as channel_{name}. A job carrying a
+    dedup_key is recorded as delivered once any channel succeeds.
+
+    Args:
+        job (dict): Notification job with session_id, message, hook_type,
+                    subtitle, sound and optionally cwd, count and dedup_key
+        log (HookLogger): The hook's logger
+        metrics (MetricsRecorder): The hook's metrics recorder
+    """
+    import desktop_notification
+    import slack_notification
+
+    desktop = desktop_notification.get_backend()
+    count = job.get("count", 1)
+    subtitle = job["subtitle"] if count == 1 else f"{job['subtitle']} ({count} events)"
+    results = dispatch({
+        "Slack": lambda timeout: slack_notification.send_to_slack_app(
+            job["session_id"], job["message"], job["hook_type"], timeout=timeout, event_count=count,
+            cwd=job.get("cwd"),
+        ),
+        desktop.name: lambda timeout: desktop.notify(
+            job["message"], subtitle=subtitle, sound=job["sound"], timeout=timeout, cwd=job.get("cwd")
+        ),
+    })
+    log_results(log, results)
+    for result in results:
+        metrics.record(f"channel_{result.channel}", result.latency, status=result.status)
+    if job.get("dedup_key") and any(result.status == "ok" for result in results):
+        import dedup
+        dedup.record(job["dedup_key"])
+
+
+def submit(job, script_path, log, metrics, detach=None):
+    """
+    Deliver a job now, merge it into a burst in progress, or hand it to a background worker.
+
+    Args:
+        job (dict): Notification job, see deliver()
+        script_path (str): The hook script, re-run with DELIVER_FLAG for
+                           coalesced flushes and detached delivery
+        log (HookLogger): The hook's logger
+        metrics (MetricsRecorder): The hook's metrics recorder
+        detach (bool): Hand delivery to a background worker; defaults to the
+                       delivery_mode setting
+    """
+    import coalesce
+
+    key = coalesce.coalesce_key(job["session_id"], job.get("cwd"))
+    outcome, job = coalesce.admit(key, job)
+    if outcome == coalesce.MERGED:
+        log.info(f"🧺 Coalesced into pending notification ({job['count']} events)")
+        return
+    if outcome == coalesce.SCHEDULE:
+        try:
+            spawn_detached(script_path, {"coalesce_key": key})
+            log.info("🧺 Coalescing burst, delivery scheduled for the end of the window")
+        except OSError as e:
+            log.warning(f"⚠️ Could not schedule coalesced delivery: {e}")
+        return
+
+    if is_detached() if detach is None else detach:
+        try:
+            spawn_detached(script_path, job)
+            log.info("🚚 Handed off to background delivery")
+            return
+        except OSError as e:
+            log.warning(f"⚠️ Background delivery unavailable, sending inline: {e}")
+
+    deliver(job, log, metrics)
+
+
+def run_worker(argv, log, metrics):
+    """
+    Deliver the job a background worker was started with by spawn_detached(); never raises.
+
+    This is the whole of a hook script's main(). A job holding only a
+    coalesce_key waits for that burst's window to close and delivers the
+    merged job.
+
+    Args:
+        argv (list): The process arguments, normally sys.argv
+        log (HookLogger): The hook's logger
+        metrics (MetricsRecorder): The hook's metrics recorder
+    """
+    try:
+        job = load_job(argv)
+        if job is None:
+            log.warning("⚠️ Hook events are handled by notifications_dispatch.py; nothing to deliver")
+            return
+        if "coalesce_key" in job:
+            import coalesce
+            job = coalesce.collect(job["coalesce_key"])
+            if job:
+                log.info(f"🧺 Delivering coalesced notification ({job['count']} events)")
+                deliver(job, log, metrics)
+            return
+        log.info("📬 Delivering detached notification")
+        deliver(job, log, metrics)
+    except Exception as e:
+        log.error(f"❌ Background delivery failed: {e}")
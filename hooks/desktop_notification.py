@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Desktop notification backends.
+
+A backend shows one notification for the current project, stacking it with the
+project's earlier notifications:
+
+- MacOSBackend:  terminal-notifier, grouped with -group
+- LinuxBackend:  the freedesktop notification service over D-Bus, grouped with replaces_id
+
+get_backend() picks one from the desktop_backend setting: "macos", "linux", or
+"auto" (the default), which uses D-Bus on Linux when a session bus is advertised
+and terminal-notifier otherwise. Backend modules are imported on first use.
+NotificationBackend.notify() does the work every backend shares: it resolves the
+project, takes a token from desktop_rate_limiter (one bucket per project group)
+and trims the message, then hands off to the backend's _show().
+"""
+
+import sys
+from abc import ABC, abstractmethod
+
+import hook_config
+import hook_log
+import project_identity
+import rate_limit
+
+desktop_rate_limiter = rate_limit.RateLimiter("desktop")
+
+# Longest message body shown, including the rate-limit note
+MAX_MESSAGE_LENGTH = 200
+
+
+class NotificationBackend(ABC):
+    """
+    Base class for desktop notification backends.
+
+    notify() resolves the project, takes a token from desktop_rate_limiter and
+    trims the message; subclasses only implement _show() for their platform.
+    """
+
+    # Channel name used in delivery results and logs
+    name = ""
+    # Log file under ~/.claude/logs for this backend's messages
+    log_file = ""
+
+    def notify(self, message, subtitle="", sound="Glass", timeout=5, cwd=None):
+        """
+        Show one notification for a project.
+
+        Args:
+            message (str): The notification message body
+            subtitle (str): e.g. "Needs Input" or "Task Complete"
+            sound (str): macOS sound name ("Glass", "Hero", "Tink"); "" is silent
+            timeout (float): Seconds the backend may take
+            cwd (str): The hook payload's cwd; defaults to the working directory
+
+        Returns:
+            bool: True if the notification was shown, False if it failed or
+            was dropped by the rate limiter
+        """
+        log = hook_log.get_logger(self.log_file)
+        try:
+            project = project_identity.resolve(cwd)
+            title, group_id = f"Claude - {project.name}", project.group
+        except OSError as e:
+            log.warning(f"⚠️ Could not resolve project name: {e}")
+            title, group_id = "Claude", ""
+
+        dropped = desktop_rate_limiter.acquire(group_id)
+        if dropped is None:
+            log.info(f"🚦 Desktop rate limit reached for '{group_id}', dropping notification")
+            return False
+        note = rate_limit.suppressed_note(dropped)
+
+        max_length = MAX_MESSAGE_LENGTH - len(note)
+        body = (message[:max_length - 3] + "..." if len(message) > max_length else message) + note
+        return self._show(title, subtitle, body, sound, group_id, timeout)
+
+    @abstractmethod
+    def _show(self, title, subtitle, body, sound, group_id, timeout):
+        """
+        Display an already rate-limited and trimmed notification.
+
+        Args:
+            title (str): "Claude - {project name}"
+            subtitle (str): e.g. "Needs Input"; may be empty
+            body (str): The message, trimmed and with any rate-limit note
+            sound (str): macOS sound name; "" is silent
+            group_id (str): The project group notifications stack under
+            timeout (float): Seconds the backend may take
+
+        Returns:
+            bool: True if the notification was shown
+        """
+
+
+class MacOSBackend(NotificationBackend):
+    name = "macOS"
+    log_file = "macos_notification.log"
+
+    def _show(self, title, subtitle, body, sound, group_id, timeout):
+        import macos_notification
+        return macos_notification.show_macos_notification(title, subtitle, body, sound, group_id, timeout)
+
+
+class LinuxBackend(NotificationBackend):
+    name = "Linux"
+    log_file = "linux_notification.log"
+
+    def _show(self, title, subtitle, body, sound, group_id, timeout):
+        import linux_notification
+        return linux_notification.show_linux_notification(title, subtitle, body, sound, group_id, timeout)
+
+
+BACKENDS = {"macos": MacOSBackend, "linux": LinuxBackend}
+
+
+def get_backend():
+    """Return the NotificationBackend selected by the desktop_backend setting."""
+    choice = hook_config.get("desktop_backend", "auto")
+    if choice in BACKENDS:
+        return BACKENDS[choice]()
+    if sys.platform.startswith("linux"):
+        import dbus_client
+        if dbus_client.session_bus_address():
+            return LinuxBackend()
+    return MacOSBackend()
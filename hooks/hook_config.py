@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Configuration lookup for the Claude notification hooks.
+
+Settings are read from ~/.claude/notifications.json (a flat JSON object) and can
+be overridden per process with environment variables named
+CLAUDE_NOTIFICATIONS_<KEY>, e.g. CLAUDE_NOTIFICATIONS_LOG_LEVEL=INFO overrides
+"log_level". Environment values are converted to the type of the default.
+"""
+
+import json
+import os
+from pathlib import Path
+
+ENV_PREFIX = "CLAUDE_NOTIFICATIONS_"
+
+# Parsed config files, keyed by path, so each file is read once per process
+_file_cache = {}
+
+
+def config_path():
+    return Path.home() / ".claude" / "notifications.json"
+
+
+def load_config():
+    """Return the settings from the config file, or an empty dict if missing or invalid."""
+    path = config_path()
+    if path not in _file_cache:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        _file_cache[path] = data if isinstance(data, dict) else {}
+    return _file_cache[path]
+
+
+def reload():
+    """Forget cached config files so the next lookup re-reads them."""
+    _file_cache.clear()
+
+
+def _coerce(value, default):
+    """Convert an environment string to the type of default."""
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def get(key, default=None):
+    """
+    Look up a setting: environment variable first, then the config file, then default.
+
+    Args:
+        key (str): Setting name as used in notifications.json, e.g. "log_level"
+        default: Value returned when the setting is not configured
+
+    Returns:
+        The configured value, converted to the type of default when it came from
+        the environment and default is a bool, int or float
+    """
+    env_value = os.environ.get(ENV_PREFIX + key.upper())
+    if env_value is not None:
+        try:
+            return _coerce(env_value, default)
+        except ValueError:
+            return default
+    return load_config().get(key, default)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Which hook events notify, and which module handles each.
+
+Shared by the dispatcher, the notification daemon and the Notification hook.
+Kept free of imports so the dispatcher can decide whether an event notifies
+before loading anything else.
+"""
+
+# Hook event name -> module whose handle(payload) notifies for it
+EVENT_MODULES = {
+    "Stop": "notifications_stop",
+    "Notification": "notifications_notification",
+}
+
+# Hook event name -> log file and metrics name its hook writes to, so the
+# dispatcher can log a forwarded event without importing the hook module
+EVENT_LOGS = {
+    "Stop": "stop_hook.log",
+    "Notification": "notification_hook.log",
+}
+EVENT_METRICS = {
+    "Stop": "stop",
+    "Notification": "notification",
+}
+
+# Notification types that mean the agent is blocked and needs user action
+ACTIONABLE_NOTIFICATION_TYPES = {"permission_prompt", "idle_prompt", "elicitation_dialog"}
+
+
+def needs_handling(event, payload):
+    """Return True if event may produce a notification, judging from the payload alone."""
+    if event not in EVENT_MODULES:
+        return False
+    if event == "Notification":
+        return payload.get("notification_type", "") in ACTIONABLE_NOTIFICATION_TYPES
+    return True
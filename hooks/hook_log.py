@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Buffered logging shared by the Claude notification hooks.
+
+Log records are kept in memory during a hook run and written to
+~/.claude/logs/{log_file} with a single O_APPEND write per file when the process
+exits (or flush_all() is called), instead of a mkdir/open/close per line.
+
+Log files are rotated when they grow past log_max_bytes or when the current
+file is older than log_max_age_days. Rotated segments are named
+{log_file}.{YYYYmmdd-HHMMSS.ffffff}-{pid}, optionally gzipped, and only the newest
+log_backup_count are kept. Rotation is guarded by an flock on {log_file}.lock,
+so concurrent hook processes never rotate the same file twice; a writer that
+still holds the old file open simply appends to the freshly rotated segment.
+
+Settings (see hook_config):
+- log_level:          DEBUG (default), INFO, WARNING, ERROR or OFF
+- log_format:         "text" (default, "[timestamp] message") or "json" for JSON lines
+- log_max_bytes:      rotate when a log file would exceed this size (default 5 MiB, 0 disables)
+- log_max_age_days:   rotate when the current file is older than this (default 7, 0 disables)
+- log_backup_count:   rotated segments kept per log file (default 5)
+- log_compress:       gzip rotated segments (default true)
+- log_max_record_chars: truncate longer messages, e.g. full payload dumps (default 2000)
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from datetime import datetime
+
+import hook_config
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "OFF": 100}
+
+# Buffered bytes per logger that force an early flush, bounding memory use
+MAX_BUFFER_BYTES = 256 * 1024
+
+# Rotated segments written to within this many seconds are not compressed yet,
+# since a concurrent writer may still be appending to them
+COMPRESS_GRACE_SECONDS = 5
+
+
+def log_dir():
+    return Path.home() / ".claude" / "logs"
+
+
+def _open_log(path):
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    try:
+        return os.open(path, flags, 0o644)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(path, flags, 0o644)
+
+
+def _segments(path):
+    """Rotated segments of a log file, newest first."""
+    prefix = path.name + "."
+    names = [
+        name for name in os.listdir(path.parent)
+        if name.startswith(prefix) and name[len(prefix):len(prefix) + 1].isdigit()
+        and not name.endswith(".tmp")
+    ]
+    return [path.parent / name for name in sorted(names, reverse=True)]
+
+
+def _compress_and_prune(path):
+    """
+    Gzip and prune rotated segments of path. Must be called with the rotation lock held.
+
+    The newest segment, and any segment modified in the last COMPRESS_GRACE_SECONDS,
+    is left uncompressed because a concurrent writer may still be appending to it;
+    it is compressed at a later rotation.
+    """
+    import gzip
+    import shutil
+
+    segments = _segments(path)
+    for segment in segments[hook_config.get("log_backup_count", 5):]:
+        segment.unlink(missing_ok=True)
+    del segments[hook_config.get("log_backup_count", 5):]
+
+    if not hook_config.get("log_compress", True):
+        return
+    for segment in segments[1:]:
+        if segment.suffix == ".gz" or time.time() - segment.stat().st_mtime < COMPRESS_GRACE_SECONDS:
+            continue
+        tmp_path = segment.with_name(segment.name + ".gz.tmp")
+        with open(segment, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, segment.with_name(segment.name + ".gz"))
+        segment.unlink()
+
+
+def _rotate_if_needed(path, fd, incoming):
+    """
+    Rotate path if appending incoming bytes would exceed the size limit, or if the
+    current file is older than the age limit.
+
+    Returns:
+        bool: True if path no longer refers to the file open as fd, meaning the
+        caller should reopen it before writing
+    """
+    max_bytes = hook_config.get("log_max_bytes", 5 * 1024 * 1024)
+    max_age = hook_config.get("log_max_age_days", 7) * 86400
+    lock_path = path.with_name(path.name + ".lock")
+
+    try:
+        # The lock file's mtime marks when the current file was started
+        started = os.stat(lock_path).st_mtime
+    except FileNotFoundError:
+        lock_path.touch()
+        started = time.time()
+
+    size = os.fstat(fd).st_size
+    oversized = max_bytes and size and size + incoming > max_bytes
+    expired = max_age and size and time.time() - started > max_age
+    if not (oversized or expired):
+        return False
+
+    lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another process is rotating; our records land in its new segment
+            return False
+        try:
+            if os.stat(path).st_ino != os.fstat(fd).st_ino:
+                return True
+        except FileNotFoundError:
+            return True
+
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{now % 1:.6f}"[1:]
+        os.rename(path, path.with_name(f"{path.name}.{stamp}-{os.getpid()}"))
+        os.utime(lock_fd)
+        _compress_and_prune(path)
+        return True
+    finally:
+        os.close(lock_fd)
+
+
+def append(path, data):
+    """
+    Append bytes to path with O_APPEND, rotating the file first if needed.
+
+    Any file under ~/.claude/logs written this way rotates with the log
+    settings. Raises OSError if the file cannot be written.
+    """
+    fd = _open_log(path)
+    try:
+        if _rotate_if_needed(path, fd, len(data)):
+            os.close(fd)
+            fd = _open_log(path)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def iter_jsonl(path):
+    """
+    Yield the JSON objects in a JSONL file and its rotated segments, oldest first.
+
+    Gzipped segments are read transparently. Lines that are not JSON objects,
+    such as a record cut short by a crash, and unreadable files are skipped.
+    """
+    path = Path(path)
+    files = list(reversed(_segments(path))) if path.parent.exists() else []
+    if path.exists():
+        files.append(path)
+    for file in files:
+        if file.suffix == ".gz":
+            import gzip
+            opener = gzip.open
+        else:
+            opener = open
+        try:
+            with opener(file, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict):
+                        yield record
+        except OSError:
+            continue
+
+
+class HookLogger:
+    """Logger for one file under ~/.claude/logs that buffers records until flush()."""
+
+    def __init__(self, log_file, echo_stderr=False):
+        self.log_file = log_file
+        self.echo_stderr = echo_stderr
+        self._records = []
+        self._size = 0
+        # File the buffered records go to, fixed when the first one is buffered
+        self._path = None
+        self._lock = threading.Lock()
+
+    def log(self, level, message, **fields):
+        """
+        Buffer a log record.
+
+        Args:
+            level (str): One of DEBUG, INFO, WARNING, ERROR
+            message (str): Human-readable message
+            **fields: Extra structured fields, only written in JSON format
+        """
+        threshold = str(hook_config.get("log_level", "DEBUG")).upper()
+        if LEVELS.get(level, 0) < LEVELS.get(threshold, 0):
+            return
+
+        max_chars = hook_config.get("log_max_record_chars", 2000)
+        if max_chars and len(message) > max_chars:
+            message = f"{message[:max_chars]}... [{len(message) - max_chars} chars truncated]"
+
+        now = datetime.now()
+        if hook_config.get("log_format", "text") == "json":
+            record = {
+                "ts": now.isoformat(timespec="milliseconds"),
+                "level": level,
+                "log": self.log_file,
+                "pid": os.getpid(),
+                "msg": message,
+                **fields,
+            }
+            line = json.dumps(record, ensure_ascii=False, default=str)
+        else:
+            line = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+
+        with self._lock:
+            if not self._records:
+                self._path = log_dir() / self.log_file
+            self._records.append(line)
+            self._size += len(line) + 1
+            full = self._size >= MAX_BUFFER_BYTES
+        if full:
+            self.flush()
+
+    def debug(self, message, **fields):
+        self.log("DEBUG", message, **fields)
+
+    def info(self, message, **fields):
+        self.log("INFO", message, **fields)
+
+    def warning(self, message, **fields):
+        self.log("WARNING", message, **fields)
+
+    def error(self, message, **fields):
+        self.log("ERROR", message, **fields)
+
+    def flush(self):
+        """Write all buffered records with a single append; never raises."""
+        with self._lock:
+            if not self._records:
+                return
+            text = "\n".join(self._records) + "\n"
+            path = self._path
+            self._records = []
+            self._size = 0
+        try:
+            append(path, text.encode("utf-8"))
+        except OSError:
+            pass
+        if self.echo_stderr:
+            try:
+                sys.stderr.write(text)
+                sys.stderr.flush()
+            except (OSError, ValueError):
+                pass
+
+
+# One logger per log file, shared by every module in the process
+_loggers = {}
+
+
+def get_logger(log_file, echo_stderr=False):
+    """Return the shared buffered logger for ~/.claude/logs/{log_file}."""
+    logger = _loggers.get(log_file)
+    if logger is None:
+        logger = _loggers[log_file] = HookLogger(log_file, echo_stderr)
+    elif echo_stderr:
+        logger.echo_stderr = True
+    return logger
+
+
+def flush_all():
+    """Flush every logger; registered to run at interpreter exit."""
+    for logger in list(_loggers.values()):
+        logger.flush()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Per-phase timing metrics for the Claude notification hooks.
+
+Hooks time their phases (stdin read and decode, transcript scan, each channel
+send) with time.monotonic() and record them here. Records are buffered like log
+records and written with a single append to ~/.claude/logs/metrics.jsonl when
+the process exits (or flush_all() is called), one JSON object per line:
+
+    {"ts": 1760659200.12, "hook": "stop", "phase": "transcript_scan", "ms": 3.41, "pid": 4242}
+
+The file is rotated with the same settings as the logs. If metrics_statsd is set
+to host:port, each flush also sends the timings as statsd timers over UDP,
+named {metrics_statsd_prefix}.{hook}.{phase}.
+
+Settings (see hook_config):
+- metrics_enabled:        record timings (default true)
+- metrics_statsd:         statsd host:port, e.g. "127.0.0.1:8125" (default "", off)
+- metrics_statsd_prefix:  metric name prefix (default "claude.notifications")
+
+Usage:
+    hook_metrics.py [--hook stop] [--since-hours 24]    Percentiles per phase
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import hook_config
+import hook_log
+
+METRICS_FILE = "metrics.jsonl"
+
+# Largest statsd datagram; keeps packets under a typical 1500-byte MTU
+MAX_DATAGRAM_BYTES = 1400
+
+_records = []
+# Metrics file the buffered records go to, fixed when the first one is buffered
+_records_path = None
+_lock = threading.Lock()
+
+
+def metrics_path():
+    return hook_log.log_dir() / METRICS_FILE
+
+
+class MetricsRecorder:
+    """Records phase timings for one hook, e.g. "stop"."""
+
+    def __init__(self, hook):
+        self.hook = hook
+
+    def record(self, phase, seconds, **tags):
+        """
+        Buffer one timing.
+
+        Args:
+            phase (str): Phase name, e.g. "transcript_scan" or "channel_Slack"
+            seconds (float): Duration from time.monotonic()
+            **tags: Extra fields stored with the record, e.g. status="ok"
+        """
+        global _records_path
+        if not hook_config.get("metrics_enabled", True):
+            return
+        record = {"ts": round(time.time(), 3), "hook": self.hook, "phase": phase,
+                  "ms": round(seconds * 1000, 3), "pid": os.getpid(), **tags}
+        with _lock:
+            if not _records:
+                _records_path = metrics_path()
+            _records.append(record)
+
+    @contextmanager
+    def phase(self, phase, **tags):
+        """Time the enclosed block as phase, including when it raises."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(phase, time.monotonic() - start, **tags)
+
+
+# One recorder per hook, shared by every module in the process
+_recorders = {}
+
+
+def get_recorder(hook):
+    """Return the shared MetricsRecorder for hook."""
+    if hook not in _recorders:
+        _recorders[hook] = MetricsRecorder(hook)
+    return _recorders[hook]
+
+
+def _send_statsd(records, target):
+    """Send records as statsd timers, packing several per datagram; never raises."""
+    import socket
+
+    host, _, port = target.rpartition(":")
+    prefix = hook_config.get("metrics_statsd_prefix", "claude.notifications")
+    lines = [f"{prefix}.{r['hook']}.{r['phase']}:{r['ms']}|ms" for r in records]
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            packet = ""
+            for line in lines:
+                if packet and len(packet) + 1 + len(line) > MAX_DATAGRAM_BYTES:
+                    sock.sendto(packet.encode(), (host, int(port)))
+                    packet = ""
+                packet = f"{packet}\n{line}" if packet else line
+            if packet:
+                sock.sendto(packet.encode(), (host, int(port)))
+    except (OSError, ValueError):
+        pass
+
+
+def flush_all():
+    """Write buffered timings to the metrics file and statsd; never raises."""
+    global _records
+    with _lock:
+        records, _records = _records, []
+        path = _records_path
+    if not records:
+        return
+    data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+    try:
+        hook_log.append(path, data.encode("utf-8"))
+    except OSError:
+        pass
+    target = hook_config.get("metrics_statsd", "")
+    if target:
+        _send_statsd(records, target)
+
+
+atexit.register(flush_all)
+
+
+def read_records(path=None, since=None):
+    """Yield records from the metrics file and its rotated segments, oldest segment first."""
+    for record in hook_log.iter_jsonl(path or metrics_path()):
+        if since is None or record.get("ts", 0) >= since:
+            yield record
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    return ordered[min(len(ordered) - 1, max(0, -(-len(ordered) * q // 100) - 1))]
+
+
+def summarize(records, hook=None):
+    """
+    Group timings by (hook, phase).
+
+    Returns:
+        dict: (hook, phase) -> {"count", "p50", "p95", "p99", "max"} in milliseconds
+    """
+    samples = {}
+    for record in records:
+        if hook and record.get("hook") != hook:
+            continue
+        samples.setdefault((record.get("hook", ""), record.get("phase", "")), []).append(record.get("ms", 0))
+    summary = {}
+    for key, values in sorted(samples.items()):
+        values.sort()
+        summary[key] = {"count": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95),
+                        "p99": percentile(values, 99), "max": values[-1]}
+    return summary
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize hook phase timings from the metrics file.")
+    parser.add_argument("--hook", help="only this hook, e.g. stop or notification")
+    parser.add_argument("--since-hours", type=float, help="only records from the last N hours")
+    parser.add_argument("--file", help=f"metrics file (default ~/.claude/logs/{METRICS_FILE})")
+    args = parser.parse_args()
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    summary = summarize(read_records(args.file, since), args.hook)
+    if not summary:
+        print("no metrics recorded")
+        return
+    print(f"{'hook':<14}{'phase':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for (hook, phase), s in summary.items():
+        print(f"{hook:<14}{phase:<22}{s['count']:>7}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
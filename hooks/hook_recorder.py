@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Recording of hook invocations for replay and load testing.
+
+With the setting record_invocations enabled, the dispatcher appends every hook
+payload it receives to ~/.claude/logs/invocations.jsonl, one compact JSON
+object per line:
+
+    {"ts": 1760659200.123, "event": "Stop", "offset": 48213, "payload": {...}}
+
+offset is the transcript's size when the hook ran, so a replay can cut the
+transcript back to what the hook saw. Each record is written with a single
+append and the file is rotated with the same settings as the logs.
+benchmarks/replay_invocations.py replays recordings against stubbed channels.
+
+Settings (see hook_config):
+- record_invocations:  record hook payloads (default false)
+"""
+
+import json
+import os
+
+import hook_log
+
+RECORDINGS_FILE = "invocations.jsonl"
+
+
+def recordings_path():
+    return hook_log.log_dir() / RECORDINGS_FILE
+
+
+def transcript_offset(payload):
+    """Size of the payload's transcript right now, or None if it has none."""
+    path = payload.get("transcript_path")
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def record(payload, ts):
+    """
+    Append one invocation to the recordings file; never raises.
+
+    Args:
+        payload (dict): The decoded stdin payload
+        ts (float): time.time() when the hook started
+    """
+    entry = {"ts": round(ts, 3), "event": payload.get("hook_event_name", ""),
+             "offset": transcript_offset(payload), "payload": payload}
+    try:
+        data = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+        hook_log.append(recordings_path(), data.encode("utf-8"))
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def read_recordings(path=None):
+    """Yield recorded invocations from a recordings file and its rotated segments, oldest first."""
+    for entry in hook_log.iter_jsonl(path or recordings_path()):
+        if isinstance(entry.get("payload"), dict):
+            yield entry
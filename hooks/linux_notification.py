@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Linux desktop notifications through the freedesktop notification service.
+
+Notifications are sent with org.freedesktop.Notifications.Notify over the
+session bus from inside the hook process, so there is no notify-send fork per
+event. Notifications from the same project replace each other: the id the
+server returns for a project group is kept in the shared_state file
+"linux_notification_ids" and passed back as replaces_id, which gives the same
+stacking as terminal-notifier's -group. The bus connection is kept open for
+reuse, so the notification daemon pays for the handshake only once.
+"""
+
+import threading
+
+import dbus_client
+import hook_log
+import shared_state
+from desktop_notification import LinuxBackend
+
+SERVICE = "org.freedesktop.Notifications"
+SERVICE_PATH = "/org/freedesktop/Notifications"
+IDS_STATE_NAME = "linux_notification_ids"
+
+# macOS sound names mapped to freedesktop sound theme names
+SOUND_NAMES = {"Glass": "message-new-instant", "Hero": "complete", "Tink": "dialog-information"}
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def log_notification(message, level="INFO"):
+    """Buffer a timestamped log message for ~/.claude/logs/linux_notification.log"""
+    hook_log.get_logger("linux_notification.log").log(level, message)
+
+
+def is_available():
+    """Return True if a session bus is advertised to this process."""
+    return dbus_client.session_bus_address() is not None
+
+
+def _notify(summary, body, hints, group_id, timeout):
+    """Send Notify on the shared connection, replacing the group's previous notification."""
+    global _connection
+    if _connection is None:
+        _connection = dbus_client.Connection(timeout=timeout)
+    _connection.settimeout(timeout)
+
+    # The state lock is held only to read and store ids, never across the call,
+    # so a slow notification service cannot stall other hooks waiting on it
+    with shared_state.locked_state(IDS_STATE_NAME) as state:
+        # Ids belong to one notification server; forget them when the bus changes
+        if state.get("bus") != _connection.address:
+            state.clear()
+            state["bus"] = _connection.address
+            state["ids"] = {}
+        replaces_id = state["ids"].get(group_id, 0)
+    notification_id = _connection.call(
+        SERVICE, SERVICE_PATH, SERVICE, "Notify", "susssasa{sv}i",
+        ("Claude", replaces_id, "", summary, body, [], hints, -1),
+    )[0]
+    with shared_state.locked_state(IDS_STATE_NAME) as state:
+        if state.get("bus") == _connection.address:
+            state["ids"][group_id] = notification_id
+    return notification_id
+
+
+def send_linux_notification(message, subtitle="", sound="Glass", timeout=5, cwd=None):
+    """
+    Send a rate-limited desktop notification over D-Bus for the project at cwd.
+
+    A shorthand for desktop_notification.LinuxBackend().notify(); see there for
+    the arguments. Returns True if the notification service accepted it.
+    """
+    return LinuxBackend().notify(message, subtitle, sound, timeout, cwd)
+
+
+def show_linux_notification(title, subtitle, message, sound, group_id, timeout=5):
+    """
+    Send a desktop notification over D-Bus, stacking per project like the macOS backend.
+
+    Args:
+        title (str): The notification title, e.g. "Claude - myproject"
+        subtitle (str): Shown after the title, e.g. "Task Complete"
+        message (str): The notification message body, already trimmed
+        sound (str): macOS sound name, mapped to a freedesktop sound; "" is silent
+        group_id (str): Notifications with the same group replace each other
+        timeout (float): Seconds to wait for the notification service
+
+    Returns:
+        bool: True if the notification service accepted the notification
+    """
+    global _connection
+    summary = f"{title} — {subtitle}" if subtitle else title
+    if sound:
+        hints = {"sound-name": ("s", SOUND_NAMES.get(sound, sound))}
+    else:
+        hints = {"suppress-sound": ("b", True)}
+
+    log_notification("🐧 Sending desktop notification via D-Bus")
+    log_notification(f"   Summary: '{summary}', Group: '{group_id}', Sound: '{sound}'", level="DEBUG")
+
+    with _connection_lock:
+        for attempt in range(2):
+            try:
+                notification_id = _notify(summary, message, hints, group_id, timeout)
+                log_notification(f"✅ Desktop notification sent (id {notification_id})")
+                return True
+            except dbus_client.DBusError as e:
+                log_notification(f"⚠️ Desktop notification failed: {e}", level="WARNING")
+                return False
+            except OSError as e:
+                # A kept-open connection may have died with the bus; reconnect once
+                if _connection is not None:
+                    _connection.close()
+                    _connection = None
+                if attempt:
+                    log_notification(f"❌ Could not reach the notification service: {e}", level="ERROR")
+    return False
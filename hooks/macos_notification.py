@@ -9,75 +9,66 @@ This module provides functions to send smart macOS notifications that:
 - Detect when Claude needs user input via AskUserQuestion tool
 """
 
+import hashlib
 import json
+import re
 import subprocess
 import os
+import tempfile
+import time
 from pathlib import Path
-from datetime import datetime
+from collections import namedtuple
 
+try:
+    # orjson decodes large transcript lines several times faster than json
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
-def log_notification(message, log_file="macos_notification.log"):
-    """Write a timestamped log message to ~/.claude/logs/{log_file}"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_path = Path.home() / ".claude" / "logs" / log_file
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+import hook_log
+import transcript_stream
+from desktop_notification import MacOSBackend
 
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
 
+def log_notification(message, log_file="macos_notification.log", level="INFO"):
+    """Buffer a timestamped log message for ~/.claude/logs/{log_file}"""
+    hook_log.get_logger(log_file).log(level, message)
 
-def get_project_title():
+
+def send_macos_notification(message, subtitle="", sound="Glass", timeout=5, cwd=None):
     """
-    Get the project directory name for consistent notification titles.
-    This ensures all notifications from the same project stack together.
+    Send a rate-limited macOS notification for the project at cwd.
 
-    Returns:
-        str: Title in format "Claude - {project_directory_name}"
+    A shorthand for desktop_notification.MacOSBackend().notify(); see there for
+    the arguments. Returns True if the notification was shown.
     """
-    try:
-        current_dir = os.getcwd()
-        dir_name = os.path.basename(current_dir)
-        return f"Claude - {dir_name}"
-    except Exception as e:
-        log_notification(f"⚠️ Could not get directory name: {e}")
-        return "Claude"
+    return MacOSBackend().notify(message, subtitle, sound, timeout, cwd)
 
 
-def send_macos_notification(message, subtitle="", sound="Glass"):
+def show_macos_notification(title, subtitle, message, sound, group_id, timeout=5):
     """
-    Send a macOS notification using terminal-notifier with grouping and Terminal activation.
+    Show a notification using terminal-notifier with grouping and Terminal activation.
 
     Args:
-        message (str): The notification message body
+        title (str): The notification title, e.g. "Claude - myproject"
         subtitle (str): The subtitle text (e.g., "Needs Input", "Task Complete")
+        message (str): The notification message body, already trimmed
         sound (str): The notification sound name. Options:
                     - "Glass" (default, gentle)
                     - "Hero" (triumphant, for completions)
                     - "Tink" (subtle, for minor events)
                     - "" (empty string for silent notifications)
+        group_id (str): Notifications with the same group stack together
+        timeout (float): Seconds to wait for terminal-notifier
 
     Returns:
         bool: True if notification was sent successfully, False otherwise
     """
     try:
-        # Get consistent title for notification stacking
-        title = get_project_title()
-
-        # Truncate message if too long (macOS notifications have limits)
-        max_length = 200
-        if len(message) > max_length:
-            truncated_message = message[:max_length-3] + "..."
-        else:
-            truncated_message = message
-
-        # Get project directory name for grouping (enables stacking)
-        current_dir = os.getcwd()
-        group_id = os.path.basename(current_dir)
-
         # Build terminal-notifier command
         cmd = [
             'terminal-notifier',
-            '-message', truncated_message,
+            '-message', message,
             '-title', title,
             '-group', group_id,  # This enables notification stacking by group
             '-activate', 'com.apple.Terminal'  # Focus Terminal when clicked
@@ -90,97 +81,369 @@ def send_macos_notification(message, subtitle="", sound="Glass"):
             cmd.extend(['-sound', sound])
 
         log_notification(f"🍎 Sending macOS notification via terminal-notifier")
-        log_notification(f"   Title: '{title}', Subtitle: '{subtitle}', Group: '{group_id}', Sound: '{sound}'")
-        log_notification(f"   Message: {truncated_message[:50]}...")
+        log_notification(f"   Title: '{title}', Subtitle: '{subtitle}', Group: '{group_id}', Sound: '{sound}'", level="DEBUG")
+        log_notification(f"   Message: {message[:50]}...", level="DEBUG")
 
         # Execute terminal-notifier command
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=5
+            timeout=timeout
         )
 
         if result.returncode == 0:
             log_notification("✅ macOS notification sent successfully")
             return True
         else:
-            log_notification(f"⚠️ macOS notification failed: {result.stderr.strip()}")
+            log_notification(f"⚠️ macOS notification failed: {result.stderr.strip()}", level="WARNING")
             return False
 
     except subprocess.TimeoutExpired:
-        log_notification("⏰ macOS notification timed out")
+        log_notification("⏰ macOS notification timed out", level="WARNING")
         return False
     except FileNotFoundError:
-        log_notification("❌ terminal-notifier not found!")
-        log_notification("💡 Please install it with: brew install terminal-notifier")
+        log_notification("❌ terminal-notifier not found!", level="ERROR")
+        log_notification("💡 Please install it with: brew install terminal-notifier", level="ERROR")
         return False
     except Exception as e:
-        log_notification(f"❌ Error sending macOS notification: {e}")
+        log_notification(f"❌ Error sending macOS notification: {e}", level="ERROR")
         return False
 
 
-def has_ask_user_question(transcript_path):
+# Transcripts are read backwards from EOF in blocks of this many bytes.
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Lines longer than this are not held in memory; assistant entries among them
+# are summarized by transcript_stream instead of being decoded
+STREAM_ENTRY_BYTES = 1024 * 1024
+# Most bytes one streamed entry may read
+MAX_STREAM_BYTES = 8 * 1024 * 1024
+# Most bytes the backwards scan for the latest assistant entry may read
+MAX_SCAN_BYTES = 64 * 1024 * 1024
+# Characters of the first text block kept as the notification message
+MESSAGE_PREFIX_CHARS = 4000
+
+# Raw-byte check for an assistant role marker, tolerating any JSON whitespace
+# and key order. Lines without it (user prompts, tool results, attachments)
+# cannot be assistant entries and are skipped without being decoded.
+_ASSISTANT_ROLE_MARKER = re.compile(rb'"role"\s*:\s*"assistant"')
+
+
+def _iter_lines_reverse(f, start=0, end=None, block_size=TAIL_BLOCK_SIZE, max_line_bytes=None,
+                        max_read_bytes=None):
     """
-    Check if the latest assistant message contains an AskUserQuestion tool use.
+    Yield (offset, line) pairs from a binary file object, last line first.
+
+    The byte range [start, end) is read backwards in fixed-size blocks, so a
+    caller that stops early only touches the tail of the range. Lines are
+    yielded without their trailing newline; offset is the byte position where
+    the line starts. start must be the beginning of a line.
+
+    Lines longer than max_line_bytes are yielded as (offset, None) without ever
+    being held in memory. Iteration stops once max_read_bytes have been read.
+    """
+    if end is None:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+    position = end
+    # Chunks of the line currently being assembled, most recent chunk first;
+    # emptied once the line outgrows max_line_bytes
+    tail = []
+    tail_bytes = 0
+
+    def assembled():
+        if max_line_bytes and tail_bytes > max_line_bytes:
+            return None
+        return b"".join(reversed(tail))
+
+    while position > start:
+        if max_read_bytes and end - position >= max_read_bytes:
+            return
+        size = min(block_size, position - start)
+        position -= size
+        f.seek(position)
+        block = f.read(size)
+        parts = block.split(b"\n")
+        tail.append(parts[-1])
+        tail_bytes += len(parts[-1])
+        if max_line_bytes and tail_bytes > max_line_bytes:
+            tail = []
+        if len(parts) == 1:
+            continue
+
+        line_start = position + len(block) - len(parts[-1])
+        yield line_start, assembled()
+        for part in reversed(parts[1:-1]):
+            line_start -= len(part) + 1
+            yield line_start, None if max_line_bytes and len(part) > max_line_bytes else part
+        tail = [parts[0]]
+        tail_bytes = len(parts[0])
+
+    yield start, assembled()
+
+
+def _find_latest_assistant_entry(f, start=0, end=None):
+    """
+    Find the most recent assistant entry in a byte range of a JSONL transcript.
+
+    Scans backwards from the end of the range and stops at the first assistant
+    entry, so the cost depends on the size of the last few entries rather than
+    on the size of the whole transcript. Entries over STREAM_ENTRY_BYTES are
+    summarized by transcript_stream rather than decoded, and the scan gives up
+    after MAX_SCAN_BYTES, so memory and reads stay bounded for any transcript.
+
+    Returns:
+        tuple: (entry, offset, last_line_offset). entry and offset are None when
+        the range holds no assistant entry. entry alone is None when the entry
+        at offset is too large to tell whether it is an assistant entry; the scan
+        stops there rather than report an older one. last_line_offset is where
+        the final, possibly still incomplete, line of the range starts.
+    """
+    if end is None:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+    last_line_offset = None
+    line_end = end
+    lines = _iter_lines_reverse(f, start, end, max_line_bytes=STREAM_ENTRY_BYTES, max_read_bytes=MAX_SCAN_BYTES)
+    for offset, line in lines:
+        if last_line_offset is None:
+            last_line_offset = offset
+        if line is None:
+            entry = transcript_stream.summarize_entry(f, offset, line_end, MAX_STREAM_BYTES, MESSAGE_PREFIX_CHARS)
+            if entry is transcript_stream.UNDETERMINED:
+                log_notification(f"🌊 Could not tell the role of an oversized entry ({line_end - offset} bytes)",
+                                 level="DEBUG")
+                return None, offset, last_line_offset
+            if entry is not None:
+                log_notification(f"🌊 Streamed oversized assistant entry ({line_end - offset} bytes)", level="DEBUG")
+                return entry, offset, last_line_offset
+            line_end = offset - 1
+            continue
+        line_end = offset - 1
+        if not _ASSISTANT_ROLE_MARKER.search(line):
+            continue
+        try:
+            entry = _json_loads(line)
+        except ValueError:
+            continue
+
+        message = entry.get("message") if isinstance(entry, dict) else None
+        if isinstance(message, dict) and message.get("role") == "assistant":
+            return entry, offset, last_line_offset
+
+    return None, None, last_line_offset
+
+
+# Sidecar index of already-scanned transcripts, so repeated hook runs against a
+# growing transcript only parse the bytes appended since the previous run. Each
+# transcript has its own shard file, replaced atomically, so concurrent sessions
+# never overwrite each other's entries.
+TRANSCRIPT_INDEX_VERSION = 2
+TRANSCRIPT_INDEX_MAX_ENTRIES = 256
+# Bytes before the indexed end offset remembered to detect in-place rewrites
+TRANSCRIPT_INDEX_BOUNDARY_BYTES = 64
+
+
+def _transcript_index_dir():
+    return Path.home() / ".claude" / "cache" / "transcript_index"
+
+
+def _transcript_index_path(key):
+    digest = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=16).hexdigest()
+    return _transcript_index_dir() / f"{digest}.json"
+
+
+def _load_transcript_index(key):
+    """Load the index entry for the transcript at key, or None if missing or stale."""
+    try:
+        with open(_transcript_index_path(key), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != TRANSCRIPT_INDEX_VERSION or data.get("key") != key:
+        return None
+    entry = data.get("entry")
+    return entry if isinstance(entry, dict) else None
+
+
+def _prune_transcript_index(index_dir):
+    """Remove the least recently updated shards beyond TRANSCRIPT_INDEX_MAX_ENTRIES."""
+    shards = []
+    for path in index_dir.glob("*.json"):
+        try:
+            shards.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    if len(shards) <= TRANSCRIPT_INDEX_MAX_ENTRIES:
+        return
+    shards.sort(reverse=True)
+    for _, path in shards[TRANSCRIPT_INDEX_MAX_ENTRIES:]:
+        path.unlink(missing_ok=True)
+
+
+def _save_transcript_index(key, entry):
+    """Atomically write the index shard for the transcript at key."""
+    index_path = _transcript_index_path(key)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    created = not index_path.exists()
+    fd, tmp_path = tempfile.mkstemp(dir=index_path.parent, prefix=".shard.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": TRANSCRIPT_INDEX_VERSION, "key": key, "entry": entry}, f)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    if created:
+        _prune_transcript_index(index_path.parent)
+
+
+def _read_boundary(f, end):
+    """Return the bytes just before offset end, used to recognize a scanned prefix."""
+    start = max(0, end - TRANSCRIPT_INDEX_BOUNDARY_BYTES)
+    f.seek(start)
+    return f.read(end - start)
+
+
+def _resume_from_index(f, stat, cached):
+    """
+    Decide where a transcript scan can resume from a cached index entry.
+
+    Returns:
+        tuple: (start, analysis). start is 0 with EMPTY_ANALYSIS when there is no
+        usable entry: the file was rotated (different inode), truncated (smaller
+        than the indexed offset) or rewritten (boundary bytes differ).
+    """
+    if not cached:
+        return 0, EMPTY_ANALYSIS
+    try:
+        end = cached["end"]
+        if (cached["inode"], cached["device"]) != (stat.st_ino, stat.st_dev):
+            log_notification("🔄 Transcript was rotated, rescanning")
+            return 0, EMPTY_ANALYSIS
+        if end > stat.st_size or _read_boundary(f, end) != bytes.fromhex(cached["boundary"]):
+            log_notification("🔄 Transcript was truncated or rewritten, rescanning")
+            return 0, EMPTY_ANALYSIS
+        message, asks_user_question, tool_names, offset = cached["analysis"]
+        return end, TranscriptAnalysis(message, asks_user_question, tuple(tool_names), offset)
+    except (KeyError, TypeError, ValueError):
+        return 0, EMPTY_ANALYSIS
+
+
+# Result of a single transcript scan, describing the latest assistant entry.
+#   message:            first non-empty text of the entry, or None
+#   asks_user_question: True if the entry contains an AskUserQuestion tool_use
+#   tool_names:         names of all tool_use blocks in the entry, in order
+#   offset:             byte offset of the entry in the transcript, or None
+TranscriptAnalysis = namedtuple(
+    "TranscriptAnalysis", ["message", "asks_user_question", "tool_names", "offset"]
+)
+
+EMPTY_ANALYSIS = TranscriptAnalysis(None, False, (), None)
+
+
+def _analyze_entry(entry, offset):
+    """Summarize one assistant transcript entry as a TranscriptAnalysis."""
+    content = entry["message"].get("content", [])
+
+    message = None
+    tool_names = []
+    if isinstance(content, str):
+        message = content.strip()[:MESSAGE_PREFIX_CHARS].rstrip() or None
+    elif isinstance(content, list):
+        for item in content:
+            if not isinstance(item, dict):
+                continue
+            if item.get("type") == "text" and message is None:
+                text = item.get("text", "")
+                if isinstance(text, str) and text.strip():
+                    message = text.strip()[:MESSAGE_PREFIX_CHARS].rstrip()
+            elif item.get("type") == "tool_use":
+                tool_names.append(item.get("name", ""))
+
+    return TranscriptAnalysis(
+        message=message,
+        asks_user_question="AskUserQuestion" in tool_names,
+        tool_names=tuple(tool_names),
+        offset=offset,
+    )
+
+
+def analyze_transcript(transcript_path):
+    """
+    Analyze the latest assistant message of a JSONL transcript in a single scan.
 
-    This function parses the transcript JSONL file and looks for the most recent
-    assistant message to see if it contains a tool_use with name "AskUserQuestion".
+    This is the one entry point hooks should use: it reads the transcript once and
+    returns everything the Stop and Notification hooks need to build a notification.
+    Results are remembered in a sidecar index under ~/.claude/cache, so later calls
+    on the same growing transcript only parse the bytes appended since.
 
     Args:
         transcript_path (str): Path to the transcript JSONL file
 
     Returns:
-        bool: True if AskUserQuestion tool is found, False otherwise
+        TranscriptAnalysis: Summary of the latest assistant message. EMPTY_ANALYSIS
+        is returned when the file is missing, unreadable or has no assistant message.
     """
     try:
         if not transcript_path or not Path(transcript_path).exists():
             log_notification(f"📄 Transcript file not found: {transcript_path}")
-            return False
-
-        # Parse JSONL file - each line is a separate JSON object
-        messages = []
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        entry = json.loads(line)
-                        messages.append(entry)
-                    except json.JSONDecodeError:
-                        continue
-
-        if not messages:
-            log_notification("📖 No messages found in transcript")
-            return False
+            return EMPTY_ANALYSIS
+
+        stat = os.stat(transcript_path)
+        key = os.path.realpath(transcript_path)
+        with open(transcript_path, "rb") as f:
+            start, analysis = _resume_from_index(f, stat, _load_transcript_index(key))
+            if start:
+                log_notification(f"📖 Resuming transcript scan at byte {start} of {stat.st_size}", level="DEBUG")
+
+            entry, offset, indexed_end = _find_latest_assistant_entry(f, start, stat.st_size)
+            if entry is not None:
+                analysis = _analyze_entry(entry, offset)
+            elif offset is not None:
+                analysis = EMPTY_ANALYSIS
+
+            if not start or indexed_end != start:
+                _save_transcript_index(key, {
+                    "inode": stat.st_ino,
+                    "device": stat.st_dev,
+                    "end": indexed_end,
+                    "boundary": _read_boundary(f, indexed_end).hex(),
+                    "analysis": list(analysis),
+                    "updated": time.time(),
+                })
+
+        if analysis.offset is None:
+            log_notification("📖 No assistant message found in transcript")
+            return EMPTY_ANALYSIS
+
+        log_notification(
+            f"📖 Latest assistant message at byte {analysis.offset}, tools: {list(analysis.tool_names)}",
+            level="DEBUG",
+        )
+        return analysis
 
-        log_notification(f"📖 Parsed {len(messages)} entries from transcript")
+    except Exception as e:
+        log_notification(f"❌ Error analyzing transcript: {e}", level="ERROR")
+        return EMPTY_ANALYSIS
 
-        # Find the most recent assistant message
-        for entry in reversed(messages):
-            message = entry.get('message', {})
-            if message.get('role') == 'assistant':
-                content = message.get('content', [])
 
-                # Content should be an array of content blocks
-                if isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and item.get('type') == 'tool_use':
-                            tool_name = item.get('name', '')
-                            if tool_name == 'AskUserQuestion':
-                                log_notification(f"✅ Found AskUserQuestion tool in latest assistant message")
-                                return True
+def has_ask_user_question(transcript_path):
+    """
+    Check if the latest assistant message contains an AskUserQuestion tool use.
 
-                # We have now examined the most recent assistant message.
-                # Do not fall through to older messages regardless of outcome.
-                break
+    Only the most recent assistant message is examined; older messages are never
+    considered regardless of outcome.
 
-        log_notification("🔍 No AskUserQuestion tool found in latest assistant message")
-        return False
+    Args:
+        transcript_path (str): Path to the transcript JSONL file
 
-    except Exception as e:
-        log_notification(f"❌ Error checking for AskUserQuestion: {e}")
-        return False
+    Returns:
+        bool: True if AskUserQuestion tool is found, False otherwise
+    """
+    return analyze_transcript(transcript_path).asks_user_question
 
 
 def extract_latest_message(transcript_path):
@@ -189,37 +452,4 @@ def extract_latest_message(transcript_path):
 
     Returns the text content of the most recent assistant message, or None.
     """
-    try:
-        if not transcript_path or not Path(transcript_path).exists():
-            log_notification(f"📄 Transcript file not found: {transcript_path}")
-            return None
-
-        messages = []
-        with open(transcript_path, "r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if line:
-                    try:
-                        messages.append(json.loads(line))
-                    except json.JSONDecodeError as e:
-                        log_notification(f"⚠️ JSON decode error on line {line_num}: {e}")
-                        continue
-
-        for entry in reversed(messages):
-            message = entry.get("message", {})
-            if message.get("role") == "assistant":
-                content = message.get("content", [])
-                if isinstance(content, str) and content.strip():
-                    return content.strip()
-                elif isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            text = item.get("text", "")
-                            if text.strip():
-                                return text.strip()
-                break
-
-        return None
-    except Exception as e:
-        log_notification(f"❌ Error extracting message: {e}")
-        return None
+    return analyze_transcript(transcript_path).message
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Optional long-lived notification daemon for Claude hooks.
+
+The daemon listens on a Unix domain socket (~/.claude/run/notifications.sock by
+default), keeps a warm keep-alive HTTP connection pool for the Slack app and the
+hook modules and config already loaded. Hooks forward payloads with
+daemon_client.forward(): if a daemon accepts the payload they exit immediately,
+otherwise they fall back to handling the event in-process as before. See
+daemon_client for the wire format.
+
+Usage:
+    notification_daemon.py [--socket PATH]
+
+SIGHUP reloads ~/.claude/notifications.json; SIGTERM/SIGINT stop the daemon.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from pathlib import Path
+
+import daemon_client
+import hook_config
+import hook_events
+import hook_log
+import hook_metrics
+import slack_notification
+
+log = hook_log.get_logger("notification_daemon.log")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            module_name = hook_events.EVENT_MODULES[request["hook"]]
+            payload = json.loads(request["payload"])
+            if not payload.get("cwd") and request.get("cwd"):
+                payload["cwd"] = request["cwd"]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            log.warning(f"⚠️ Rejected malformed request: {e}")
+            self.wfile.write(b"error\n")
+            return
+
+        self.wfile.write(b"ok\n")
+        self.wfile.flush()
+        self.connection.shutdown(socket.SHUT_WR)
+
+        try:
+            importlib.import_module(module_name).handle(payload, detach=False)
+        except Exception as e:
+            log.error(f"❌ {request['hook']} handler failed: {e}")
+        finally:
+            hook_log.flush_all()
+            hook_metrics.flush_all()
+
+
+class NotificationDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server that handles forwarded hook payloads on worker threads."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        """
+        Args:
+            socket_path (Path): Where to listen; a stale socket file is replaced
+
+        Raises:
+            RuntimeError: If another daemon is already listening on socket_path
+        """
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            if _is_listening(socket_path):
+                raise RuntimeError(f"a daemon is already listening on {socket_path}")
+            socket_path.unlink()
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        old_umask = os.umask(0o077)
+        try:
+            super().__init__(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        self.socket_path = socket_path
+
+        slack_notification.use_keep_alive()
+        for module_name in hook_events.EVENT_MODULES.values():
+            importlib.import_module(module_name)
+
+    def server_close(self):
+        super().server_close()
+        slack_notification.use_keep_alive(False)
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _is_listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+            return True
+        except OSError:
+            return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Claude notification daemon.")
+    parser.add_argument("--socket", type=Path, default=None, help="Unix socket path")
+    args = parser.parse_args()
+
+    server = NotificationDaemon(args.socket or daemon_client.default_socket_path())
+    log.info(f"🟢 Notification daemon listening on {server.socket_path} (pid {os.getpid()})")
+    hook_log.flush_all()
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, lambda signum, frame: hook_config.reload())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        log.info("🔴 Notification daemon stopped")
+        hook_log.flush_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Single entry point for every notification hook event.
+
+hooks.json runs this script for each event. It decodes the stdin payload, reads
+hook_event_name and imports only the module that event needs. Events that never
+notify (SubagentStop, non-actionable Notification types, unknown events) exit
+right after decoding, before the logging, transcript or network modules load.
+Events that do notify are forwarded to the notification daemon when one is
+running; only when none answers is the event's hook module imported and the
+event handled in-process. With the setting
+record_invocations enabled, every payload is first recorded by hook_recorder.
+
+Hook modules import each other by name: this script's directory is first on
+sys.path when it runs.
+"""
+
+import importlib
+import json
+import sys
+import time
+
+import hook_events
+
+
+def dispatch(payload, raw_payload, timings=()):
+    """
+    Forward or handle one decoded hook payload.
+
+    Args:
+        payload (dict): The decoded stdin payload
+        raw_payload (str): The stdin payload as read, forwarded to the daemon
+        timings (iterable): (phase, seconds) pairs measured before any module
+                            was loaded, recorded against the event's hook
+                            whether or not the event is forwarded
+    """
+    event = payload.get("hook_event_name", "")
+    if not hook_events.needs_handling(event, payload):
+        return
+
+    import daemon_client
+    import hook_metrics
+
+    recorder = hook_metrics.get_recorder(hook_events.EVENT_METRICS[event])
+    for phase, seconds in timings:
+        recorder.record(phase, seconds)
+    if daemon_client.forward(event, raw_payload):
+        import hook_log
+        hook_log.get_logger(hook_events.EVENT_LOGS[event], echo_stderr=True).info(
+            f"📨 Forwarded {event} event to notification daemon")
+        return
+    # No daemon: only now load the hook module and its transcript and delivery code
+    importlib.import_module(hook_events.EVENT_MODULES[event]).handle(payload)
+
+def main():
+    try:
+        started_at = time.time()
+        start = time.monotonic()
+        raw_payload = sys.stdin.read()
+        decode_start = time.monotonic()
+        payload = json.loads(raw_payload)
+        timings = [("stdin_read", decode_start - start), ("stdin_decode", time.monotonic() - decode_start)]
+        if isinstance(payload, dict):
+            import hook_config
+            if hook_config.get("record_invocations", False):
+                import hook_recorder
+                hook_recorder.record(payload, started_at)
+            dispatch(payload, raw_payload, timings)
+        sys.exit(0)
+    except json.JSONDecodeError:
+        sys.exit(0)
+    except Exception:
+        sys.exit(0)
+    finally:
+        for name in ("hook_log", "hook_metrics"):
+            if name in sys.modules:
+                sys.modules[name].flush_all()
+
+
+if __name__ == "__main__":
+    main()
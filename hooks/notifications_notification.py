@@ -1,93 +1,84 @@
-#!/usr/bin/env -S uv run --script
-# /// script
-# requires-python = ">=3.8"
-# dependencies = ["requests"]
-# ///
+#!/usr/bin/env python3
+"""
+Notification hook: notify when Claude is blocked on the user.
 
-import json
-import sys
-import requests
-from pathlib import Path
-from datetime import datetime
-
-try:
-    from macos_notification import send_macos_notification, extract_latest_message
-except ImportError:
-    import importlib.util
-    spec = importlib.util.spec_from_file_location(
-        "macos_notification",
-        Path(__file__).parent / "macos_notification.py"
-    )
-    macos_notification = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(macos_notification)
-    send_macos_notification = macos_notification.send_macos_notification
-    extract_latest_message = macos_notification.extract_latest_message
-
-# Notification types that mean the agent is blocked and needs user action.
-ACTIONABLE_NOTIFICATION_TYPES = {"permission_prompt", "idle_prompt", "elicitation_dialog"}
-
-
-def log_message(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_path = Path.home() / ".claude" / "logs" / "notification_hook.log"
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
-    print(f"[{timestamp}] {message}", file=sys.stderr)
-
-
-def send_to_slack_app(session_id, message, hook_type="notification"):
-    try:
-        payload = {"session_id": session_id, "message": message, "hook_type": hook_type}
-        log_message(f"🚀 Sending to Slack: {payload}")
-        response = requests.post("http://localhost:8080/claude/hook", json=payload, timeout=10)
-        log_message(f"📡 Slack response: {response.status_code}")
-        return response.status_code == 200
-    except requests.exceptions.RequestException as e:
-        log_message(f"🔌 Slack connection error: {e}")
-        return False
-
-
-def main():
-    try:
-        log_message("🔔 NOTIFICATION HOOK TRIGGERED")
-
-        input_data = json.load(sys.stdin)
-        log_message(f"📥 Input: {input_data}")
-
-        session_id = input_data.get("session_id", "")
-        transcript_path = input_data.get("transcript_path", "")
-        notification_type = input_data.get("notification_type", "")
-
-        log_message(f"🔖 notification_type: {notification_type}")
+notifications_dispatch.py calls handle() for Notification events. Running this
+script directly only serves background delivery workers (see
+delivery.spawn_detached).
+"""
 
-        if notification_type not in ACTIONABLE_NOTIFICATION_TYPES:
-            log_message(f"⏭️ Skipping non-actionable notification type: {notification_type!r}")
-            sys.exit(0)
-
-        if not session_id:
-            log_message("❌ No session ID, exiting")
-            sys.exit(0)
-
-        message = extract_latest_message(transcript_path) or input_data.get("message", "")
-        if not message:
-            log_message("⚠️ No message to send")
-            sys.exit(0)
-
-        log_message(f"📤 Sending notifications for actionable type: {notification_type!r}")
-
-        slack_success = send_to_slack_app(session_id, message, f"notification_{notification_type}")
-        log_message(f"{'✅' if slack_success else '❌'} Slack")
+import sys
 
-        macos_success = send_macos_notification(message, subtitle="Needs Attention", sound="Glass")
-        log_message(f"{'✅' if macos_success else '❌'} macOS")
+import delivery
+import hook_events
+import hook_log
+import hook_metrics
+
+log = hook_log.get_logger(hook_events.EVENT_LOGS["Notification"], echo_stderr=True)
+metrics = hook_metrics.get_recorder(hook_events.EVENT_METRICS["Notification"])
+
+
+def handle(input_data, detach=None):
+    """
+    Notify for one Notification event, if its type is actionable.
+
+    Args:
+        input_data (dict): The hook's stdin payload
+        detach (bool): Hand delivery to a background worker; defaults to the
+                       delivery_mode setting
+    """
+    log.info("🔔 NOTIFICATION HOOK TRIGGERED")
+    log.debug(f"📥 Input: {input_data}")
+
+    session_id = input_data.get("session_id", "")
+    transcript_path = input_data.get("transcript_path", "")
+    notification_type = input_data.get("notification_type", "")
+
+    log.info(f"🔖 notification_type: {notification_type}")
+
+    if notification_type not in hook_events.ACTIONABLE_NOTIFICATION_TYPES:
+        log.info(f"⏭️ Skipping non-actionable notification type: {notification_type!r}")
+        return
+
+    if not session_id:
+        log.warning("❌ No session ID, exiting")
+        return
+
+    import macos_notification
+
+    with metrics.phase("transcript_scan"):
+        analysis = macos_notification.analyze_transcript(transcript_path)
+    message = analysis.message or input_data.get("message", "")
+    if not message:
+        log.warning("⚠️ No message to send")
+        return
+
+    # idle_prompt repeats the turn's final message, which the Stop hook may have sent
+    # already; prompts that block the agent always notify
+    dedup_key = None
+    if notification_type == "idle_prompt":
+        import dedup
+        dedup_key = dedup.message_key(session_id, dedup.TURN_END, message, analysis.offset)
+        if dedup.is_duplicate(dedup_key):
+            log.info(f"♻️ Message already delivered for this session, skipping {notification_type!r}")
+            return
+
+    log.info(f"📤 Sending notifications for actionable type: {notification_type!r}")
+
+    job = {
+        "session_id": session_id,
+        "message": message,
+        "hook_type": f"notification_{notification_type}",
+        "subtitle": "Needs Attention",
+        "sound": "Glass",
+        "cwd": input_data.get("cwd") or None,
+        "dedup_key": dedup_key,
+    }
+    delivery.submit(job, __file__, log, metrics, detach)
 
-        sys.exit(0)
 
-    except json.JSONDecodeError:
-        sys.exit(0)
-    except Exception:
-        sys.exit(0)
+def main():
+    delivery.run_worker(sys.argv, log, metrics)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Project identity for notification titles and stacking groups.
+
+A hook's project is the repository containing the payload's cwd: resolve()
+walks up from cwd to the nearest directory holding a .git, .hg, .jj or .svn
+entry, so every subdirectory of a monorepo maps to the same project. Outside a
+repository the cwd itself is the project. The walk never treats the home
+directory as a root for something below it, so a dotfiles repository in ~ does
+not swallow every unversioned directory.
+
+Results are memoized per process and in the shared_state file
+"project_identity" for project_cache_ttl_seconds, so repeated hook runs from the
+same directory skip the filesystem walk.
+
+Settings (see hook_config):
+- project_cache_ttl_seconds:  how long a resolved cwd is trusted (default 86400, 0 disables the cache)
+"""
+
+import os
+import time
+from collections import namedtuple
+
+import hook_config
+import shared_state
+
+STATE_NAME = "project_identity"
+
+# Entries whose presence marks a repository root
+ROOT_MARKERS = (".git", ".hg", ".jj", ".svn")
+
+# Resolved cwds kept in the persistent cache; the oldest are evicted first
+MAX_CACHE_ENTRIES = 512
+
+# name: shown in titles, e.g. "my-repo"
+# group: stacking, coalescing and rate-limit group; the root path, so two
+#        repositories that share a directory name stay apart
+# root: the project's root directory
+Project = namedtuple("Project", ["name", "group", "root"])
+
+_memo = {}
+
+
+def find_root(cwd):
+    """Return the nearest ancestor of cwd (or cwd itself) that is a repository root, else cwd."""
+    home = os.path.expanduser("~")
+    path = cwd
+    while True:
+        if path == home and cwd != home:
+            break
+        if any(os.path.lexists(os.path.join(path, marker)) for marker in ROOT_MARKERS):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return cwd
+
+
+def _project(root):
+    return Project(name=os.path.basename(root) or root, group=root, root=root)
+
+
+def resolve(cwd=None):
+    """
+    Resolve the project for a working directory.
+
+    Args:
+        cwd (str): The hook payload's cwd; defaults to the process's working directory
+
+    Returns:
+        Project: The project's name, group and root
+
+    Raises:
+        OSError: If cwd is not given and the working directory cannot be read
+    """
+    cwd = os.path.abspath(cwd or os.getcwd())
+    now = time.time()
+    if cwd in _memo and now < _memo[cwd][1]:
+        return _memo[cwd][0]
+
+    ttl = hook_config.get("project_cache_ttl_seconds", 86400)
+    if ttl <= 0:
+        return _project(find_root(cwd))
+
+    with shared_state.locked_state(STATE_NAME) as state:
+        cached = state.get(cwd)
+        if isinstance(cached, list) and len(cached) == 2 and now - cached[1] < ttl:
+            root, resolved_at = cached
+        else:
+            root, resolved_at = find_root(cwd), now
+            state[cwd] = [root, now]
+            if len(state) > MAX_CACHE_ENTRIES:
+                oldest = sorted(state, key=lambda key: state[key][1] if isinstance(state[key], list) else 0)
+                for key in oldest[:len(state) - MAX_CACHE_ENTRIES]:
+                    del state[key]
+
+    project = _project(root)
+    # A long-lived process (the notification daemon) re-checks once the entry expires
+    _memo[cwd] = (project, resolved_at + ttl)
+    return project
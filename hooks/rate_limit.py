@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiting shared by all hook processes.
+
+Each delivery channel ("desktop", "slack") keeps one bucket per project group in
+the shared_state file rate_limit_{channel}. A bucket holds up to
+rate_limit_burst tokens and refills at rate_limit_per_minute; every notification
+takes one token, and a notification that finds the bucket empty is dropped.
+Drops are counted in the bucket and handed to the next notification that gets
+through, so it can report how many were suppressed in between.
+
+Settings (see hook_config):
+- rate_limit_burst:       notifications a project may send back to back per channel (default 5, 0 disables)
+- rate_limit_per_minute:  sustained notifications per minute per project and channel (default 12)
+"""
+
+import time
+
+import hook_config
+import shared_state
+
+
+def suppressed_note(count):
+    """Text appended to a notification that follows count rate-limited ones."""
+    return f" (+{count} rate-limited)" if count else ""
+
+
+class RateLimiter:
+    """Shared token buckets for one channel, stored as ~/.claude/cache/rate_limit_{channel}.json."""
+
+    def __init__(self, channel):
+        self.state_name = f"rate_limit_{channel}"
+
+    def acquire(self, group, now=None):
+        """
+        Take a token for one notification from group's bucket.
+
+        Args:
+            group (str): Project group the notification belongs to
+            now (float): Current time.time(), for tests
+
+        Returns:
+            int: Notifications dropped for group since the last one that got
+            through, when a token was available; None when the notification
+            must be dropped
+        """
+        burst = hook_config.get("rate_limit_burst", 5)
+        if burst <= 0:
+            return 0
+        rate = hook_config.get("rate_limit_per_minute", 12.0) / 60
+        now = time.time() if now is None else now
+
+        with shared_state.locked_state(self.state_name) as state:
+            bucket = state.get(group)
+            if not isinstance(bucket, dict):
+                bucket = {"tokens": burst, "at": now, "dropped": 0}
+            tokens = min(burst, bucket["tokens"] + max(0.0, now - bucket["at"]) * rate)
+
+            if tokens < 1:
+                state[group] = {"tokens": tokens, "at": now, "dropped": bucket["dropped"] + 1}
+                return None
+            dropped = bucket["dropped"]
+            state[group] = {"tokens": tokens - 1, "at": now, "dropped": 0}
+
+            # Buckets that have refilled completely hold nothing worth keeping
+            for name in [name for name, b in state.items()
+                         if name != group and isinstance(b, dict) and not b.get("dropped")
+                         and b.get("tokens", 0) + (now - b.get("at", 0)) * rate >= burst]:
+                del state[name]
+            return dropped
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Small JSON state files shared by concurrent hook processes.
+
+Each state file lives at ~/.claude/cache/{name}.json and is only read or written
+while holding an exclusive flock on it, so a read-modify-write through
+locked_state() is atomic with respect to every other hook process.
+"""
+
+import fcntl
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def state_path(name):
+    return Path.home() / ".claude" / "cache" / f"{name}.json"
+
+
+@contextmanager
+def locked_state(name):
+    """
+    Lock a shared state file and yield its contents as a dict.
+
+    Changes made to the dict are written back before the lock is released. A
+    missing or corrupt file yields an empty dict.
+
+    Example:
+        with locked_state("slack_circuit") as state:
+            state["failures"] = state.get("failures", 0) + 1
+    """
+    path = state_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        raw = f.read()
+        try:
+            state = json.loads(raw) if raw else {}
+        except ValueError:
+            state = {}
+        if not isinstance(state, dict):
+            state = {}
+
+        yield state
+
+        updated = json.dumps(state, separators=(",", ":"))
+        if updated != raw:
+            f.seek(0)
+            f.truncate()
+            f.write(updated)
+            f.flush()
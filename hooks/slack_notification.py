@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Shared Slack app notification utilities for Claude hooks.
+
+Posts hook events to the local Slack app (setting slack_url, default
+http://localhost:8080/claude/hook) using only the standard library: http.client
+is imported on first use, so hook runs that never reach Slack don't pay its
+import cost. A long-lived process such as the notification daemon can call
+use_keep_alive() to reuse pooled keep-alive connections between posts.
+
+Payloads that fail because the Slack app is unreachable or erroring are queued
+in the slack_outbox and retried; each successful send also drains due entries.
+A shared circuit breaker skips the endpoint entirely for a cooldown after
+repeated failures, so a hung Slack app doesn't cost every hook its full timeout.
+Events over the project's rate_limit budget are dropped and counted in the next
+event that goes out (see rate_limit).
+
+With the setting slack_batch enabled, queued payloads are drained as JSON arrays,
+several per POST (up to slack_batch_max_size payloads and slack_batch_max_bytes
+bytes). A receiver that rejects arrays with a 4xx status is remembered for
+BATCH_RETRY_SECONDS in the shared_state file "slack_batch", and payloads go
+out one per POST meanwhile.
+"""
+
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import circuit_breaker
+import hook_config
+import hook_log
+import project_identity
+import rate_limit
+import shared_state
+import slack_outbox
+
+SLACK_HOOK_URL = "http://localhost:8080/claude/hook"
+
+# Statuses meaning the receiver does not take a JSON array
+BATCH_UNSUPPORTED_STATUSES = {400, 404, 405, 415, 422}
+
+# How long to stick to single posts after the receiver rejected a batch
+BATCH_RETRY_SECONDS = 3600
+
+breaker = circuit_breaker.CircuitBreaker("slack")
+rate_limiter = rate_limit.RateLimiter("slack")
+
+# Idle keep-alive connections by (scheme, host, port); None when pooling is off
+_idle_connections = None
+_pool_lock = threading.Lock()
+
+
+def use_keep_alive(enabled=True):
+    """Keep connections open and reuse them for later posts (for long-lived processes)."""
+    global _idle_connections
+    with _pool_lock:
+        for connections in (_idle_connections or {}).values():
+            for conn in connections:
+                conn.close()
+        _idle_connections = {} if enabled else None
+
+
+def _checkout(key):
+    with _pool_lock:
+        if _idle_connections and _idle_connections.get(key):
+            return _idle_connections[key].pop()
+    return None
+
+
+def _checkin(key, conn):
+    with _pool_lock:
+        if _idle_connections is not None:
+            _idle_connections.setdefault(key, []).append(conn)
+            return
+    conn.close()
+
+
+def http_post_json(url, payload, timeout):
+    """
+    POST payload as JSON and return the response status code.
+
+    Raises:
+        OSError: If the endpoint could not be reached or the connection broke,
+                 including timeouts
+    """
+    import http.client
+
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.hostname, parts.port)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+
+    conn = _checkout(key)
+    reused = conn is not None
+    while True:
+        if conn is None:
+            connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = connection_class(parts.hostname, parts.port, timeout=timeout)
+        elif conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            break
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if reused:
+                # The server may have closed an idle keep-alive connection; retry fresh once
+                conn, reused = None, False
+                continue
+            raise e if isinstance(e, OSError) else ConnectionError(str(e))
+
+    if response.will_close:
+        conn.close()
+    else:
+        _checkin(key, conn)
+    return response.status
+
+
+def log_slack(message, level="INFO"):
+    """Buffer a log message for ~/.claude/logs/slack_notification.log"""
+    hook_log.get_logger("slack_notification.log").log(level, message)
+
+
+def post_payload(payload, timeout=10, queue_on_failure=False):
+    """
+    POST one payload to the Slack app.
+
+    Args:
+        payload (dict): The Slack hook payload
+        timeout (float): Seconds to wait for the Slack app
+        queue_on_failure (bool): Store the payload in the outbox if the Slack app
+                                 is unreachable or answers with a 5xx status
+
+    Returns:
+        bool: True if the Slack app answered 200, False otherwise
+    """
+    retryable = True
+    if not breaker.allow(probe_timeout=timeout):
+        log_slack("⚡ Slack circuit open, skipping endpoint")
+    else:
+        try:
+            log_slack(f"🚀 Sending to Slack: {payload}", level="DEBUG")
+            status = http_post_json(hook_config.get("slack_url", SLACK_HOOK_URL), payload, timeout)
+            log_slack(f"📡 Slack response: {status}")
+            retryable = status >= 500
+        except OSError as e:
+            log_slack(f"🔌 Slack connection error: {e}", level="WARNING")
+
+        if retryable:
+            if breaker.record_failure():
+                log_slack("⚡ Slack circuit opened after repeated failures", level="WARNING")
+        else:
+            breaker.record_success()
+            if status == 200:
+                return True
+
+    if queue_on_failure and retryable and hook_config.get("outbox_enabled", True):
+        try:
+            slack_outbox.enqueue(payload)
+            log_slack("📥 Queued payload in outbox for retry")
+        except Exception as e:
+            log_slack(f"❌ Could not queue payload: {e}", level="ERROR")
+    return False
+
+
+def post_batch(payloads, timeout=10):
+    """
+    POST several payloads to the Slack app as one JSON array.
+
+    Args:
+        payloads (list): Slack hook payloads
+        timeout (float): Seconds to wait for the Slack app
+
+    Returns:
+        bool: True if the Slack app answered 200, False if the batch failed,
+              or None if the receiver does not accept batches
+    """
+    if not breaker.allow(probe_timeout=timeout):
+        log_slack("⚡ Slack circuit open, skipping endpoint")
+        return False
+    try:
+        log_slack(f"🚀 Sending batch of {len(payloads)} to Slack", level="DEBUG")
+        status = http_post_json(hook_config.get("slack_url", SLACK_HOOK_URL), payloads, timeout)
+    except OSError as e:
+        log_slack(f"🔌 Slack connection error: {e}", level="WARNING")
+        breaker.record_failure()
+        return False
+
+    log_slack(f"📡 Slack batch response: {status}")
+    if status >= 500:
+        breaker.record_failure()
+        return False
+    breaker.record_success()
+    if status == 413:
+        return None
+    if status in BATCH_UNSUPPORTED_STATUSES:
+        with shared_state.locked_state("slack_batch") as state:
+            state["unsupported_until"] = time.time() + BATCH_RETRY_SECONDS
+        log_slack(f"📭 Slack app does not accept batches ({status}), posting singly")
+        return None
+    return status == 200
+
+
+def _batching_enabled():
+    if not hook_config.get("slack_batch", False):
+        return False
+    with shared_state.locked_state("slack_batch") as state:
+        return time.time() >= state.get("unsupported_until", 0)
+
+
+def drain_outbox(deadline=None, force=False):
+    """
+    Send due outbox entries, in batches when slack_batch is enabled.
+
+    Args:
+        deadline (float): time.monotonic() value after which no new send starts
+        force (bool): Also send entries whose backoff has not expired yet
+
+    Returns:
+        tuple: (sent, failed) counts
+    """
+    if not _batching_enabled():
+        return slack_outbox.drain(post_payload, deadline=deadline, force=force)
+    return slack_outbox.drain(
+        post_payload, deadline=deadline, force=force, send_batch=post_batch,
+        max_batch=hook_config.get("slack_batch_max_size", 20),
+        max_bytes=hook_config.get("slack_batch_max_bytes", 64 * 1024),
+    )
+
+
+def send_to_slack_app(session_id, message, hook_type="notification", timeout=10, event_count=1, cwd=None):
+    """
+    Post one hook event to the local Slack app.
+
+    If delivery fails the event is queued for retry; if it succeeds, previously
+    queued events that are due are flushed with whatever time remains.
+
+    Args:
+        session_id (str): Claude session the event belongs to
+        message (str): Notification text
+        hook_type (str): Event kind, e.g. "stop_complete" or "notification_idle_prompt"
+        timeout (float): Seconds to wait for the Slack app, including the flush
+        event_count (int): Events coalesced into this one; sent when above 1
+        cwd (str): The hook payload's cwd, whose project is rate-limited as a group
+
+    Returns:
+        bool: True if the Slack app answered 200, False otherwise (including
+        when the event was dropped by the rate limiter)
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        group = project_identity.resolve(cwd).group
+    except OSError:
+        group = ""
+    dropped = rate_limiter.acquire(group)
+    if dropped is None:
+        log_slack(f"🚦 Slack rate limit reached for '{group}', dropping event")
+        return False
+
+    payload = {"session_id": session_id, "message": message + rate_limit.suppressed_note(dropped),
+               "hook_type": hook_type}
+    if event_count > 1:
+        payload["event_count"] = event_count
+    if dropped:
+        payload["rate_limited_count"] = dropped
+    if not post_payload(payload, timeout, queue_on_failure=True):
+        return False
+
+    try:
+        sent, failed = drain_outbox(deadline=deadline)
+        if sent or failed:
+            log_slack(f"📤 Flushed outbox: {sent} sent, {failed} failed")
+    except Exception as e:
+        log_slack(f"❌ Could not flush outbox: {e}", level="ERROR")
+    return True
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Durable outbox for Slack payloads that could not be delivered.
+
+Payloads that fail with a connection error, timeout or 5xx response are stored in
+an SQLite database (~/.claude/cache/slack_outbox.sqlite3) and retried with
+exponential backoff. A later successful send drains due entries in bulk (several
+per POST when the caller supplies a batch sender), and the drain command
+flushes the queue on demand. Rows are leased while being
+sent, so concurrent hook processes never send the same entry twice at once.
+
+Settings (see hook_config):
+- outbox_enabled:      queue failed payloads (default true)
+- outbox_max_entries:  newest entries kept; older ones are dropped (default 200)
+- outbox_ttl_seconds:  entries older than this are dropped unsent (default 3600)
+- outbox_drain_batch:  entries sent per drain (default 20)
+
+Usage:
+    slack_outbox.py drain     Send every queued entry now, ignoring backoff
+    slack_outbox.py status    Show queued entries
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import hook_config
+
+# Retry delay after the n-th failure is min(BACKOFF_BASE * 2**n, BACKOFF_MAX) seconds
+BACKOFF_BASE = 5
+BACKOFF_MAX = 15 * 60
+
+# Seconds a drainer owns the rows it is sending before others may retry them
+LEASE_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL
+)
+"""
+
+
+def outbox_path():
+    return Path.home() / ".claude" / "cache" / "slack_outbox.sqlite3"
+
+
+def _connect():
+    path = outbox_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying an entry that has failed attempts times."""
+    return min(BACKOFF_BASE * 2 ** attempts, BACKOFF_MAX)
+
+
+def _prune(conn, now):
+    """Drop expired entries and everything beyond the newest outbox_max_entries."""
+    conn.execute("DELETE FROM outbox WHERE created < ?", (now - hook_config.get("outbox_ttl_seconds", 3600),))
+    conn.execute(
+        "DELETE FROM outbox WHERE id NOT IN (SELECT id FROM outbox ORDER BY id DESC LIMIT ?)",
+        (hook_config.get("outbox_max_entries", 200),),
+    )
+
+
+def enqueue(payload, attempts=1):
+    """
+    Store a payload for a later retry.
+
+    Args:
+        payload (dict): The Slack hook payload
+        attempts (int): Delivery attempts already made, which sets the first retry delay
+    """
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO outbox (payload, created, attempts, next_attempt) VALUES (?, ?, ?, ?)",
+            (json.dumps(payload), now, attempts, now + backoff(attempts - 1)),
+        )
+        _prune(conn, now)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _claim_due(conn, limit, now, force=False):
+    """
+    Lease up to limit due entries to this process.
+
+    Returns:
+        list: (id, attempts, payload) tuples, oldest first. With force, entries
+        still waiting out their backoff are included too.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _prune(conn, now)
+        rows = conn.execute(
+            "SELECT id, attempts, payload FROM outbox WHERE next_attempt <= ? ORDER BY id LIMIT ?",
+            (float("inf") if force else now, limit),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE outbox SET next_attempt = ? WHERE id = ?",
+            [(now + LEASE_SECONDS, row[0]) for row in rows],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return [(row_id, attempts, json.loads(payload)) for row_id, attempts, payload in rows]
+
+
+def _take_batch(entries, max_batch, max_bytes):
+    """Leading entries that fit in one batch: at most max_batch, and max_bytes of JSON after the first."""
+    size = 0
+    for count, (_, _, payload) in enumerate(entries[:max_batch]):
+        size += len(json.dumps(payload)) + 1
+        if count and size > max_bytes:
+            return entries[:count]
+    return entries[:max_batch]
+
+
+def drain(send, limit=None, deadline=None, force=False, send_batch=None, max_batch=20, max_bytes=64 * 1024):
+    """
+    Send due outbox entries in order, stopping at the first failure.
+
+    Args:
+        send (callable): send(payload, timeout) -> bool, True once delivered
+        limit (int): Maximum entries to send; defaults to outbox_drain_batch
+        deadline (float): time.monotonic() value after which no new send starts
+        force (bool): Also send entries whose backoff has not expired yet
+        send_batch (callable): Optional send_batch(payloads, timeout) -> bool, or
+                               None if the receiver does not accept batches, in
+                               which case the rest is sent one by one
+        max_batch (int): Most entries per batch
+        max_bytes (int): Most JSON bytes per batch, unless a single entry is larger
+
+    Returns:
+        tuple: (sent, failed) counts
+    """
+    if not outbox_path().exists():
+        return 0, 0
+    now = time.time()
+    conn = _connect()
+    try:
+        queue = _claim_due(conn, limit or hook_config.get("outbox_drain_batch", 20), now, force)
+        sent = failed = 0
+        while queue:
+            timeout = 10 if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            batch = _take_batch(queue, max_batch, max_bytes) if send_batch else queue[:1]
+            if len(batch) > 1:
+                delivered = send_batch([payload for _, _, payload in batch], timeout)
+                if delivered is None:
+                    send_batch = None
+                    continue
+            else:
+                delivered = send(batch[0][2], timeout)
+            del queue[:len(batch)]
+
+            if delivered:
+                conn.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id, _, _ in batch])
+                sent += len(batch)
+            else:
+                conn.executemany(
+                    "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                    [(attempts + 1, time.time() + backoff(attempts), row_id) for row_id, attempts, _ in batch],
+                )
+                failed += len(batch)
+                break
+
+        # Release the leases on entries this drain never got to
+        conn.executemany("UPDATE outbox SET next_attempt = ? WHERE id = ?", [(now, entry[0]) for entry in queue])
+        return sent, failed
+    finally:
+        conn.close()
+
+
+def pending():
+    """Return the queued entries as a list of dicts, oldest first."""
+    if not outbox_path().exists():
+        return []
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT id, payload, created, attempts, next_attempt FROM outbox ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    return [
+        {"id": row_id, "payload": json.loads(payload), "created": created,
+         "attempts": attempts, "next_attempt": next_attempt}
+        for row_id, payload, created, attempts, next_attempt in rows
+    ]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or flush the Slack outbox.")
+    parser.add_argument("command", choices=["drain", "status"])
+    args = parser.parse_args()
+
+    if args.command == "status":
+        now = time.time()
+        for entry in pending():
+            payload = entry["payload"]
+            print(f"#{entry['id']}  {payload.get('hook_type', '')}  session={payload.get('session_id', '')}  "
+                  f"attempts={entry['attempts']}  retry in {max(0, entry['next_attempt'] - now):.0f}s")
+        return
+
+    import slack_notification
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = slack_notification.drain_outbox(force=True)
+        total_sent += sent
+        total_failed += failed
+        if failed or not sent:
+            break
+    print(f"sent {total_sent}, failed {total_failed}, queued {len(pending())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory extraction from very large transcript entries.
+
+A single assistant entry can be a JSON line of many megabytes (long text output,
+big tool inputs), yet the hooks only need the start of its first text block and
+its tool_use names. summarize_entry() walks such a line forward with a small
+incremental JSON scanner instead of decoding it: strings are kept only up to a
+prefix and everything else is skipped, reading at most max_bytes from the file
+in fixed-size chunks. Memory use is bounded by the chunk size plus the kept
+prefixes, whatever the size of the line. The walk stops as soon as the entry's
+message.role shows it is not an assistant entry. As in the small-line path of
+macos_notification, message.role alone decides: the top-level type is ignored.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+# Returned by summarize_entry() when the budget ran out before the entry's role
+# was read: the entry may be the latest assistant entry or not
+UNDETERMINED = "undetermined"
+
+# Bytes that end a run of string content, and bytes that matter while skipping a value
+_STRING_STOP = re.compile(rb'["\\]')
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb'[,\]}\s]')
+
+
+class _ReadLimit(Exception):
+    """
+    Raised when the scanner reaches its byte budget or the end of the entry.
+
+    When raised from read_string(), args[0] is the prefix read so far.
+    """
+
+
+class _NotAssistant(Exception):
+    """Raised once the entry's role shows it is not an assistant entry."""
+
+
+class _Scanner:
+    """Forward reader over f[start:end] that refills a small buffer on demand."""
+
+    def __init__(self, f, start, end, max_bytes):
+        self.f = f
+        self.remaining = min(end - start, max_bytes)
+        self.buf = b""
+        self.pos = 0
+        f.seek(start)
+
+    def _fill(self):
+        if self.remaining <= 0:
+            raise _ReadLimit()
+        chunk = self.f.read(min(CHUNK_SIZE, self.remaining))
+        if not chunk:
+            raise _ReadLimit()
+        self.remaining -= len(chunk)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """Return the next non-whitespace byte without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in b" \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, byte):
+        if self.peek() != byte:
+            raise ValueError(f"expected {byte!r} in transcript entry")
+        self.pos += 1
+
+    def read_string(self, limit):
+        """Consume a JSON string and return its first limit characters, skipping the rest."""
+        self.expect(b'"')
+        kept = []
+        try:
+            self._read_string_body(kept, limit)
+        except _ReadLimit:
+            raise _ReadLimit(self._decode(kept, limit))
+        return self._decode(kept, limit)
+
+    @staticmethod
+    def _decode(kept, limit):
+        raw = b"".join(kept).decode("utf-8", "ignore")
+        return json.loads(f'"{raw}"')[:limit]
+
+    def _read_string_body(self, kept, limit):
+        kept_bytes = 0
+        while True:
+            match = _STRING_STOP.search(self.buf, self.pos)
+            if match is None:
+                if kept_bytes < limit * 4:
+                    kept.append(self.buf[self.pos:])
+                    kept_bytes += len(self.buf) - self.pos
+                self.pos = len(self.buf)
+                self._fill()
+                continue
+            stop = match.start()
+            if kept_bytes < limit * 4:
+                kept.append(self.buf[self.pos:stop])
+                kept_bytes += stop - self.pos
+            if self.buf[stop:stop + 1] == b'"':
+                self.pos = stop + 1
+                return
+            # An escape: keep it whole so the kept bytes always decode
+            while stop + 2 > len(self.buf) or (self.buf[stop + 1:stop + 2] == b"u" and stop + 6 > len(self.buf)):
+                self.pos = stop
+                self._fill()
+                stop = 0
+            length = 6 if self.buf[stop + 1:stop + 2] == b"u" else 2
+            if kept_bytes < limit * 4:
+                kept.append(self.buf[stop:stop + length])
+                kept_bytes += length
+            self.pos = stop + length
+
+    def skip_value(self):
+        """Consume one JSON value of any size without keeping it."""
+        first = self.peek()
+        if first == b'"':
+            self.read_string(0)
+            return
+        if first not in (b"{", b"["):
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                self._fill()
+
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                self._fill()
+                continue
+            byte = self.buf[match.start():match.start() + 1]
+            if byte == b'"':
+                self.pos = match.start()
+                self.read_string(0)
+                continue
+            self.pos = match.start() + 1
+            depth += 1 if byte in (b"{", b"[") else -1
+            if depth == 0:
+                return
+
+    def members(self):
+        """Iterate the keys of an object, leaving the scanner at each key's value."""
+        self.expect(b"{")
+        if self.peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string(64)
+            self.expect(b":")
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == b"}":
+                return
+
+    def elements(self):
+        """Iterate the elements of an array, leaving the scanner at each element."""
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == b"]":
+                return
+
+
+def _scan_item(scanner, prefix_chars, summary):
+    """Read one content block, keeping only its type, text prefix and name."""
+    fields = {}
+    try:
+        for key in scanner.members():
+            if key in ("type", "name"):
+                fields[key] = scanner.read_string(256) if scanner.peek() == b'"' else scanner.skip_value()
+            elif key == "text" and scanner.peek() == b'"' and summary["text"] is None:
+                try:
+                    fields["text"] = scanner.read_string(prefix_chars)
+                except _ReadLimit as cut:
+                    fields["text"] = cut.args[0] if cut.args else None
+                    raise
+            else:
+                scanner.skip_value()
+    finally:
+        # Runs on _ReadLimit too, so a block cut short by the budget still counts
+        if fields.get("type") == "text" and summary["text"] is None and (fields.get("text") or "").strip():
+            summary["text"] = fields["text"]
+        elif fields.get("type") == "tool_use":
+            summary["tools"].append(fields.get("name") or "")
+
+
+def _scan_message(scanner, prefix_chars, summary):
+    for key in scanner.members():
+        if key == "role" and scanner.peek() == b'"':
+            summary["role"] = scanner.read_string(32)
+            if summary["role"] != "assistant":
+                raise _NotAssistant()
+        elif key == "content" and scanner.peek() == b'"':
+            try:
+                summary["text"] = scanner.read_string(prefix_chars)
+            except _ReadLimit as cut:
+                summary["text"] = cut.args[0] if cut.args else None
+                raise
+        elif key == "content" and scanner.peek() == b"[":
+            for _ in scanner.elements():
+                if scanner.peek() == b"{":
+                    _scan_item(scanner, prefix_chars, summary)
+                else:
+                    scanner.skip_value()
+        else:
+            scanner.skip_value()
+
+
+def summarize_entry(f, start, end, max_bytes, prefix_chars):
+    """
+    Summarize the transcript entry in f[start:end] without decoding it whole.
+
+    Args:
+        f: Binary file object
+        start (int): Offset of the entry's first byte
+        end (int): Offset just past the entry's last byte
+        max_bytes (int): Most bytes to read; a larger entry is summarized from
+                         what was read up to this point
+        prefix_chars (int): Characters of text kept from the first text block
+
+    Returns:
+        dict: A stand-in entry, {"message": {"role", "content"}}, whose content
+        holds the first text block's prefix followed by one {"type": "tool_use",
+        "name"} block per tool. None if the entry is not an assistant entry, or
+        UNDETERMINED if max_bytes ran out before its role was read.
+    """
+    summary = {"role": None, "text": None, "tools": []}
+    scanner = _Scanner(f, start, end, max_bytes)
+    try:
+        for key in scanner.members():
+            if key == "message" and scanner.peek() == b"{":
+                _scan_message(scanner, prefix_chars, summary)
+            else:
+                scanner.skip_value()
+    except _ReadLimit:
+        if summary["role"] is None and end - start > max_bytes:
+            return UNDETERMINED
+    except (_NotAssistant, ValueError):
+        return None
+
+    if summary["role"] != "assistant":
+        return None
+    content = [{"type": "text", "text": summary["text"]}] if summary["text"] is not None else []
+    content.extend({"type": "tool_use", "name": name} for name in summary["tools"])
+    return {"message": {"role": "assistant", "content": content}}
@@ -1,10 +1,67 @@
 # tests/conftest.py
+import importlib.util
 import json
+import sys
 import pytest
 from pathlib import Path
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+
+# Hook modules import their siblings by name, as they do when run from hooks/
+sys.path.insert(0, str(HOOKS_DIR))
+
+
+def load_hook(name, path=None):
+    """
+    Execute a fresh copy of hooks/{name}.py, or of the script at path, and return it.
+
+    The module is registered in sys.modules under name, so sibling modules that
+    import it share this copy; for hook modules, fresh_hook_modules flushes and
+    unloads it after the test.
+    """
+    spec = importlib.util.spec_from_file_location(name, path or HOOKS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """Point ~ at a temp dir so hook logs and caches under ~/.claude never leak between tests."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    # Hooks fire back to back in most tests; only the coalescing tests want them merged
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_COALESCE_WINDOW_SECONDS", "0")
+    # Never show real desktop notifications from a developer's session bus
+    monkeypatch.delenv("DBUS_SESSION_BUS_ADDRESS", raising=False)
+    return home
+
+
+@pytest.fixture(autouse=True)
+def fresh_hook_modules(isolated_home):
+    """
+    Unload hook modules after each test, as if every test were a new hook process.
+
+    Buffered log records and metrics are flushed first, while HOME still points
+    at the test's home, and dropped so no exit handler writes them later.
+    """
+    yield
+    for name in ("hook_log", "hook_metrics"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.flush_all()
+    if "hook_log" in sys.modules:
+        sys.modules["hook_log"]._loggers.clear()
+    if "hook_metrics" in sys.modules:
+        sys.modules["hook_metrics"]._records.clear()
+    for name, module in list(sys.modules.items()):
+        if Path(getattr(module, "__file__", None) or "").parent == HOOKS_DIR:
+            del sys.modules[name]
+
 
 @pytest.fixture
 def transcript_with_ask(tmp_path):
@@ -0,0 +1,72 @@
+"""
+Local stand-in for the Slack app's http://localhost:8080/claude/hook endpoint.
+
+Usage:
+    with SlackStub() as slack:
+        os.environ["CLAUDE_NOTIFICATIONS_SLACK_URL"] = slack.url
+        ...
+        assert slack.posts[0]["hook_type"] == "stop_complete"
+
+With batch=True the stub also accepts a JSON array of payloads per POST, as a
+batching receiver would; otherwise arrays are rejected with 400.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    # Room for bursts of hook processes connecting at once
+    request_queue_size = 512
+
+
+class SlackStub:
+    """Threaded HTTP server recording JSON posts and answering with a configurable status."""
+
+    def __init__(self, status=200, delay=0.0, batch=False):
+        self.status = status
+        self.delay = delay
+        self.batch = batch
+        self.posts = []
+        self.batches = []
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests.append((self.path, body))
+                if stub.delay:
+                    time.sleep(stub.delay)
+                payload = json.loads(body)
+                status = stub.status
+                if isinstance(payload, list) and not stub.batch:
+                    status = 400
+                elif status == 200 and isinstance(payload, list):
+                    stub.batches.append(len(payload))
+                    stub.posts.extend(payload)
+                elif status == 200:
+                    stub.posts.append(payload)
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/claude/hook"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,89 @@
+"""
+Tests for the shared Slack circuit breaker in hooks/circuit_breaker.py.
+
+Covers:
+- The circuit opens after N consecutive failures and Slack is skipped
+- After the cooldown exactly one half-open probe is let through
+- State is shared between breakers (i.e. between hook processes)
+"""
+
+import json
+import os
+import sys
+import time
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+
+@pytest.fixture
+def circuit_breaker():
+    return load_hook("circuit_breaker")
+
+
+def test_opens_after_threshold_failures(circuit_breaker):
+    breaker = circuit_breaker.CircuitBreaker("test")
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.allow() is True
+    assert breaker.record_failure() is True
+    assert breaker.allow() is False
+
+
+def test_success_resets_failure_count(circuit_breaker):
+    breaker = circuit_breaker.CircuitBreaker("test")
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.record_failure() is False
+
+
+def test_single_half_open_probe_after_cooldown(circuit_breaker, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_CIRCUIT_FAILURE_THRESHOLD", "1")
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_CIRCUIT_COOLDOWN_SECONDS", "30")
+    first, second = circuit_breaker.CircuitBreaker("test"), circuit_breaker.CircuitBreaker("test")
+    first.record_failure()
+    assert second.allow() is False
+
+    with patch("time.time", return_value=time.time() + 31):
+        assert first.allow() is True
+        assert second.allow() is False
+        first.record_failure()
+        assert second.allow() is False
+
+    with patch("time.time", return_value=time.time() + 62):
+        assert second.allow() is True
+        second.record_success()
+        assert first.allow() is True
+
+
+def test_open_circuit_skips_slack_in_both_hooks(base_hook_input, transcript_without_ask, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DELIVERY_DEADLINE", "2")
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DEDUP_TTL_SECONDS", "0")
+    for name in ("slack_notification", "circuit_breaker"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    hook_inputs = {
+        "Stop": {**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_without_ask},
+        "Notification": {**base_hook_input, "hook_event_name": "Notification",
+                         "transcript_path": transcript_without_ask, "notification_type": "idle_prompt"},
+    }
+    calls = {}
+    for event, hook_input in hook_inputs.items():
+        with SlackStub(status=503) as slack, \
+             patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+             patch("sys.stdin", StringIO(json.dumps(hook_input))), \
+             patch("subprocess.run", return_value=MagicMock(returncode=0, stderr="")):
+            for _ in range(3):
+                try:
+                    load_hook("notifications_dispatch").main()
+                except SystemExit:
+                    pass
+                sys.stdin.seek(0)
+            calls[event] = len(slack.requests)
+
+    # The first three Stop events trip the breaker; every later event skips Slack
+    assert calls == {"Stop": 3, "Notification": 0}
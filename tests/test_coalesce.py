@@ -0,0 +1,97 @@
+# tests/test_coalesce.py
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+
+
+@pytest.fixture
+def coalesce(monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_COALESCE_WINDOW_SECONDS", "10")
+    for name in ("hook_config", "shared_state", "coalesce"):
+        sys.modules.pop(name, None)
+    return load_hook("coalesce")
+
+
+def job(message):
+    return {"session_id": "s1", "message": message, "hook_type": "stop_complete",
+            "subtitle": "Task Complete", "sound": "Hero"}
+
+
+def test_first_event_delivers_and_burst_merges(coalesce):
+    assert coalesce.admit("proj:s1", job("one"), now=100) == (coalesce.DELIVER, job("one"))
+
+    outcome, pending = coalesce.admit("proj:s1", job("two"), now=101)
+    assert outcome == coalesce.SCHEDULE and pending["count"] == 1
+
+    outcome, pending = coalesce.admit("proj:s1", job("three"), now=102)
+    assert outcome == coalesce.MERGED
+    assert pending["message"] == "three" and pending["count"] == 2
+
+
+def test_keys_are_independent(coalesce):
+    assert coalesce.admit("proj:s1", job("a"), now=100)[0] == coalesce.DELIVER
+    assert coalesce.admit("proj:s2", job("b"), now=100)[0] == coalesce.DELIVER
+    assert coalesce.admit("other:s1", job("c"), now=100)[0] == coalesce.DELIVER
+
+
+def test_event_after_window_delivers(coalesce):
+    coalesce.admit("proj:s1", job("one"), now=100)
+    assert coalesce.admit("proj:s1", job("two"), now=111)[0] == coalesce.DELIVER
+
+
+def test_collect_takes_pending_and_opens_new_window(coalesce):
+    now = time.time()
+    coalesce.admit("proj:s1", job("one"), now=now - 10)
+    coalesce.admit("proj:s1", job("two"), now=now - 5)
+    coalesce.admit("proj:s1", job("three"), now=now - 1)
+
+    merged = coalesce.collect("proj:s1")
+    assert merged["message"] == "three" and merged["count"] == 2
+    assert coalesce.collect("proj:s1") is None
+    assert coalesce.admit("proj:s1", job("four"))[0] == coalesce.SCHEDULE
+
+
+def test_orphaned_pending_is_delivered_with_next_event(coalesce):
+    coalesce.admit("proj:s1", job("one"), now=100)
+    coalesce.admit("proj:s1", job("two"), now=101)
+    outcome, merged = coalesce.admit("proj:s1", job("three"), now=125)
+    assert outcome == coalesce.DELIVER
+    assert merged["message"] == "three" and merged["count"] == 2
+
+
+def test_zero_window_disables_coalescing(coalesce, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_COALESCE_WINDOW_SECONDS", "0")
+    for _ in range(3):
+        assert coalesce.admit("proj:s1", job("x"))[0] == coalesce.DELIVER
+
+
+def test_burst_of_hook_processes_yields_two_deliveries(base_hook_input, transcript_without_ask, isolated_home):
+    """End to end: separate Stop hook processes share the window through the state file."""
+    hook_input = json.dumps({**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_without_ask})
+    with SlackStub() as slack:
+        env = {**os.environ, "HOME": str(isolated_home), "PATH": str(isolated_home),
+               "CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url,
+               "CLAUDE_NOTIFICATIONS_COALESCE_WINDOW_SECONDS": "1",
+               "CLAUDE_NOTIFICATIONS_DEDUP_TTL_SECONDS": "0"}
+        for _ in range(4):
+            subprocess.run([sys.executable, str(HOOKS_DIR / "notifications_dispatch.py")],
+                           input=hook_input, text=True, env=env, timeout=30, cwd=str(isolated_home))
+
+        deadline = time.monotonic() + 20
+        while len(slack.posts) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)
+
+    assert len(slack.posts) == 2
+    assert "event_count" not in slack.posts[0]
+    assert slack.posts[1]["event_count"] == 3
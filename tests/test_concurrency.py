@@ -0,0 +1,81 @@
+# tests/test_concurrency.py
+"""
+Stress test: many hook processes sharing one ~/.claude at the same time.
+
+Every process runs the dispatcher on its own Stop event while logs rotate under
+them. Afterwards every log and metrics line must parse, every process must have
+left all of its records, and every notification must have reached Slack.
+
+The default run starts 20 processes, enough to contend for every lock and
+rotate the logs. Set CLAUDE_NOTIFICATIONS_STRESS_PROCESSES (e.g. to 200) for
+the full stress run.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from tests.slack_stub import SlackStub
+
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+PROCESSES = int(os.environ.get("CLAUDE_NOTIFICATIONS_STRESS_PROCESSES", "20"))
+
+
+def log_lines(path):
+    """Lines of a log file and all of its rotated segments."""
+    lines = []
+    for file in path.parent.glob(path.name + "*"):
+        if not file.name.endswith(".lock"):
+            lines.extend(file.read_text(encoding="utf-8").splitlines())
+    return lines
+
+
+def test_parallel_hooks_lose_and_corrupt_nothing(isolated_home, tmp_path):
+    transcripts = []
+    for i in range(PROCESSES // 4):
+        path = tmp_path / f"t{i}.jsonl"
+        path.write_text(json.dumps({"message": {"role": "assistant", "content": [
+            {"type": "text", "text": f"Finished task {i}"}]}}) + "\n")
+        transcripts.append(str(path))
+
+    with SlackStub() as slack:
+        env = {**os.environ, "HOME": str(isolated_home),
+               "CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url,
+               "CLAUDE_NOTIFICATIONS_USE_DAEMON": "false",
+               # Hundreds of processes on a few cores can take seconds to reach Slack
+               "CLAUDE_NOTIFICATIONS_DELIVERY_DEADLINE": "30",
+               "CLAUDE_NOTIFICATIONS_DEDUP_TTL_SECONDS": "0",
+               "CLAUDE_NOTIFICATIONS_RATE_LIMIT_BURST": "0",
+               "CLAUDE_NOTIFICATIONS_LOG_FORMAT": "json",
+               "CLAUDE_NOTIFICATIONS_LOG_MAX_BYTES": "2048",
+               "CLAUDE_NOTIFICATIONS_LOG_BACKUP_COUNT": "100000",
+               "CLAUDE_NOTIFICATIONS_LOG_COMPRESS": "false"}
+        procs = []
+        for i in range(PROCESSES):
+            # Four sessions share each transcript, so index shards are contended too
+            payload = {"session_id": f"session-{i}", "hook_event_name": "Stop", "cwd": str(tmp_path),
+                       "transcript_path": transcripts[i % len(transcripts)]}
+            proc = subprocess.Popen([sys.executable, str(HOOKS_DIR / "notifications_dispatch.py")],
+                                    stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, env=env)
+            procs.append((proc, json.dumps(payload).encode()))
+        for proc, payload in procs:
+            proc.stdin.write(payload)
+            proc.stdin.close()
+        assert all(proc.wait(timeout=300) == 0 for proc, _ in procs)
+
+    assert sorted(p["session_id"] for p in slack.posts) == sorted(f"session-{i}" for i in range(PROCESSES))
+
+    logs = isolated_home / ".claude" / "logs"
+    records = [json.loads(line) for line in log_lines(logs / "stop_hook.log")]
+    triggered = [r["pid"] for r in records if r["msg"] == "🛑 STOP HOOK TRIGGERED"]
+    assert len(triggered) == len(set(triggered)) == PROCESSES
+    assert len(list(logs.glob("stop_hook.log.*"))) > 1
+
+    metrics = [json.loads(line) for line in log_lines(logs / "metrics.jsonl")]
+    assert sum(m["phase"] == "transcript_scan" for m in metrics) == PROCESSES
+
+    shards = list((isolated_home / ".claude" / "cache" / "transcript_index").glob("*.json"))
+    assert len(shards) == len(transcripts)
+    assert all(json.loads(shard.read_text())["entry"]["analysis"] for shard in shards)
@@ -0,0 +1,124 @@
+# tests/test_dedup.py
+import json
+import os
+import sys
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+
+@pytest.fixture
+def dedup():
+    for name in ("hook_config", "shared_state", "dedup"):
+        sys.modules.pop(name, None)
+    return load_hook("dedup")
+
+
+def test_repeat_within_ttl_is_duplicate(dedup):
+    key = dedup.message_key("s1", dedup.TURN_END, "Done.", 120)
+    assert dedup.is_duplicate(key, now=100) is False
+    dedup.record(key, now=100)
+    assert dedup.is_duplicate(key, now=200) is True
+
+
+def test_checking_does_not_record(dedup):
+    key = dedup.message_key("s1", dedup.TURN_END, "Done.", 120)
+    assert dedup.is_duplicate(key, now=100) is False
+    assert dedup.is_duplicate(key, now=101) is False
+
+
+def test_session_kind_entry_and_message_all_distinguish(dedup):
+    dedup.record(dedup.message_key("s1", dedup.TURN_END, "Done.", 120), now=100)
+    assert dedup.is_duplicate(dedup.message_key("s2", dedup.TURN_END, "Done.", 120), now=100) is False
+    assert dedup.is_duplicate(dedup.message_key("s1", "other", "Done.", 120), now=100) is False
+    assert dedup.is_duplicate(dedup.message_key("s1", dedup.TURN_END, "Done.", 480), now=100) is False
+    assert dedup.is_duplicate(dedup.message_key("s1", dedup.TURN_END, "Done again.", 120), now=100) is False
+
+
+def test_expired_entry_is_delivered_again(dedup, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DEDUP_TTL_SECONDS", "60")
+    key = dedup.message_key("s1", dedup.TURN_END, "Done.", 120)
+    dedup.record(key, now=100)
+    assert dedup.is_duplicate(key, now=161) is False
+
+
+def test_least_recently_seen_entry_is_evicted(dedup, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DEDUP_MAX_ENTRIES", "2")
+    a, b, c = (dedup.message_key("s1", dedup.TURN_END, text, 0) for text in "abc")
+    dedup.record(a, now=100)
+    dedup.record(b, now=101)
+    assert dedup.is_duplicate(a, now=102) is True   # "a" is now most recent
+    dedup.record(c, now=103)                        # evicts "b"
+    assert dedup.is_duplicate(a, now=104) is True
+    assert dedup.is_duplicate(b, now=105) is False
+
+
+def run_hooks(inputs, slack_url=None, notifier_returncode=0):
+    """Dispatch (hook event, payload) pairs in order; return (Slack posts, terminal-notifier calls)."""
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack_url or slack.url,
+                                 "CLAUDE_NOTIFICATIONS_OUTBOX_ENABLED": "false"}), \
+         patch("subprocess.run", return_value=MagicMock(returncode=notifier_returncode, stderr="")) as mock_run:
+        for event, hook_input in inputs:
+            if callable(hook_input):
+                hook_input = hook_input()
+            with patch("sys.stdin", StringIO(json.dumps({**hook_input, "hook_event_name": event}))):
+                try:
+                    load_hook("notifications_dispatch").main()
+                except SystemExit:
+                    pass
+        return slack.posts, mock_run.call_count
+
+
+def test_idle_prompt_after_stop_is_dropped(base_hook_input, transcript_without_ask):
+    posts, notifier_calls = run_hooks([
+        ("Stop", {**base_hook_input, "transcript_path": transcript_without_ask}),
+        ("Notification", {**base_hook_input, "transcript_path": transcript_without_ask,
+                          "notification_type": "idle_prompt"}),
+        ("Notification", {**base_hook_input, "transcript_path": transcript_without_ask,
+                          "notification_type": "permission_prompt",
+                          "message": "Claude needs your permission to use Bash"}),
+    ])
+    assert [p["hook_type"] for p in posts] == ["stop_complete", "notification_permission_prompt"]
+    assert notifier_calls == 2
+
+
+def append_entry(path, content):
+    with open(path, "a") as f:
+        f.write(json.dumps({"message": {"role": "assistant", "content": content}}) + "\n")
+
+
+def test_repeated_permission_prompts_all_notify(base_hook_input, transcript_tool_use_only):
+    prompt = {**base_hook_input, "transcript_path": transcript_tool_use_only, "notification_type": "permission_prompt",
+              "message": "Claude needs your permission to use Bash"}
+
+    def after_new_tool_use():
+        append_entry(transcript_tool_use_only, [{"type": "tool_use", "id": "tu_2", "name": "Bash", "input": {}}])
+        return prompt
+
+    posts, _ = run_hooks([("Notification", prompt), ("Notification", after_new_tool_use)])
+    assert [p["message"] for p in posts] == ["Claude needs your permission to use Bash"] * 2
+
+
+def test_same_text_in_a_later_turn_notifies(base_hook_input, tmp_path):
+    transcript = tmp_path / "transcript.jsonl"
+    append_entry(transcript, [{"type": "text", "text": "Done."}])
+    stop = {**base_hook_input, "transcript_path": str(transcript)}
+
+    def next_turn():
+        append_entry(transcript, [{"type": "text", "text": "Done."}])
+        return stop
+
+    posts, _ = run_hooks([("Stop", stop), ("Stop", next_turn)])
+    assert [p["message"] for p in posts] == ["Done.", "Done."]
+
+
+def test_failed_delivery_is_not_recorded(base_hook_input, transcript_without_ask):
+    stop = {**base_hook_input, "transcript_path": transcript_without_ask}
+    run_hooks([("Stop", stop)], slack_url="http://127.0.0.1:9/claude/hook", notifier_returncode=1)
+    posts, _ = run_hooks([("Notification", {**stop, "notification_type": "idle_prompt"})])
+    assert [p["hook_type"] for p in posts] == ["notification_idle_prompt"]
@@ -0,0 +1,56 @@
+"""
+Tests for concurrent channel dispatch in hooks/delivery.py.
+
+Covers:
+- Channels are sent concurrently, so latencies overlap
+- One overall deadline bounds the dispatch; late channels report "timeout"
+- Each channel's outcome and latency is reported
+"""
+
+import time
+
+from tests.conftest import load_hook
+
+delivery = load_hook("delivery")
+
+
+def sleeper(seconds, result=True):
+    def send(timeout):
+        time.sleep(seconds)
+        return result
+    return send
+
+
+def test_channels_run_concurrently():
+    start = time.monotonic()
+    results = delivery.dispatch({"a": sleeper(0.3), "b": sleeper(0.3)}, deadline=5)
+    assert time.monotonic() - start < 0.55
+    assert [r.status for r in results] == ["ok", "ok"]
+    assert all(0.25 < r.latency < 0.55 for r in results)
+
+
+def test_deadline_bounds_total_time():
+    start = time.monotonic()
+    results = delivery.dispatch({"slow": sleeper(3), "fast": sleeper(0.01)}, deadline=0.2)
+    assert time.monotonic() - start < 0.5
+    assert [(r.channel, r.status) for r in results] == [("slow", "timeout"), ("fast", "ok")]
+
+
+def test_failures_and_errors_are_reported():
+    def boom(timeout):
+        raise RuntimeError("down")
+
+    results = delivery.dispatch({"failed": sleeper(0, result=False), "error": boom}, deadline=1)
+    assert [r.status for r in results] == ["failed", "error"]
+
+
+def test_senders_receive_the_shared_deadline_as_timeout():
+    seen = []
+    delivery.dispatch({"a": lambda timeout: seen.append(timeout) or True}, deadline=1.5)
+    assert seen == [1.5]
+
+
+def test_deadline_defaults_to_setting(monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DELIVERY_DEADLINE", "0.1")
+    results = delivery.dispatch({"slow": sleeper(2)})
+    assert results[0].status == "timeout"
@@ -0,0 +1,94 @@
+# tests/test_detached_delivery.py
+import json
+import os
+import subprocess
+import sys
+import time
+from io import StringIO
+from unittest.mock import patch, MagicMock
+from pathlib import Path
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+
+
+def run_hook(hook_input=None, argv=None):
+    """
+    Dispatch hook_input, or run the worker command line argv, in-process;
+    return (slack_payloads, macos_calls, popen_args).
+    """
+    script = Path(argv[0]) if argv else HOOKS_DIR / "notifications_dispatch.py"
+    popen_args = []
+
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps(hook_input or {}))), \
+         patch("sys.argv", argv or [str(script)]), \
+         patch("subprocess.run") as mock_run, \
+         patch("subprocess.Popen", side_effect=lambda args, **kw: popen_args.append(args)):
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        try:
+            load_hook(script.stem, script).main()
+        except SystemExit:
+            pass
+        return slack.posts, mock_run.call_count, popen_args
+
+
+def test_detached_stop_hands_off_without_sending(base_hook_input, transcript_with_ask, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DELIVERY_MODE", "detached")
+    slack_payloads, macos_calls, popen_args = run_hook(
+        {**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_with_ask}
+    )
+    assert slack_payloads == [] and macos_calls == 0
+    assert len(popen_args) == 1
+
+    args = popen_args[0]
+    assert args[1].endswith("notifications_stop.py") and args[2] == "--deliver"
+    job = json.loads(Path(args[3]).read_text())
+    assert job["hook_type"] == "stop_needs_input"
+    assert job["subtitle"] == "Needs Input"
+
+
+def test_worker_delivers_job_and_removes_spool_file(base_hook_input, transcript_without_ask, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DELIVERY_MODE", "detached")
+    _, _, popen_args = run_hook({**base_hook_input, "hook_event_name": "Notification",
+                                 "notification_type": "idle_prompt", "transcript_path": transcript_without_ask})
+    job_path = popen_args[0][3]
+
+    slack_payloads, macos_calls, _ = run_hook(argv=popen_args[0][1:])
+    assert slack_payloads[0]["hook_type"] == "notification_idle_prompt"
+    assert macos_calls == 1
+    assert not Path(job_path).exists()
+
+
+def test_inline_mode_is_default(base_hook_input, transcript_without_ask):
+    slack_payloads, macos_calls, popen_args = run_hook(
+        {**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_without_ask}
+    )
+    assert popen_args == []
+    assert len(slack_payloads) == 1 and macos_calls == 1
+
+
+def test_detached_hook_returns_before_delivery_finishes(base_hook_input, transcript_without_ask, isolated_home):
+    """End to end: the hook exits while the background worker logs the delivery results."""
+    env = {**os.environ, "HOME": str(isolated_home), "CLAUDE_NOTIFICATIONS_DELIVERY_MODE": "detached",
+           "PATH": str(isolated_home)}
+    hook_input = {**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_without_ask}
+    subprocess.run(
+        [sys.executable, str(HOOKS_DIR / "notifications_dispatch.py")],
+        input=json.dumps(hook_input), text=True, env=env, timeout=30, check=True,
+        cwd=str(isolated_home),
+    )
+
+    log_path = isolated_home / ".claude" / "logs" / "stop_hook.log"
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        if log_path.exists() and "macOS" in log_path.read_text().split("Delivering detached")[-1]:
+            break
+        time.sleep(0.1)
+    log_text = log_path.read_text()
+    assert "Handed off to background delivery" in log_text
+    assert "Delivering detached notification" in log_text
+    assert "❌ Slack" in log_text or "✅ Slack" in log_text
@@ -0,0 +1,106 @@
+# tests/test_dispatch.py
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+from unittest.mock import patch, MagicMock
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+DISPATCH = HOOKS_DIR / "notifications_dispatch.py"
+
+# Modules that mean logging, transcript or network work started
+HEAVY_MODULES = {"hook_log", "macos_notification", "slack_notification", "notification_daemon", "http.client"}
+
+
+def run_dispatch(hook_input):
+    """Run the dispatcher's main() in-process; return (slack_payloads, macos_calls)."""
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps(hook_input))), \
+         patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        mod = load_hook("notifications_dispatch")
+        try:
+            mod.main()
+        except SystemExit:
+            pass
+        return slack.posts, mock_run.call_count
+
+
+def modules_loaded_by(hook_input, isolated_home):
+    """Run the dispatcher in a fresh interpreter and return the modules it imported."""
+    script = (
+        "import runpy, sys\n"
+        f"sys.argv = [{str(DISPATCH)!r}]\n"
+        f"sys.path.insert(0, {str(HOOKS_DIR)!r})\n"
+        "try:\n"
+        f"    runpy.run_path({str(DISPATCH)!r}, run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], input=json.dumps(hook_input), text=True,
+                            capture_output=True, timeout=30, env={**os.environ, "HOME": str(isolated_home)})
+    return set(result.stdout.split())
+
+
+def test_stop_event_notifies(base_hook_input, transcript_without_ask):
+    posts, macos_calls = run_dispatch(
+        {**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_without_ask}
+    )
+    assert [p["hook_type"] for p in posts] == ["stop_complete"]
+    assert macos_calls == 1
+
+
+def test_actionable_notification_notifies(base_hook_input, transcript_with_ask):
+    posts, macos_calls = run_dispatch({**base_hook_input, "hook_event_name": "Notification",
+                                       "notification_type": "permission_prompt",
+                                       "transcript_path": transcript_with_ask})
+    assert [p["hook_type"] for p in posts] == ["notification_permission_prompt"]
+    assert macos_calls == 1
+
+
+@pytest.mark.parametrize("extra", [
+    {"hook_event_name": "SubagentStop"},
+    {"hook_event_name": "Notification", "notification_type": "auth_success"},
+    {"hook_event_name": "PreToolUse"},
+    {},
+])
+def test_non_notifying_events_do_nothing(base_hook_input, transcript_without_ask, extra):
+    posts, macos_calls = run_dispatch({**base_hook_input, "transcript_path": transcript_without_ask, **extra})
+    assert posts == [] and macos_calls == 0
+
+
+@pytest.mark.parametrize("extra", [
+    {"hook_event_name": "SubagentStop"},
+    {"hook_event_name": "Notification", "notification_type": "auth_success"},
+])
+def test_skipped_events_exit_before_heavy_imports(base_hook_input, transcript_without_ask, isolated_home, extra):
+    loaded = modules_loaded_by({**base_hook_input, "transcript_path": transcript_without_ask, **extra},
+                               isolated_home)
+    assert "json" in loaded
+    assert not loaded & HEAVY_MODULES
+
+
+def test_stop_event_loads_only_what_it_needs(base_hook_input, transcript_without_ask, isolated_home):
+    loaded = modules_loaded_by({**base_hook_input, "hook_event_name": "Stop",
+                                "transcript_path": transcript_without_ask}, isolated_home)
+    assert {"notifications_stop", "macos_notification", "daemon_client"} <= loaded
+    assert "notifications_notification" not in loaded
+    # Forwarding to the daemon needs only its client, never the server
+    assert not {"notification_daemon", "socketserver"} & loaded
+    # Command-line and log compression modules are imported where they are used
+    assert not {"argparse", "gzip"} & loaded
+
+
+def test_hooks_json_points_every_hook_at_dispatcher():
+    config = json.loads((HOOKS_DIR / "hooks.json").read_text())
+    commands = [hook["command"] for groups in config["hooks"].values() for group in groups for hook in group["hooks"]]
+    assert commands and all(c.endswith("/hooks/notifications_dispatch.py") for c in commands)
@@ -1,5 +1,5 @@
 """
-Tests for has_ask_user_question in hooks/macos_notification.py.
+Tests for has_ask_user_question and analyze_transcript in hooks/macos_notification.py.
 
 Covers:
 - Returns True when the latest assistant message contains AskUserQuestion
@@ -8,28 +8,11 @@ Covers:
   but the *latest* one does not (the loop-break bug)
 """
 
-import importlib.util
 from pathlib import Path
 
-# Load macos_notification.py directly so we don't depend on it being a package
-_MODULE_PATH = Path(__file__).parent.parent / "hooks" / "macos_notification.py"
-_spec = importlib.util.spec_from_file_location("macos_notification", _MODULE_PATH)
-_mod = importlib.util.module_from_spec(_spec)
-_spec.loader.exec_module(_mod)
+from tests.conftest import load_hook
 
-has_ask_user_question = _mod.has_ask_user_question
-
-
-def load_macos_notification():
-    """Load hooks/macos_notification.py as a module."""
-    import importlib.util
-    spec = importlib.util.spec_from_file_location(
-        "macos_notification",
-        Path(__file__).parent.parent / "hooks" / "macos_notification.py"
-    )
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
-    return mod
+has_ask_user_question = load_hook("macos_notification").has_ask_user_question
 
 
 def test_returns_true_when_latest_assistant_has_ask(transcript_with_ask):
@@ -54,11 +37,34 @@ def test_returns_false_when_only_previous_assistant_had_ask(transcript_ask_then_
 
 def test_extract_latest_message_returns_text(transcript_without_ask):
     """extract_latest_message returns the assistant's text from a normal transcript."""
-    msg = load_macos_notification().extract_latest_message(transcript_without_ask)
+    msg = load_hook("macos_notification").extract_latest_message(transcript_without_ask)
     assert msg == "Here is the function you requested."
 
 
 def test_extract_latest_message_returns_none_for_missing_file():
     """extract_latest_message returns None when file doesn't exist."""
-    msg = load_macos_notification().extract_latest_message("/nonexistent/path.jsonl")
+    msg = load_hook("macos_notification").extract_latest_message("/nonexistent/path.jsonl")
     assert msg is None
+
+
+def test_analyze_transcript_single_scan_summary(transcript_with_ask):
+    """analyze_transcript returns text, AskUserQuestion flag and tool names together."""
+    analysis = load_hook("macos_notification").analyze_transcript(transcript_with_ask)
+    assert analysis.message == "Sure, let me ask."
+    assert analysis.asks_user_question is True
+    assert analysis.tool_names == ("AskUserQuestion",)
+    assert analysis.offset == len(Path(transcript_with_ask).read_bytes().split(b"\n")[0]) + 1
+
+
+def test_analyze_transcript_tool_use_only(transcript_tool_use_only):
+    """A tool-use-only assistant message has tool names but no text."""
+    analysis = load_hook("macos_notification").analyze_transcript(transcript_tool_use_only)
+    assert analysis.message is None
+    assert analysis.asks_user_question is False
+    assert analysis.tool_names
+
+
+def test_analyze_transcript_missing_file():
+    """A missing transcript yields the empty analysis."""
+    mod = load_hook("macos_notification")
+    assert mod.analyze_transcript("/nonexistent/path.jsonl") == mod.EMPTY_ANALYSIS
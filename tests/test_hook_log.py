@@ -0,0 +1,186 @@
+"""
+Tests for the buffered hook logger in hooks/hook_log.py.
+
+Covers:
+- Records are buffered and written with one append per flush
+- log_level filters verbose records
+- log_format=json writes one JSON object per line
+- Size- and age-based rotation, compression and pruning of segments
+- Concurrent writers lose no records while files rotate
+- iter_jsonl reads a file and its gzipped segments oldest first
+"""
+
+import json
+import sys
+
+import pytest
+
+from tests.conftest import HOOKS_DIR, load_hook
+
+
+@pytest.fixture
+def hook_log(monkeypatch):
+    """Load a fresh hook_log module (and its hook_config dependency)."""
+    monkeypatch.delitem(sys.modules, "hook_config", raising=False)
+    return load_hook("hook_log")
+
+
+def test_records_are_buffered_until_flush(hook_log, isolated_home, monkeypatch):
+    log_path = isolated_home / ".claude" / "logs" / "test.log"
+    writes = []
+    real_write = hook_log.os.write
+    monkeypatch.setattr(hook_log.os, "write", lambda fd, data: writes.append(bytes(data)) or real_write(fd, data))
+
+    log = hook_log.get_logger("test.log")
+    log.info("first")
+    log.warning("second")
+    assert not log_path.exists()
+
+    hook_log.flush_all()
+    lines = log_path.read_text().splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["first", "second"]
+    assert len(writes) == 1
+
+
+def test_records_go_to_the_home_they_were_buffered_under(hook_log, isolated_home, tmp_path, monkeypatch):
+    log = hook_log.get_logger("test.log")
+    log.info("buffered")
+    monkeypatch.setenv("HOME", str(tmp_path / "elsewhere"))
+    log.flush()
+    assert "buffered" in (isolated_home / ".claude" / "logs" / "test.log").read_text()
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def test_log_level_filters_verbose_records(hook_log, isolated_home, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_LEVEL", "INFO")
+    log = hook_log.get_logger("test.log")
+    log.debug("noisy payload")
+    log.info("kept")
+    log.flush()
+    assert (isolated_home / ".claude" / "logs" / "test.log").read_text().count("\n") == 1
+
+
+def test_log_level_off_writes_nothing(hook_log, isolated_home, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_LEVEL", "OFF")
+    log = hook_log.get_logger("test.log")
+    log.error("dropped")
+    log.flush()
+    assert not (isolated_home / ".claude" / "logs" / "test.log").exists()
+
+
+def test_json_lines_format(hook_log, isolated_home, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_FORMAT", "json")
+    log = hook_log.get_logger("test.log")
+    log.warning("slow", channel="slack")
+    log.flush()
+    record = json.loads((isolated_home / ".claude" / "logs" / "test.log").read_text())
+    assert record["level"] == "WARNING"
+    assert record["msg"] == "slow"
+    assert record["channel"] == "slack"
+
+
+def test_config_file_sets_log_level(hook_log, isolated_home):
+    (isolated_home / ".claude").mkdir()
+    (isolated_home / ".claude" / "notifications.json").write_text('{"log_level": "ERROR"}')
+    log = hook_log.get_logger("test.log")
+    log.info("dropped")
+    log.error("kept")
+    log.flush()
+    assert "kept" in (isolated_home / ".claude" / "logs" / "test.log").read_text()
+    assert "dropped" not in (isolated_home / ".claude" / "logs" / "test.log").read_text()
+
+
+def read_all_segments(log_dir, name):
+    """All lines of a log file and its rotated segments, compressed or not."""
+    import gzip
+    lines = []
+    for path in log_dir.iterdir():
+        if not path.name.startswith(name) or path.name.endswith(".lock"):
+            continue
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as f:
+            lines.extend(f.read().splitlines())
+    return lines
+
+
+def test_size_based_rotation_keeps_backup_count(hook_log, isolated_home, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_MAX_BYTES", "200")
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_BACKUP_COUNT", "3")
+    monkeypatch.setattr(hook_log, "COMPRESS_GRACE_SECONDS", 0)
+    log = hook_log.get_logger("test.log")
+    for i in range(40):
+        log.info(f"record {i:02d} " + "x" * 40)
+        log.flush()
+
+    log_dir = isolated_home / ".claude" / "logs"
+    segments = hook_log._segments(log_dir / "test.log")
+    assert len(segments) == 3
+    assert segments[0].suffix != ".gz"
+    assert all(segment.suffix == ".gz" for segment in segments[1:])
+    assert (log_dir / "test.log").stat().st_size <= 200
+    assert "record 39" in (log_dir / "test.log").read_text()
+
+
+def test_iter_jsonl_reads_segments_oldest_first(hook_log, isolated_home, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_MAX_BYTES", "100")
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_LOG_BACKUP_COUNT", "100")
+    monkeypatch.setattr(hook_log, "COMPRESS_GRACE_SECONDS", 0)
+    path = isolated_home / ".claude" / "logs" / "records.jsonl"
+    for i in range(20):
+        hook_log.append(path, (json.dumps({"i": i, "pad": "x" * 20}) + "\n").encode())
+    hook_log.append(path, b'{"i": \n[1, 2]\n')
+
+    assert any(segment.suffix == ".gz" for segment in hook_log._segments(path))
+    assert [record["i"] for record in hook_log.iter_jsonl(path)] == list(range(20))
+
+
+def test_age_based_rotation(hook_log, isolated_home):
+    import os
+    log = hook_log.get_logger("test.log")
+    log.info("old")
+    log.flush()
+
+    lock_path = isolated_home / ".claude" / "logs" / "test.log.lock"
+    old = lock_path.stat().st_mtime - 8 * 86400
+    os.utime(lock_path, (old, old))
+    log.info("new")
+    log.flush()
+
+    log_path = isolated_home / ".claude" / "logs" / "test.log"
+    assert "new" in log_path.read_text()
+    assert "old" not in log_path.read_text()
+    assert len(hook_log._segments(log_path)) == 1
+
+
+def test_long_records_are_truncated(hook_log, isolated_home):
+    log = hook_log.get_logger("test.log")
+    log.debug("payload " + "y" * 10000)
+    log.flush()
+    text = (isolated_home / ".claude" / "logs" / "test.log").read_text()
+    assert len(text) < 2200
+    assert "chars truncated" in text
+
+
+def test_concurrent_writers_lose_no_records_across_rotation(isolated_home):
+    import os
+    import subprocess
+    import sys
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1]); import hook_log\n"
+        "log = hook_log.get_logger('test.log')\n"
+        "for i in range(100):\n"
+        "    log.info(f'{sys.argv[2]}:{i:03d}:' + 'z' * 50)\n"
+        "    log.flush()\n"
+    )
+    env = {**os.environ, "CLAUDE_NOTIFICATIONS_LOG_MAX_BYTES": "4000",
+           "CLAUDE_NOTIFICATIONS_LOG_BACKUP_COUNT": "10000"}
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(HOOKS_DIR), f"p{n}"], env=env)
+        for n in range(8)
+    ]
+    assert all(proc.wait() == 0 for proc in procs)
+
+    lines = read_all_segments(isolated_home / ".claude" / "logs", "test.log")
+    records = sorted(line.split("] ", 1)[1] for line in lines)
+    expected = sorted(f"p{n}:{i:03d}:" + "z" * 50 for n in range(8) for i in range(100))
+    assert records == expected
@@ -0,0 +1,113 @@
+# tests/test_hook_metrics.py
+import json
+import os
+import socket
+import sys
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    for name in ("hook_config", "hook_log", "hook_metrics"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    mod = load_hook("hook_metrics")
+    monkeypatch.setitem(sys.modules, "hook_metrics", mod)
+    return mod
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_phase_timings_are_flushed_as_json_lines(metrics):
+    recorder = metrics.get_recorder("stop")
+    with recorder.phase("transcript_scan"):
+        pass
+    recorder.record("channel_Slack", 0.25, status="ok")
+    metrics.flush_all()
+
+    records = read_lines(metrics.metrics_path())
+    assert [(r["hook"], r["phase"]) for r in records] == [("stop", "transcript_scan"), ("stop", "channel_Slack")]
+    assert records[1]["ms"] == 250.0 and records[1]["status"] == "ok"
+
+
+def test_phase_is_recorded_when_block_raises(metrics):
+    with pytest.raises(ValueError):
+        with metrics.get_recorder("stop").phase("stdin_decode"):
+            raise ValueError("bad json")
+    metrics.flush_all()
+    assert read_lines(metrics.metrics_path())[0]["phase"] == "stdin_decode"
+
+
+def test_timings_go_to_the_home_they_were_recorded_under(metrics, tmp_path, monkeypatch):
+    metrics.get_recorder("stop").record("stdin_read", 0.001)
+    path = metrics.metrics_path()
+    monkeypatch.setenv("HOME", str(tmp_path / "elsewhere"))
+    metrics.flush_all()
+    assert read_lines(path)[0]["phase"] == "stdin_read"
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def test_disabled_metrics_write_nothing(metrics, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_METRICS_ENABLED", "false")
+    metrics.get_recorder("stop").record("stdin_read", 0.001)
+    metrics.flush_all()
+    assert not metrics.metrics_path().exists()
+
+
+def test_statsd_datagrams(metrics, monkeypatch):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as server:
+        server.bind(("127.0.0.1", 0))
+        server.settimeout(5)
+        monkeypatch.setenv("CLAUDE_NOTIFICATIONS_METRICS_STATSD", f"127.0.0.1:{server.getsockname()[1]}")
+        recorder = metrics.get_recorder("notification")
+        recorder.record("transcript_scan", 0.0015)
+        recorder.record("channel_Slack", 0.040)
+        metrics.flush_all()
+        packet = server.recv(65536).decode()
+
+    assert packet.splitlines() == [
+        "claude.notifications.notification.transcript_scan:1.5|ms",
+        "claude.notifications.notification.channel_Slack:40.0|ms",
+    ]
+
+
+def test_summary_percentiles_per_phase(metrics):
+    records = [{"hook": "stop", "phase": "transcript_scan", "ms": float(ms)} for ms in range(1, 101)]
+    records.append({"hook": "notification", "phase": "transcript_scan", "ms": 7.0})
+    summary = metrics.summarize(records)
+    assert summary[("stop", "transcript_scan")] == {"count": 100, "p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+    assert list(metrics.summarize(records, hook="notification")) == [("notification", "transcript_scan")]
+
+
+def test_cli_prints_summary(metrics, capsys):
+    recorder = metrics.get_recorder("stop")
+    for seconds in (0.010, 0.020, 0.030):
+        recorder.record("channel_Slack", seconds)
+    metrics.flush_all()
+    with patch("sys.argv", ["hook_metrics.py", "--hook", "stop"]):
+        metrics.main()
+    line = capsys.readouterr().out.splitlines()[1].split()
+    assert line[:3] == ["stop", "channel_Slack", "3"]
+    assert float(line[3]) == 20.0
+
+
+def test_stop_hook_records_every_phase(metrics, base_hook_input, transcript_without_ask):
+    hook_input = {**base_hook_input, "transcript_path": transcript_without_ask}
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps({**hook_input, "hook_event_name": "Stop"}))), \
+         patch("subprocess.run", return_value=MagicMock(returncode=0, stderr="")):
+        try:
+            load_hook("notifications_dispatch").main()
+        except SystemExit:
+            pass
+
+    phases = {r["phase"] for r in read_lines(metrics.metrics_path())}
+    assert phases == {"stdin_read", "stdin_decode", "transcript_scan", "channel_Slack", "channel_macOS"}
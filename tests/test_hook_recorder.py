@@ -0,0 +1,97 @@
+"""
+Tests for invocation recording (hooks/hook_recorder.py) and replay
+(benchmarks/replay_invocations.py).
+
+Covers:
+- The dispatcher records every payload, with the transcript offset, only when enabled
+- Replay cuts transcripts back to the recorded offset
+- A replay at max speed runs every recording against the stubbed channels
+"""
+
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import load_hook
+
+ROOT = Path(__file__).parent.parent
+HOOKS_DIR = ROOT / "hooks"
+REPLAY = ROOT / "benchmarks" / "replay_invocations.py"
+
+
+def run_dispatch(hook_input):
+    with patch("sys.stdin", StringIO(json.dumps(hook_input))):
+        try:
+            load_hook("notifications_dispatch", HOOKS_DIR / "notifications_dispatch.py").main()
+        except SystemExit:
+            pass
+
+
+def assistant(text):
+    return json.dumps({"message": {"role": "assistant", "content": [{"type": "text", "text": text}]}}) + "\n"
+
+
+def test_dispatcher_records_only_when_enabled(base_hook_input, transcript_without_ask, monkeypatch):
+    skipped = {**base_hook_input, "hook_event_name": "SubagentStop", "transcript_path": transcript_without_ask}
+    run_dispatch(skipped)
+    recorder = load_hook("hook_recorder", HOOKS_DIR / "hook_recorder.py")
+    assert not recorder.recordings_path().exists()
+
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_RECORD_INVOCATIONS", "true")
+    run_dispatch(skipped)
+    run_dispatch({**skipped, "hook_event_name": "Notification", "notification_type": "auth_success"})
+
+    entries = list(recorder.read_recordings())
+    assert [e["event"] for e in entries] == ["SubagentStop", "Notification"]
+    assert entries[0]["payload"] == skipped
+    assert entries[0]["offset"] == os.path.getsize(transcript_without_ask)
+    assert entries[0]["ts"] <= entries[1]["ts"]
+
+
+def test_snapshot_cuts_transcript_to_recorded_offset(tmp_path):
+    replay = load_hook("replay_invocations", REPLAY)
+    transcript = tmp_path / "t.jsonl"
+    transcript.write_text(assistant("first"))
+    offset = transcript.stat().st_size
+    with open(transcript, "a") as f:
+        f.write(assistant("second"))
+
+    snapshots = replay.Snapshots(tmp_path)
+    cut = snapshots.get(str(transcript), offset)
+    assert Path(cut).read_text() == assistant("first")
+    assert snapshots.get(str(transcript), offset) == cut
+    assert snapshots.get(str(transcript), None) == str(transcript)
+    assert Path(snapshots.get(str(tmp_path / "gone.jsonl"), 10)).stat().st_size > 0
+
+
+def test_replay_at_max_speed_reports_every_invocation(isolated_home, tmp_path):
+    transcript = tmp_path / "t.jsonl"
+    transcript.write_text(assistant("All done."))
+    base = {"transcript_path": str(transcript), "cwd": str(tmp_path)}
+    recordings = tmp_path / "invocations.jsonl"
+    entries = [
+        {"ts": 100.0, "event": "Stop", "offset": None,
+         "payload": {**base, "session_id": "s1", "hook_event_name": "Stop"}},
+        {"ts": 100.2, "event": "Notification", "offset": None,
+         "payload": {**base, "session_id": "s2", "hook_event_name": "Notification",
+                     "notification_type": "permission_prompt", "message": "Claude needs your permission"}},
+        {"ts": 100.4, "event": "Notification", "offset": None,
+         "payload": {**base, "session_id": "s3", "hook_event_name": "Notification",
+                     "notification_type": "auth_success"}},
+    ]
+    recordings.write_text("".join(json.dumps(e) + "\n" for e in entries) + "not json\n")
+    report_path = tmp_path / "report.json"
+
+    subprocess.run([sys.executable, str(REPLAY), str(recordings), "--speed", "max", "--settle", "0",
+                    "--json", str(report_path)], check=True, capture_output=True, timeout=120,
+                   env={**os.environ, "HOME": str(isolated_home)})
+
+    report = json.loads(report_path.read_text())
+    assert (report["invocations"], report["failed"]) == (3, 0)
+    assert report["delivered"] == {"slack": 2, "desktop": 2}
+    assert report["latency_ms"]["count"] == 3
+    assert set(report["per_event_latency_ms"]) == {"Stop", "Notification"}
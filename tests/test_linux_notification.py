@@ -0,0 +1,207 @@
+# tests/test_linux_notification.py
+"""
+Tests for the D-Bus desktop notification backend, against a private session bus.
+
+A dbus-daemon is started per test and a stand-in org.freedesktop.Notifications
+service, built on the same dbus_client module, records every Notify call.
+"""
+import fcntl
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+pytestmark = pytest.mark.skipif(shutil.which("dbus-daemon") is None, reason="dbus-daemon not installed")
+
+
+@pytest.fixture
+def session_bus(monkeypatch):
+    """Start a private session bus and point DBUS_SESSION_BUS_ADDRESS at it."""
+    daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    address = daemon.stdout.readline().strip()
+    monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", address)
+    for name in ("dbus_client", "linux_notification", "desktop_notification", "hook_config"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    yield address
+    daemon.terminate()
+    daemon.wait()
+
+
+class NotificationService:
+    """Stand-in notification server that records Notify calls and allocates ids."""
+
+    def __init__(self, dbus_client, address):
+        self.calls = []
+        self.conn = dbus_client.Connection(address)
+        self.conn.call(dbus_client.BUS_NAME, dbus_client.BUS_PATH, dbus_client.BUS_NAME,
+                       "RequestName", "su", ("org.freedesktop.Notifications", 4))
+        self.next_id = 1
+        # Called with no arguments while a Notify call is being answered
+        self.on_notify = None
+        self.thread = threading.Thread(target=self.serve, args=(dbus_client,), daemon=True)
+        self.thread.start()
+
+    def serve(self, dbus_client):
+        try:
+            while True:
+                message = self.conn.receive()
+                if message.type == dbus_client.METHOD_CALL and message.fields.get("member") == "Notify":
+                    self.calls.append(message.body)
+                    if self.on_notify:
+                        self.on_notify()
+                    replaces_id = message.body[1]
+                    notification_id = replaces_id or self.next_id
+                    self.next_id += not replaces_id
+                    self.conn.reply(message, "u", (notification_id,))
+        except OSError:
+            pass
+
+    def close(self):
+        self.conn.close()
+
+
+@pytest.fixture
+def notification_service(session_bus):
+    dbus_client = load_hook("dbus_client")
+    service = NotificationService(dbus_client, session_bus)
+    yield service
+    service.close()
+
+
+def test_notify_reaches_service_with_summary_and_sound(notification_service, tmp_path, monkeypatch):
+    project = tmp_path / "my-project"
+    project.mkdir()
+    monkeypatch.chdir(project)
+    linux = load_hook("linux_notification")
+
+    assert linux.send_linux_notification("All done.", subtitle="Task Complete", sound="Hero") is True
+    app_name, replaces_id, _, summary, body, actions, hints, expire = notification_service.calls[0]
+    assert (app_name, replaces_id, summary, body) == ("Claude", 0, "Claude - my-project — Task Complete", "All done.")
+    assert hints == {"sound-name": "complete"}
+    assert actions == [] and expire == -1
+
+
+def test_same_project_replaces_previous_notification(notification_service, tmp_path, monkeypatch):
+    for name in ("alpha", "beta"):
+        (tmp_path / name).mkdir()
+    linux = load_hook("linux_notification")
+
+    monkeypatch.chdir(tmp_path / "alpha")
+    linux.send_linux_notification("one")
+    linux.send_linux_notification("two")
+    monkeypatch.chdir(tmp_path / "beta")
+    linux.send_linux_notification("three", sound="")
+
+    assert [call[1] for call in notification_service.calls] == [0, 1, 0]
+    assert notification_service.calls[2][6] == {"suppress-sound": True}
+
+
+def test_replace_ids_are_shared_across_processes(notification_service):
+    linux = load_hook("linux_notification")
+    linux.send_linux_notification("first")
+    # A fresh module stands in for the next hook process
+    sys.modules.pop("linux_notification")
+    load_hook("linux_notification").send_linux_notification("second")
+    assert [call[1] for call in notification_service.calls] == [0, 1]
+
+
+def test_shares_the_desktop_bucket_without_loading_the_macos_backend(notification_service, tmp_path,
+                                                                    monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_RATE_LIMIT_BURST", "1")
+    linux = load_hook("linux_notification")
+
+    assert linux.send_linux_notification("one") is True
+    assert linux.send_linux_notification("two") is False
+    assert "macos_notification" not in sys.modules
+
+
+def test_ids_state_is_unlocked_during_notify(notification_service, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    linux = load_hook("linux_notification")
+    path = sys.modules["shared_state"].state_path(linux.IDS_STATE_NAME)
+    lock_free = []
+
+    def try_lock():
+        with open(path, "a+") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                lock_free.append(True)
+            except BlockingIOError:
+                lock_free.append(False)
+
+    notification_service.on_notify = try_lock
+    assert linux.send_linux_notification("one") is True
+    assert linux.send_linux_notification("two") is True
+    assert lock_free == [True, True]
+    assert [call[1] for call in notification_service.calls] == [0, 1]
+
+
+def test_missing_service_returns_false(session_bus):
+    assert load_hook("linux_notification").send_linux_notification("nobody listening") is False
+
+
+def test_auto_backend_prefers_dbus_on_linux(session_bus, monkeypatch):
+    desktop = load_hook("desktop_notification")
+    monkeypatch.setattr(sys, "platform", "linux")
+    assert desktop.get_backend().name == "Linux"
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DESKTOP_BACKEND", "macos")
+    assert desktop.get_backend().name == "macOS"
+
+
+def test_backends_must_implement_show():
+    desktop = load_hook("desktop_notification")
+
+    class Incomplete(desktop.NotificationBackend):
+        name = "incomplete"
+
+    for backend in (desktop.NotificationBackend, Incomplete):
+        with pytest.raises(TypeError):
+            backend()
+
+
+def test_notify_rate_limits_and_trims_for_every_backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_RATE_LIMIT_BURST", "1")
+    desktop = load_hook("desktop_notification")
+    shown = []
+
+    class Recording(desktop.NotificationBackend):
+        name = "recording"
+        log_file = "recording.log"
+
+        def _show(self, title, subtitle, body, sound, group_id, timeout):
+            shown.append((title, subtitle, body, group_id))
+            return True
+
+    assert Recording().notify("x" * 300, subtitle="Task Complete") is True
+    assert Recording().notify("dropped") is False
+    assert shown == [(f"Claude - {tmp_path.name}", "Task Complete", "x" * 197 + "...", str(tmp_path))]
+
+
+def test_stop_hook_notifies_over_dbus_without_subprocess(notification_service, base_hook_input,
+                                                        transcript_without_ask, monkeypatch):
+    monkeypatch.setattr(sys, "platform", "linux")
+    hook_input = {**base_hook_input, "transcript_path": transcript_without_ask}
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps({**hook_input, "hook_event_name": "Stop"}))), \
+         patch("subprocess.run") as mock_run:
+        try:
+            load_hook("notifications_dispatch").main()
+        except SystemExit:
+            pass
+
+    assert mock_run.call_count == 0
+    assert notification_service.calls[0][4] == "Here is the function you requested."
+    assert slack.posts[0]["hook_type"] == "stop_complete"
@@ -0,0 +1,153 @@
+"""
+Tests for the optional notification daemon in hooks/notification_daemon.py.
+
+Covers:
+- forward() reports False when no daemon is running, so hooks fall back
+- A running daemon accepts forwarded payloads and delivers them over its keep-alive connection pool
+- Hook scripts become thin clients when a daemon is listening
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+HOOKS_DIR = Path(__file__).parent.parent / "hooks"
+
+
+def load_daemon_module():
+    return load_hook("notification_daemon")
+
+
+@pytest.fixture
+def short_home(monkeypatch):
+    """A short HOME path, since Unix socket paths are limited to ~100 bytes."""
+    home = tempfile.mkdtemp(prefix="cn-", dir="/tmp")
+    monkeypatch.setenv("HOME", home)
+    yield Path(home)
+    shutil.rmtree(home, ignore_errors=True)
+
+
+@pytest.fixture
+def running_daemon(short_home):
+    """Start a daemon on a background thread; yield (client module, server, posted payloads, notifier mock)."""
+    mod = load_daemon_module()
+    client = load_hook("daemon_client")
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        server = mod.NotificationDaemon(client.default_socket_path())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield client, server, slack.posts, mock_run
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_forward_without_daemon_returns_false(short_home):
+    assert load_hook("daemon_client").forward("Stop", "{}") is False
+
+
+def test_daemon_delivers_forwarded_stop_event(running_daemon, base_hook_input, transcript_without_ask):
+    mod, _, posted, _ = running_daemon
+    payload = json.dumps({**base_hook_input, "transcript_path": transcript_without_ask})
+    assert mod.forward("Stop", payload) is True
+    assert wait_for(lambda: posted)
+    assert posted[0]["hook_type"] == "stop_complete"
+    assert posted[0]["message"] == "Here is the function you requested."
+
+
+def test_daemon_rejects_unknown_hook(running_daemon):
+    mod, _, posted, _ = running_daemon
+    assert mod.forward("Bogus", "{}") is False
+    assert posted == []
+
+
+def test_stale_socket_file_is_replaced(short_home):
+    mod = load_daemon_module()
+    path = load_hook("daemon_client").default_socket_path()
+    path.parent.mkdir(parents=True)
+    path.write_text("")
+    server = mod.NotificationDaemon(path)
+    try:
+        assert path.exists()
+    finally:
+        server.server_close()
+    assert not path.exists()
+
+
+def test_hook_script_forwards_to_daemon(running_daemon, short_home, base_hook_input, transcript_with_ask):
+    _, _, posted, _ = running_daemon
+    payload = json.dumps({**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_with_ask})
+    # subprocess.run is patched for terminal-notifier, so start the hook with Popen
+    hook = subprocess.Popen(
+        [sys.executable, str(HOOKS_DIR / "notifications_dispatch.py")],
+        stdin=subprocess.PIPE, text=True, env={**os.environ, "HOME": str(short_home)},
+    )
+    hook.communicate(payload, timeout=30)
+    assert hook.returncode == 0
+    assert wait_for(lambda: posted)
+    assert posted[0]["hook_type"] == "stop_needs_input"
+    assert "Forwarded Stop event" in (short_home / ".claude" / "logs" / "stop_hook.log").read_text()
+
+
+def test_forwarded_event_skips_the_hook_module(running_daemon, short_home, base_hook_input, transcript_with_ask):
+    _, _, posted, _ = running_daemon
+    dispatch = HOOKS_DIR / "notifications_dispatch.py"
+    script = (
+        "import runpy, sys\n"
+        f"sys.path.insert(0, {str(HOOKS_DIR)!r})\n"
+        "try:\n"
+        f"    runpy.run_path({str(dispatch)!r}, run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+    )
+    payload = json.dumps({**base_hook_input, "hook_event_name": "Stop", "transcript_path": transcript_with_ask})
+    hook = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            text=True, env={**os.environ, "HOME": str(short_home)})
+    out, _ = hook.communicate(payload, timeout=30)
+    assert wait_for(lambda: posted)
+    loaded = set(out.split())
+    assert "daemon_client" in loaded
+    assert not {"notifications_stop", "macos_notification", "slack_notification", "delivery"} & loaded
+
+
+def test_payload_without_cwd_uses_the_clients(running_daemon, short_home, base_hook_input, transcript_without_ask):
+    _, _, posted, notifier = running_daemon
+    project = short_home / "client-project"
+    project.mkdir()
+    payload = {k: v for k, v in base_hook_input.items() if k != "cwd"}
+    payload["transcript_path"] = transcript_without_ask
+    script = f"import sys; sys.path.insert(0, {str(HOOKS_DIR)!r}); import daemon_client; " \
+             f"sys.exit(0 if daemon_client.forward('Stop', sys.stdin.read()) else 1)"
+    client = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, text=True, cwd=str(project),
+                              env={**os.environ, "HOME": str(short_home)})
+    client.communicate(json.dumps(payload), timeout=30)
+    assert client.returncode == 0
+    assert wait_for(lambda: notifier.called)
+    cmd = notifier.call_args[0][0]
+    assert cmd[cmd.index("-title") + 1] == "Claude - client-project"
@@ -1,29 +1,25 @@
 # tests/test_notification_hook.py
 import json
+import os
 from io import StringIO
 from unittest.mock import patch, MagicMock
-import importlib.util
-from pathlib import Path
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
 
 
 def load_and_run_hook(hook_input: dict):
-    """Run notifications_notification hook, return (slack_called, macos_called)."""
-    spec = importlib.util.spec_from_file_location(
-        "notifications_notification",
-        Path(__file__).parent.parent / "hooks" / "notifications_notification.py"
-    )
-    with patch("sys.stdin", StringIO(json.dumps(hook_input))), \
-         patch("requests.post") as mock_post, \
+    """Run the dispatcher on a Notification event, return (slack_called, macos_called)."""
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps({**hook_input, "hook_event_name": "Notification"}))), \
          patch("subprocess.run") as mock_subprocess:
-        mock_post.return_value = MagicMock(status_code=200, text="ok")
         mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mod = importlib.util.module_from_spec(spec)
         try:
-            spec.loader.exec_module(mod)
-            mod.main()
+            load_hook("notifications_dispatch").main()
         except SystemExit:
             pass
-        return mock_post.called, mock_subprocess.called
+        return bool(slack.requests), mock_subprocess.called
 
 
 # --- Non-actionable types should NOT notify ---
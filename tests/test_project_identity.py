@@ -0,0 +1,98 @@
+"""
+Tests for project identity resolution in hooks/project_identity.py.
+
+Covers:
+- Subdirectories of a repository resolve to the repository root
+- The payload cwd, not the process cwd, names and groups notifications
+- Resolved cwds are cached across processes and expire after the TTL
+- A repository in the home directory does not claim unversioned directories
+"""
+
+import json
+import os
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    root = tmp_path / "monorepo"
+    (root / ".git").mkdir(parents=True)
+    (root / "services" / "api").mkdir(parents=True)
+    return root
+
+
+def test_subdirectories_resolve_to_repository_root(monorepo):
+    project = load_hook("project_identity").resolve(str(monorepo / "services" / "api"))
+    assert project == ("monorepo", str(monorepo), str(monorepo))
+
+
+def test_worktree_git_file_marks_a_root(tmp_path):
+    (tmp_path / "worktree" / "src").mkdir(parents=True)
+    (tmp_path / "worktree" / ".git").write_text("gitdir: /elsewhere\n")
+    assert load_hook("project_identity").resolve(str(tmp_path / "worktree" / "src")).name == "worktree"
+
+
+def test_unversioned_directory_is_its_own_project(isolated_home, tmp_path):
+    (isolated_home / ".git").mkdir()
+    (isolated_home / "scratch").mkdir()
+    identity = load_hook("project_identity")
+    assert identity.resolve(str(isolated_home / "scratch")).root == str(isolated_home / "scratch")
+    assert identity.resolve(str(isolated_home)).root == str(isolated_home)
+
+
+def test_default_is_process_cwd(monorepo, monkeypatch):
+    monkeypatch.chdir(monorepo / "services")
+    assert load_hook("project_identity").resolve().group == str(monorepo)
+
+
+def test_cache_skips_the_walk_until_ttl(monorepo, monkeypatch):
+    cwd = str(monorepo / "services" / "api")
+    load_hook("project_identity").resolve(cwd)
+
+    # A fresh module stands in for the next hook process
+    identity = load_hook("project_identity")
+    with patch.object(identity, "find_root", side_effect=AssertionError("walked")):
+        assert identity.resolve(cwd).name == "monorepo"
+
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_PROJECT_CACHE_TTL_SECONDS", "0")
+    identity = load_hook("project_identity")
+    with patch.object(identity, "find_root", return_value=cwd) as walk:
+        assert identity.resolve(cwd).name == "api"
+    assert walk.call_count == 1
+
+
+def test_cache_is_bounded(tmp_path, monkeypatch):
+    identity = load_hook("project_identity")
+    monkeypatch.setattr(identity, "MAX_CACHE_ENTRIES", 3)
+    for i in range(5):
+        identity.resolve(str(tmp_path / f"d{i}"))
+    state = json.loads(load_hook("shared_state").state_path("project_identity").read_text())
+    assert len(state) == 3 and str(tmp_path / "d4") in state
+
+
+def test_stop_hook_titles_and_groups_by_payload_cwd(monorepo, base_hook_input, transcript_without_ask, tmp_path,
+                                                     monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_DESKTOP_BACKEND", "macos")
+    hook_input = {**base_hook_input, "cwd": str(monorepo / "services" / "api"),
+                  "transcript_path": transcript_without_ask}
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps({**hook_input, "hook_event_name": "Stop"}))), \
+         patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        try:
+            load_hook("notifications_dispatch").main()
+        except SystemExit:
+            pass
+
+    cmd = mock_run.call_args[0][0]
+    assert cmd[cmd.index("-title") + 1] == "Claude - monorepo"
+    assert cmd[cmd.index("-group") + 1] == str(monorepo)
+    assert slack.posts[0]["hook_type"] == "stop_complete"
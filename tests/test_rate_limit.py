@@ -0,0 +1,86 @@
+"""
+Tests for the shared token-bucket rate limiter in hooks/rate_limit.py.
+
+Covers:
+- A burst is allowed, then notifications are dropped until tokens refill
+- Buckets are separate per channel and per project group
+- The next delivered notification reports how many were dropped
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+
+@pytest.fixture
+def rate_limit(monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_RATE_LIMIT_BURST", "2")
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_RATE_LIMIT_PER_MINUTE", "6")
+    return load_hook("rate_limit")
+
+
+def test_burst_then_drop_then_refill(rate_limit):
+    limiter = rate_limit.RateLimiter("slack")
+    assert [limiter.acquire("proj", now=100.0) for _ in range(4)] == [0, 0, None, None]
+    # 6 per minute refills one token every 10 seconds
+    assert limiter.acquire("proj", now=105.0) is None
+    assert limiter.acquire("proj", now=110.0) == 3
+    assert limiter.acquire("proj", now=130.0) == 0
+
+
+def test_buckets_are_per_channel_and_group(rate_limit):
+    slack, desktop = rate_limit.RateLimiter("slack"), rate_limit.RateLimiter("desktop")
+    for _ in range(2):
+        slack.acquire("a", now=0.0)
+    assert slack.acquire("a", now=0.0) is None
+    assert slack.acquire("b", now=0.0) == 0
+    assert desktop.acquire("a", now=0.0) == 0
+
+
+def test_state_is_shared_between_limiters(rate_limit):
+    rate_limit.RateLimiter("slack").acquire("proj", now=0.0)
+    rate_limit.RateLimiter("slack").acquire("proj", now=0.0)
+    assert rate_limit.RateLimiter("slack").acquire("proj", now=0.0) is None
+
+
+def test_zero_burst_disables_limiting(rate_limit, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_RATE_LIMIT_BURST", "0")
+    limiter = rate_limit.RateLimiter("slack")
+    assert all(limiter.acquire("proj", now=0.0) == 0 for _ in range(20))
+
+
+def test_slack_reports_dropped_events(rate_limit, tmp_path, monkeypatch):
+    (tmp_path / "proj").mkdir()
+    monkeypatch.chdir(tmp_path / "proj")
+    slack_notification = load_hook("slack_notification")
+    shared_state = load_hook("shared_state")
+    with SlackStub() as slack, patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}):
+        results = [slack_notification.send_to_slack_app("s1", f"message {i}") for i in range(5)]
+        with shared_state.locked_state("rate_limit_slack") as state:
+            state[os.getcwd()]["at"] -= 60
+        assert slack_notification.send_to_slack_app("s1", "after the burst") is True
+
+    assert results == [True, True, False, False, False]
+    assert [p["message"] for p in slack.posts] == ["message 0", "message 1", "after the burst (+3 rate-limited)"]
+    assert slack.posts[-1]["rate_limited_count"] == 3
+
+
+def test_desktop_drops_and_reports(rate_limit, tmp_path, monkeypatch):
+    (tmp_path / "proj").mkdir()
+    monkeypatch.chdir(tmp_path / "proj")
+    macos = load_hook("macos_notification")
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        results = [macos.send_macos_notification("x" * 300) for _ in range(3)]
+        with load_hook("shared_state").locked_state("rate_limit_desktop") as state:
+            state[os.getcwd()]["at"] -= 60
+        macos.send_macos_notification("x" * 300)
+
+    assert results == [True, True, False]
+    assert mock_run.call_count == 3
+    message = mock_run.call_args[0][0][2]
+    assert len(message) == 200 and message.endswith("... (+1 rate-limited)")
@@ -0,0 +1,154 @@
+"""
+Tests for the durable Slack outbox in hooks/slack_outbox.py and its use by
+send_to_slack_app in hooks/slack_notification.py.
+
+Covers:
+- Failed sends are queued; successful sends drain due entries in order
+- Exponential backoff between retries
+- TTL and size caps bound the queue
+- Batch mode drains several entries per POST and falls back to single posts
+"""
+
+import json
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
+
+
+@pytest.fixture
+def slack(monkeypatch):
+    """Fresh slack_notification and slack_outbox modules."""
+    for name in ("hook_config", "slack_outbox", "slack_notification"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return load_hook("slack_notification")
+
+
+def post_with(status_codes, posted):
+    """An http_post_json stand-in answering with successive status codes (None = refuse)."""
+    codes = iter(status_codes)
+
+    def post(url, payload, timeout):
+        code = next(codes)
+        if code is None:
+            raise ConnectionRefusedError("refused")
+        posted.append(payload)
+        return code
+    return post
+
+
+def test_failed_send_is_queued_and_flushed_by_next_success(slack):
+    posted = []
+    with patch.object(slack, "http_post_json", post_with([None, 200, 200], posted)):
+        assert slack.send_to_slack_app("s1", "first", "stop_complete") is False
+        assert [e["payload"]["message"] for e in slack.slack_outbox.pending()] == ["first"]
+
+        # Make the queued entry due, then a later event succeeds and drains it
+        with patch("time.time", return_value=time.time() + 3600 - 1):
+            assert slack.send_to_slack_app("s1", "second", "stop_complete") is True
+
+    assert [p["message"] for p in posted] == ["second", "first"]
+    assert slack.slack_outbox.pending() == []
+
+
+def test_client_errors_are_not_queued(slack):
+    with patch.object(slack, "http_post_json", post_with([400], [])):
+        assert slack.send_to_slack_app("s1", "bad", "stop_complete") is False
+    assert slack.slack_outbox.pending() == []
+
+
+def test_server_errors_are_queued(slack):
+    with patch.object(slack, "http_post_json", post_with([503], [])):
+        slack.send_to_slack_app("s1", "busy", "stop_complete")
+    assert len(slack.slack_outbox.pending()) == 1
+
+
+def test_failed_retry_backs_off_exponentially(slack):
+    outbox = slack.slack_outbox
+    outbox.enqueue({"message": "m"}, attempts=1)
+    assert outbox.pending()[0]["next_attempt"] == pytest.approx(time.time() + outbox.backoff(0), abs=2)
+
+    sent, failed = outbox.drain(lambda payload, timeout: False, force=True)
+    assert (sent, failed) == (0, 1)
+    entry = outbox.pending()[0]
+    assert entry["attempts"] == 2
+    assert entry["next_attempt"] == pytest.approx(time.time() + outbox.backoff(1), abs=2)
+    assert outbox.backoff(20) == outbox.BACKOFF_MAX
+
+
+def test_drain_stops_at_first_failure_and_releases_the_rest(slack):
+    outbox = slack.slack_outbox
+    for i in range(3):
+        outbox.enqueue({"message": str(i)})
+    attempts = []
+    sent, failed = outbox.drain(lambda payload, timeout: attempts.append(payload) and False, force=True)
+    assert (sent, failed) == (0, 1)
+    assert len(attempts) == 1
+    assert [e["next_attempt"] <= time.time() for e in outbox.pending()] == [False, True, True]
+
+
+def test_queue_is_capped_and_expires(slack, monkeypatch):
+    outbox = slack.slack_outbox
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_OUTBOX_MAX_ENTRIES", "3")
+    for i in range(5):
+        outbox.enqueue({"message": str(i)})
+    assert [e["payload"]["message"] for e in outbox.pending()] == ["2", "3", "4"]
+
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_OUTBOX_TTL_SECONDS", "60")
+    with patch("time.time", return_value=time.time() + 120):
+        outbox.enqueue({"message": "fresh"})
+    assert [e["payload"]["message"] for e in outbox.pending()] == ["fresh"]
+
+
+def queue_messages(outbox, count):
+    for i in range(count):
+        outbox.enqueue({"session_id": "s1", "message": str(i), "hook_type": "stop_complete"})
+
+
+def test_batch_mode_drains_queue_in_few_posts(slack, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_BATCH", "true")
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_BATCH_MAX_SIZE", "4")
+    queue_messages(slack.slack_outbox, 10)
+    with SlackStub(batch=True) as stub:
+        monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_URL", stub.url)
+        assert slack.drain_outbox(force=True) == (10, 0)
+    assert stub.batches == [4, 4, 2]
+    assert [p["message"] for p in stub.posts] == [str(i) for i in range(10)]
+    assert slack.slack_outbox.pending() == []
+
+
+def test_batch_respects_byte_limit(slack, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_BATCH", "true")
+    queue_messages(slack.slack_outbox, 5)
+    entry_bytes = len(json.dumps(slack.slack_outbox.pending()[0]["payload"])) + 1
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_BATCH_MAX_BYTES", str(3 * entry_bytes))
+    with SlackStub(batch=True) as stub:
+        monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_URL", stub.url)
+        slack.drain_outbox(force=True)
+    assert stub.batches == [3, 2]
+
+
+def test_receiver_without_batching_falls_back_to_single_posts(slack, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_BATCH", "true")
+    queue_messages(slack.slack_outbox, 3)
+    with SlackStub() as stub:
+        monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_URL", stub.url)
+        assert slack.drain_outbox(force=True) == (3, 0)
+        queue_messages(slack.slack_outbox, 2)
+        assert slack.drain_outbox(force=True) == (2, 0)
+    # One rejected batch, then singles; the rejection is remembered for the next drain
+    assert len(stub.requests) == 1 + 3 + 2
+    assert [p["message"] for p in stub.posts] == ["0", "1", "2", "0", "1"]
+
+
+def test_failed_batch_backs_off_every_entry(slack, monkeypatch):
+    monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_BATCH", "true")
+    queue_messages(slack.slack_outbox, 3)
+    with SlackStub(status=503, batch=True) as stub:
+        monkeypatch.setenv("CLAUDE_NOTIFICATIONS_SLACK_URL", stub.url)
+        assert slack.drain_outbox(force=True) == (0, 3)
+    assert [e["attempts"] for e in slack.slack_outbox.pending()] == [2, 2, 2]
@@ -1,41 +1,33 @@
 # tests/test_stop_hook.py
 import json
+import os
 from io import StringIO
 from unittest.mock import patch, MagicMock
-import importlib.util
-from pathlib import Path
+
+from tests.conftest import load_hook
+from tests.slack_stub import SlackStub
 
 
 def load_and_run_stop_hook(hook_input: dict):
-    """Run notifications_stop hook, return (slack_payloads, macos_subtitles)."""
-    spec = importlib.util.spec_from_file_location(
-        "notifications_stop",
-        Path(__file__).parent.parent / "hooks" / "notifications_stop.py"
-    )
-    slack_payloads = []
+    """Run the dispatcher on a Stop event, return (slack_payloads, macos_subtitles)."""
     macos_subtitles = []
 
-    def capture_slack(url, json=None, timeout=None):
-        slack_payloads.append(json)
-        return MagicMock(status_code=200, text="ok")
-
     def capture_macos(cmd, **kwargs):
         if "-subtitle" in cmd:
             idx = cmd.index("-subtitle")
             macos_subtitles.append(cmd[idx + 1])
         return MagicMock(returncode=0, stderr="")
 
-    with patch("sys.stdin", StringIO(json.dumps(hook_input))), \
-         patch("requests.post", side_effect=capture_slack), \
+    with SlackStub() as slack, \
+         patch.dict(os.environ, {"CLAUDE_NOTIFICATIONS_SLACK_URL": slack.url}), \
+         patch("sys.stdin", StringIO(json.dumps({**hook_input, "hook_event_name": "Stop"}))), \
          patch("subprocess.run", side_effect=capture_macos):
-        mod = importlib.util.module_from_spec(spec)
         try:
-            spec.loader.exec_module(mod)
-            mod.main()
+            load_hook("notifications_dispatch").main()
         except SystemExit:
             pass
 
-    return slack_payloads, macos_subtitles
+    return slack.posts, macos_subtitles
 
 
 def test_stop_always_sends_slack(base_hook_input, transcript_without_ask):
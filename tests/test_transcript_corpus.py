@@ -0,0 +1,62 @@
+"""
+Tests for the synthetic transcript generator in benchmarks/transcript_corpus.py,
+and for the transcript reader against the corpora it produces.
+
+Covers:
+- The same seed and options give byte-identical transcripts
+- Malformed lines and oversized entries are present when asked for
+- analyze_transcript agrees with the generator's ground truth for every ending
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import load_hook
+
+ROOT = Path(__file__).parent.parent
+
+
+corpus = load_hook("transcript_corpus", ROOT / "benchmarks" / "transcript_corpus.py")
+macos = load_hook("macos_notification", ROOT / "hooks" / "macos_notification.py")
+
+
+def test_generation_is_deterministic(tmp_path):
+    a, b, c = tmp_path / "a.jsonl", tmp_path / "b.jsonl", tmp_path / "c.jsonl"
+    assert corpus.generate(a, 200_000, seed=7) == corpus.generate(b, 200_000, seed=7)
+    corpus.generate(c, 200_000, seed=8)
+    assert a.read_bytes() == b.read_bytes() != c.read_bytes()
+    assert 200_000 <= a.stat().st_size < 200_000 + (4 << 20)
+
+
+def test_mix_and_huge_entries(tmp_path):
+    path = tmp_path / "t.jsonl"
+    corpus.generate(path, 300_000, mix=corpus.parse_mix("malformed=5"), huge_every=100_000, huge_size=64 << 10)
+    lines = path.read_bytes().split(b"\n")[:-1]
+    malformed = 0
+    for line in lines:
+        try:
+            json.loads(line)
+        except ValueError:
+            malformed += 1
+    assert malformed > 10
+    assert sum(len(line) > 64 << 10 for line in lines) >= 2
+
+
+@pytest.mark.parametrize("ending", corpus.ENDINGS)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_reader_matches_ground_truth(tmp_path, monkeypatch, ending, seed):
+    # Small enough that the huge entries are streamed rather than decoded
+    monkeypatch.setattr(macos, "STREAM_ENTRY_BYTES", 32 << 10)
+    path = tmp_path / "t.jsonl"
+    expected = corpus.generate(path, 256 << 10, seed=seed, huge_every=64 << 10, huge_size=48 << 10, ending=ending)
+
+    analysis = macos.analyze_transcript(str(path))
+    assert analysis.message == expected.message[:macos.MESSAGE_PREFIX_CHARS].rstrip()
+    assert analysis.asks_user_question == expected.asks_user_question == (ending == "ask")
+    assert analysis.tool_names == expected.tool_names
+
+
+def test_parse_size():
+    assert [corpus.parse_size(s) for s in ("512", "4KB", "1.5MB", "2gb")] == [512, 4096, 1572864, 2 << 30]
@@ -0,0 +1,135 @@
+"""
+Tests for the incremental transcript index used by analyze_transcript.
+
+Covers:
+- Repeated calls only parse bytes appended since the previous call
+- Truncation, rotation and in-place rewrites fall back to a full scan
+"""
+
+import json
+import os
+
+import pytest
+
+from tests.conftest import load_hook
+
+
+@pytest.fixture
+def mod():
+    return load_hook("macos_notification")
+
+
+def assistant(text):
+    return json.dumps({"message": {"role": "assistant", "content": [{"type": "text", "text": text}]}}) + "\n"
+
+
+def user(text):
+    return json.dumps({"message": {"role": "user", "content": text}}) + "\n"
+
+
+def scanned_starts(mod, monkeypatch):
+    """Record the start offset of every transcript scan."""
+    starts = []
+    original = mod._find_latest_assistant_entry
+
+    def spy(f, start=0, end=None):
+        starts.append(start)
+        return original(f, start, end)
+
+    monkeypatch.setattr(mod, "_find_latest_assistant_entry", spy)
+    return starts
+
+
+def test_appended_bytes_are_scanned_incrementally(mod, monkeypatch, tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text(user("hi") + assistant("first"))
+    starts = scanned_starts(mod, monkeypatch)
+
+    assert mod.extract_latest_message(str(path)) == "first"
+    size = path.stat().st_size
+
+    with open(path, "a") as f:
+        f.write(user("more"))
+    assert mod.extract_latest_message(str(path)) == "first"
+
+    with open(path, "a") as f:
+        f.write(assistant("second"))
+    assert mod.extract_latest_message(str(path)) == "second"
+
+    assert starts[0] == 0
+    assert starts[1] == size
+    assert starts[2] > size
+
+
+def test_unchanged_transcript_is_not_rewritten(mod, tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text(assistant("first"))
+    mod.analyze_transcript(str(path))
+    index_mtime = mod._transcript_index_path(os.path.realpath(path)).stat().st_mtime_ns
+
+    assert mod.analyze_transcript(str(path)).message == "first"
+    assert mod._transcript_index_path(os.path.realpath(path)).stat().st_mtime_ns == index_mtime
+
+
+def test_partial_trailing_line_is_rescanned(mod, tmp_path):
+    path = tmp_path / "t.jsonl"
+    line = assistant("done")
+    path.write_text(assistant("first") + line[:10])
+    assert mod.extract_latest_message(str(path)) == "first"
+
+    with open(path, "a") as f:
+        f.write(line[10:])
+    assert mod.extract_latest_message(str(path)) == "done"
+
+
+def test_truncation_triggers_full_scan(mod, monkeypatch, tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text(assistant("first") + assistant("second"))
+    assert mod.extract_latest_message(str(path)) == "second"
+
+    path.write_text(assistant("new"))
+    starts = scanned_starts(mod, monkeypatch)
+    assert mod.extract_latest_message(str(path)) == "new"
+    assert starts == [0]
+
+
+def test_rotation_triggers_full_scan(mod, monkeypatch, tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text(assistant("old"))
+    assert mod.extract_latest_message(str(path)) == "old"
+
+    replacement = tmp_path / "replacement.jsonl"
+    replacement.write_text(assistant("old") + user("x"))
+    os.replace(replacement, path)
+    starts = scanned_starts(mod, monkeypatch)
+    assert mod.analyze_transcript(str(path)).message == "old"
+    assert starts == [0]
+
+
+def test_in_place_rewrite_triggers_full_scan(mod, monkeypatch, tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text(assistant("aaaa"))
+    assert mod.extract_latest_message(str(path)) == "aaaa"
+
+    with open(path, "r+") as f:
+        f.write(assistant("bbbb") + user("x"))
+    starts = scanned_starts(mod, monkeypatch)
+    assert mod.extract_latest_message(str(path)) == "bbbb"
+    assert starts == [0]
+
+
+def test_each_transcript_has_its_own_shard(mod, monkeypatch, tmp_path):
+    monkeypatch.setattr(mod, "TRANSCRIPT_INDEX_MAX_ENTRIES", 3)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"t{i}.jsonl"
+        path.write_text(assistant(f"message {i}"))
+        mod.analyze_transcript(str(path))
+        # Age shards in creation order so pruning has a deterministic oldest
+        os.utime(mod._transcript_index_path(os.path.realpath(path)), (i, i))
+        paths.append(path)
+
+    shards = sorted(mod._transcript_index_dir().glob("*.json"))
+    assert len(shards) == 3
+    assert not mod._transcript_index_path(os.path.realpath(paths[0])).exists()
+    assert mod._load_transcript_index(os.path.realpath(paths[4]))["analysis"][0] == "message 4"
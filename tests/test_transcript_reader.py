@@ -0,0 +1,88 @@
+"""
+Tests for the reverse transcript reader in hooks/macos_notification.py.
+
+Covers:
+- Lines and byte offsets match a forward read, for any block size
+- The latest assistant entry is found without reading the whole file
+- The raw-byte prefilter tolerates odd whitespace and key orderings
+"""
+
+import io
+import json
+
+import pytest
+
+from tests.conftest import load_hook
+
+_mod = load_hook("macos_notification")
+
+
+def forward_lines(data):
+    """Reference (offset, line) pairs computed with a plain forward split."""
+    pairs = []
+    offset = 0
+    for line in data.split(b"\n"):
+        pairs.append((offset, line))
+        offset += len(line) + 1
+    return pairs
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 7, 64, 4096])
+@pytest.mark.parametrize("data", [
+    b"",
+    b"\n",
+    b"one\ntwo\nthree\n",
+    b"one\ntwo\nthree",
+    b"\n\nx\n\n",
+    b"short\n" + b"y" * 1000 + b"\nend\n",
+])
+def test_reverse_lines_match_forward_read(data, block_size):
+    got = list(_mod._iter_lines_reverse(io.BytesIO(data), block_size=block_size))
+    assert got == list(reversed(forward_lines(data)))
+
+
+def test_latest_assistant_found_from_tail(tmp_path):
+    """Only the tail of a large transcript is read to find the latest assistant entry."""
+    filler = json.dumps({"message": {"role": "user", "content": "x" * 1000}})
+    latest = json.dumps({"message": {"role": "assistant", "content": [{"type": "text", "text": "done"}]}})
+    path = tmp_path / "big.jsonl"
+    path.write_text("\n".join([filler] * 2000 + [latest, filler]) + "\n")
+
+    class CountingFile(io.FileIO):
+        bytes_read = 0
+
+        def read(self, size=-1):
+            data = super().read(size)
+            CountingFile.bytes_read += len(data)
+            return data
+
+    with CountingFile(str(path), "rb") as f:
+        for offset, line in _mod._iter_lines_reverse(f):
+            if b'"assistant"' in line:
+                break
+
+    assert offset == path.stat().st_size - len(filler) - 1 - len(latest) - 1
+    assert CountingFile.bytes_read <= 2 * _mod.TAIL_BLOCK_SIZE
+    assert _mod.extract_latest_message(str(path)) == "done"
+
+
+@pytest.mark.parametrize("line", [
+    '{"message": {"role": "assistant", "content": "ok"}}',
+    '{"message":{"content":"ok","role":"assistant"}}',
+    '{ "message" : { "role"\t:\r "assistant" , "content" : "ok" } }',
+    '{"type": "assistant", "message": {"id": "m1", "content": [{"type": "text", "text": "ok"}], "role": "assistant"}}',
+])
+def test_prefilter_accepts_any_whitespace_and_key_order(tmp_path, line):
+    path = tmp_path / "t.jsonl"
+    path.write_text('{"message": {"role": "user", "content": "hi"}}\n' + line + "\n")
+    assert _mod.extract_latest_message(str(path)) == "ok"
+
+
+def test_prefilter_ignores_role_marker_inside_strings(tmp_path):
+    """A user entry quoting an assistant role marker is not mistaken for an assistant entry."""
+    path = tmp_path / "t.jsonl"
+    path.write_text(
+        json.dumps({"message": {"role": "assistant", "content": "real"}}) + "\n"
+        + json.dumps({"message": {"role": "user", "content": '{"role": "assistant", "content": "fake"}'}}) + "\n"
+    )
+    assert _mod.extract_latest_message(str(path)) == "real"
@@ -0,0 +1,175 @@
+"""
+Tests for bounded-memory extraction of oversized transcript entries.
+
+Covers:
+- A giant assistant entry yields its text prefix and tool names
+- Reads stay bounded by MAX_STREAM_BYTES and MAX_SCAN_BYTES
+- Escapes and multi-byte characters survive chunk boundaries
+- Giant non-assistant entries are skipped, reading no further than their role
+- An entry whose role lies beyond the budget stops the scan
+- Streamed and decoded entries are judged by message.role alone
+"""
+
+import io
+import json
+
+import pytest
+
+from tests.conftest import load_hook
+
+transcript_stream = load_hook("transcript_stream")
+macos = load_hook("macos_notification")
+
+
+class CountingFile(io.FileIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        CountingFile.bytes_read += len(data)
+        return data
+
+
+def summarize(line, max_bytes=1 << 30, prefix_chars=100):
+    data = line.encode("utf-8")
+    return transcript_stream.summarize_entry(io.BytesIO(data), 0, len(data), max_bytes, prefix_chars)
+
+
+def giant_entry(text_bytes, tool="AskUserQuestion"):
+    return json.dumps({"type": "assistant", "message": {"id": "m1", "role": "assistant", "content": [
+        {"type": "text", "text": "Summary: " + "x" * text_bytes},
+        {"type": "tool_use", "id": "t1", "name": tool, "input": {"blob": ["y" * 1000] * 50, "n": [1, 2.5, None]}},
+    ]}})
+
+
+def test_summary_keeps_prefix_and_tool_names():
+    entry = summarize(giant_entry(200_000), prefix_chars=12)
+    assert entry == {"message": {"role": "assistant", "content": [
+        {"type": "text", "text": "Summary: xxx"},
+        {"type": "tool_use", "name": "AskUserQuestion"},
+    ]}}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_escapes_and_unicode_across_chunk_boundaries(monkeypatch, chunk_size):
+    monkeypatch.setattr(transcript_stream, "CHUNK_SIZE", chunk_size)
+    text = 'He said "hé" \\ ☃ \U0001f600 tab\tend'
+    line = json.dumps({"message": {"content": [{"type": "text", "text": text}], "role": "assistant"}},
+                      ensure_ascii=chunk_size % 2 == 0)
+    assert summarize(line)["message"]["content"][0]["text"] == text
+
+
+@pytest.mark.parametrize("line", [
+    '{"message": {"role": "user", "content": "hi"}}',
+    '{"type": "summary", "summary": "x"}',
+    '[1, 2]',
+    '{"message": ',
+])
+def test_non_assistant_or_malformed_entries_give_none(line):
+    assert summarize(line) is None
+
+
+def test_top_level_type_does_not_stand_in_for_unread_role():
+    line = json.dumps({"type": "assistant", "message": {"content": "Done. " + "x" * 10_000, "role": "assistant"}})
+    assert summarize(line, max_bytes=1024, prefix_chars=5) is transcript_stream.UNDETERMINED
+
+
+@pytest.mark.parametrize("entry, is_assistant", [
+    ({"type": "progress", "message": {"role": "assistant", "content": "latest"}}, True),
+    ({"type": "assistant", "message": {"content": "latest"}}, False),
+    ({"type": "assistant", "message": {"role": "user", "content": "latest"}}, False),
+])
+def test_streamed_and_decoded_entries_agree_on_role(tmp_path, monkeypatch, entry, is_assistant):
+    path = tmp_path / "t.jsonl"
+    older = json.dumps({"message": {"role": "assistant", "content": "older"}})
+    entry["message"]["padding"] = "x" * 10_000
+    path.write_text(older + "\n" + json.dumps(entry) + "\n")
+
+    found = []
+    for stream_entry_bytes in (1 << 20, 1024):
+        monkeypatch.setattr(macos, "STREAM_ENTRY_BYTES", stream_entry_bytes)
+        with open(path, "rb") as f:
+            _, offset, _ = macos._find_latest_assistant_entry(f)
+        found.append(offset)
+    assert found == ([len(older) + 1] * 2 if is_assistant else [0, 0])
+
+
+def test_role_beyond_budget_is_undetermined():
+    line = json.dumps({"message": {"content": [{"type": "text", "text": "x" * 10_000}], "role": "assistant"}})
+    assert summarize(line, max_bytes=1024) is transcript_stream.UNDETERMINED
+
+
+def test_non_assistant_role_stops_the_read(tmp_path):
+    path = tmp_path / "entry.json"
+    path.write_text(json.dumps({"message": {"role": "user", "content": "z" * 1_000_000}}))
+    with CountingFile(str(path), "rb") as f:
+        CountingFile.bytes_read = 0
+        assert transcript_stream.summarize_entry(f, 0, path.stat().st_size, 1 << 30, 100) is None
+    assert CountingFile.bytes_read <= transcript_stream.CHUNK_SIZE
+
+
+def test_read_budget_truncates_without_failing():
+    line = giant_entry(500_000)
+    entry = summarize(line, max_bytes=4096, prefix_chars=5)
+    assert entry["message"]["content"] == [{"type": "text", "text": "Summa"}]
+
+
+def test_giant_transcript_entry_is_streamed(tmp_path, monkeypatch):
+    monkeypatch.setattr(macos, "STREAM_ENTRY_BYTES", 64 * 1024)
+    monkeypatch.setattr(macos, "MAX_STREAM_BYTES", 1024 * 1024)
+    path = tmp_path / "t.jsonl"
+    user = json.dumps({"message": {"role": "user", "content": "go"}})
+    path.write_text("\n".join([user, giant_entry(400_000), user]) + "\n")
+
+    with CountingFile(str(path), "rb") as f:
+        CountingFile.bytes_read = 0
+        entry, offset, _ = macos._find_latest_assistant_entry(f)
+    assert offset == len(user) + 1
+    assert entry["message"]["content"][1] == {"type": "tool_use", "name": "AskUserQuestion"}
+    # The backwards scan reads the giant line once, the streamed summary at most its budget
+    assert CountingFile.bytes_read <= 2 * path.stat().st_size
+
+    analysis = macos.analyze_transcript(str(path))
+    assert analysis.asks_user_question is True
+    assert analysis.message == ("Summary: " + "x" * 400_000)[:macos.MESSAGE_PREFIX_CHARS]
+
+
+def test_giant_user_entry_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(macos, "STREAM_ENTRY_BYTES", 1024)
+    path = tmp_path / "t.jsonl"
+    latest = json.dumps({"message": {"role": "assistant", "content": "earlier"}})
+    giant = json.dumps({"message": {"role": "user", "content": [{"type": "tool_result", "content": "z" * 100_000}]}})
+    path.write_text(latest + "\n" + giant + "\n")
+    assert macos.extract_latest_message(str(path)) == "earlier"
+
+
+def test_scan_gives_up_after_read_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(macos, "MAX_SCAN_BYTES", 256 * 1024)
+    path = tmp_path / "t.jsonl"
+    latest = json.dumps({"message": {"role": "assistant", "content": "too far back"}})
+    filler = json.dumps({"message": {"role": "user", "content": "x" * 1000}})
+    path.write_text("\n".join([latest] + [filler] * 1000) + "\n")
+
+    with CountingFile(str(path), "rb") as f:
+        CountingFile.bytes_read = 0
+        entry, _, _ = macos._find_latest_assistant_entry(f)
+    assert entry is None
+    assert CountingFile.bytes_read <= 256 * 1024 + macos.TAIL_BLOCK_SIZE
+
+
+def test_long_line_is_yielded_as_none():
+    data = b"short\n" + b"y" * 5000 + b"\nend"
+    got = list(macos._iter_lines_reverse(io.BytesIO(data), block_size=64, max_line_bytes=1000))
+    assert got == [(5007, b"end"), (6, None), (0, b"short")]
+
+
+def test_undetermined_latest_entry_does_not_report_an_older_one(tmp_path):
+    path = tmp_path / "t.jsonl"
+    older = json.dumps({"message": {"role": "assistant", "content": "older"}})
+    giant = json.dumps({"message": {"content": [{"type": "text", "text": "x" * (9 * 1024 * 1024)}],
+                                    "role": "assistant"}})
+    path.write_text(older + "\n" + giant + "\n")
+
+    analysis = macos.analyze_transcript(str(path))
+    assert analysis.message is None
+    assert analysis == macos.EMPTY_ANALYSIS